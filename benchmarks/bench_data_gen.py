@@ -0,0 +1,54 @@
+"""MassGenerator against the local stub LLM: fixed concurrency vs AIMD with budgeted retries.
+
+The stub serves `--capacity` requests at base latency, slows down beyond
+that, answers 429 past twice the capacity and fails `--error-rate` of requests.
+
+Usage: python -m benchmarks.bench_data_gen [--skeletons 400] [--capacity 16] [--error-rate 0.05]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+from pathlib import Path
+
+from benchmarks.stub_llm_server import StubBehaviour, serve
+from dataset import MassGenerator
+from src.data_gen.throttle import RetryPolicy
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--skeletons", type=int, default=400)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--capacity", type=int, default=16)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=50, help="fixed concurrency, as in dataset.py")
+    args = parser.parse_args()
+
+    configs = {
+        "fixed, no retries": MassGenerator(args.concurrency, adaptive=False, retry=RetryPolicy(max_attempts=1)),
+        "fixed + retries": MassGenerator(args.concurrency, adaptive=False),
+        "AIMD + retries": MassGenerator(8, max_concurrency=2 * args.concurrency),
+    }
+    behaviour = StubBehaviour(latency=args.latency, capacity=args.capacity, error_rate=args.error_rate)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, generator in configs.items():
+            with serve(behaviour) as server:
+                os.environ["OPENAI_API_URL"] = server.url
+                written = asyncio.run(generator.run(args.skeletons, Path(tmp) / "raw.jsonl"))
+                results.append((label, written, generator, server.rejected))
+
+    print(f"\n{'mode':<18} {'samples':>8} {'req/s':>8} {'goodput':>8} {'retries':>8} {'429s':>6}  concurrency")
+    for label, written, generator, rejected in results:
+        stats, limiter = generator.stats, generator.limiter
+        assert stats is not None and limiter is not None
+        print(
+            f"{label:<18} {written:>8} {stats.requests_per_second:>8.1f} {stats.goodput:>8.1f} {stats.retries:>8} {rejected:>6}"
+            f"  mean {limiter.mean_limit:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
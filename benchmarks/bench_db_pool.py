@@ -0,0 +1,83 @@
+"""Queries/sec of a connection per query vs DBManager's pooled connections.
+
+Usage: python -m benchmarks.bench_db_pool [--rows 200000] [--queries 20000]
+"""
+
+import argparse
+import random
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from src.engine.db import DBManager
+from src.engine.transpiler import AuraTranspiler
+from src.schema import AETHERIS_DB
+
+ROOMS = ["Kitchen", "Living Room", "Garage", "Bedroom", "Home Cinema"]
+DEVICES = [f"{d}_{i}" for d in ["Lamp", "Sensor", "Thermostat", "Camera"] for i in range(1, 6)]
+
+WORKLOAD = [
+    "SOURCE climate_stats |> FILTER room == '{room}' |> AGGREGATE AVG(temp) BY room",
+    "SOURCE climate_stats |> FILTER room == '{room}' |> SORT timestamp DESC |> LIMIT 24",
+    "SOURCE energy_consumption |> FILTER device_id == '{device}' |> AGGREGATE SUM(kwh) BY device_id",
+    "SOURCE energy_consumption |> FILTER device_id == '{device}' |> SORT kwh DESC |> LIMIT 5",
+]
+
+
+def seed(db: DBManager, rows: int) -> None:
+    db.setup_db()
+    conn = db.connection()
+    with conn:
+        conn.executemany(
+            'INSERT INTO "climate_stats" VALUES (?, ?, ?, ?, ?)',
+            (
+                (random.choice(ROOMS), f"2025-01-01T{i % 24:02d}:00:00", random.uniform(18, 30), random.uniform(30, 60), random.randint(400, 1000))
+                for i in range(rows)
+            ),
+        )
+        conn.executemany(
+            'INSERT INTO "energy_consumption" VALUES (?, ?, ?, ?)',
+            ((random.choice(DEVICES), f"2025-01-01T{i % 24:02d}:00:00", random.uniform(0.1, 5.0), 220.0) for i in range(rows)),
+        )
+
+
+def run(label: str, execute, queries: list[tuple[str, list]]) -> float:
+    start = time.perf_counter()
+    for sql, params in queries:
+        execute(sql, params)
+    qps = len(queries) / (time.perf_counter() - start)
+    print(f"{label:<34} {qps:>10,.0f} q/s")
+    return qps
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=20_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "bench.db")
+        with DBManager(AETHERIS_DB, db_path) as writer:
+            seed(writer, args.rows)
+
+        transpiler = AuraTranspiler(AETHERIS_DB)
+        queries = [
+            transpiler.translate(random.choice(WORKLOAD).format(room=random.choice(ROOMS), device=random.choice(DEVICES)))
+            for _ in range(args.queries)
+        ]
+
+        def fresh_connection(sql: str, params: list) -> list:
+            with sqlite3.connect(db_path) as conn:
+                return conn.cursor().execute(sql, params).fetchall()
+
+        print(f"Seeded {args.rows:,} rows per table, running {args.queries:,} queries")
+        before = run("new connection per query", fresh_connection, queries)
+        with DBManager(AETHERIS_DB, db_path, read_only=True) as pooled:
+            after = run("pooled read-only connection", pooled.execute_query, queries)
+        print(f"Speedup: {after / before:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
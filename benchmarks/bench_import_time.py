@@ -0,0 +1,74 @@
+"""Cold-start import cost of each entry point, from `python -X importtime` in fresh interpreters.
+
+Also lists which heavy ML packages an import drags in; tools that only need the
+transpiler or the database should show none.
+
+Usage: python -m benchmarks.bench_import_time [--runs 5] [modules ...]
+"""
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+
+ENTRY_POINTS = [
+    "src.config",
+    "src.engine.transpiler",
+    "src.evaluation.harness",
+    "src.retrieval.vector_store",
+    "src.inference",
+    "seed_db",
+    "evaluate",
+    "dataset",
+    "test",
+]
+HEAVY_PACKAGES = {"torch", "transformers", "unsloth", "trl", "chromadb", "sentence_transformers", "datasets", "openai"}
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def profile(module: str) -> tuple[float, set[str], str | None]:
+    """Cumulative import time (ms), heavy packages loaded and the error, if any, for one cold import."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    total_us = 0
+    heavy: set[str] = set()
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if not match:
+            continue
+        name = match.group(4)
+        heavy.update({name.split(".")[0]} & HEAVY_PACKAGES)
+        if name == module:
+            total_us = int(match.group(2))
+    error = proc.stderr.strip().splitlines()[-1] if proc.returncode else None
+    return total_us / 1000, heavy, error
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("modules", nargs="*", default=ENTRY_POINTS)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'module':<30} {'median ms':>10} {'min ms':>8}  heavy imports")
+    for module in args.modules:
+        timings: list[float] = []
+        heavy: set[str] = set()
+        error = None
+        for _ in range(args.runs):
+            ms, heavy, error = profile(module)
+            if error:
+                break
+            timings.append(ms)
+        if error:
+            print(f"{module:<30} {'failed':>10} {'':>8}  {error}")
+            continue
+        print(f"{module:<30} {statistics.median(timings):>10.1f} {min(timings):>8.1f}  {', '.join(sorted(heavy)) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""EXPLAIN QUERY PLAN and workload latency before/after the advised indexes.
+
+Usage: python -m benchmarks.bench_indexes [--db data/aetheris.db] [--workload data/dataset_test.json]
+Without --db a temporary database is seeded (its indexes are created in place).
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.bench_db_pool import DEVICES, ROOMS, WORKLOAD, seed
+from benchmarks.bench_plan_cache import load_queries
+from src.engine.db import DBManager
+from src.engine.index_advisor import IndexAdvisor
+from src.engine.transpiler import AuraTranspiler
+from src.schema import AETHERIS_DB
+
+
+def load_workload(path: Path | None) -> list[str]:
+    """DSL queries from a dataset JSON or a text file with one query per line."""
+    if path is None:
+        return [random.choice(WORKLOAD).format(room=random.choice(ROOMS), device=random.choice(DEVICES)) for _ in range(200)]
+    if path.suffix == ".json":
+        return load_queries(path)
+    return [line.strip() for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+def time_workload(db: DBManager, queries: list[tuple[str, list]]) -> float:
+    start = time.perf_counter()
+    for sql, params in queries:
+        db.execute_query(sql, params)
+    return time.perf_counter() - start
+
+
+def report(db: DBManager, dsl_queries: list[str], show: int) -> None:
+    transpiler = AuraTranspiler(AETHERIS_DB)
+    compiled: list[tuple[str, list]] = []
+    for dsl in dsl_queries:
+        try:
+            compiled.append(transpiler.translate(dsl))
+        except ValueError:
+            continue
+    samples = list({sql: (sql, params) for sql, params in compiled}.values())[:show]
+
+    before_plans = [db.explain(sql, params) for sql, params in samples]
+    before = time_workload(db, compiled)
+
+    specs = IndexAdvisor(AETHERIS_DB).recommend(dsl_queries)
+    print(f"Creating {len(specs)} indexes:")
+    for spec in specs:
+        print(f"  {spec.create_sql()}")
+    db.create_indexes(specs)
+
+    after_plans = [db.explain(sql, params) for sql, params in samples]
+    after = time_workload(db, compiled)
+
+    for (sql, _), plan_before, plan_after in zip(samples, before_plans, after_plans, strict=True):
+        print(f"\n{sql}\n  before: {' | '.join(plan_before)}\n  after:  {' | '.join(plan_after)}")
+    print(f"\nWorkload of {len(compiled)} queries: {before:.2f}s -> {after:.2f}s ({before / max(after, 1e-9):.1f}x)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", type=str, default=None)
+    parser.add_argument("--workload", type=Path, default=None)
+    parser.add_argument("--rows", type=int, default=500_000, help="rows per table when seeding a temporary db")
+    parser.add_argument("--show", type=int, default=8, help="distinct queries to print plans for")
+    args = parser.parse_args()
+
+    dsl_queries = load_workload(args.workload)
+    if args.db:
+        with DBManager(AETHERIS_DB, args.db) as db:
+            report(db, dsl_queries, args.show)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp, DBManager(AETHERIS_DB, str(Path(tmp) / "bench.db")) as db:
+        seed(db, args.rows)
+        report(db, dsl_queries, args.show)
+
+
+if __name__ == "__main__":
+    main()
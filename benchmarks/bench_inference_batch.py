@@ -0,0 +1,57 @@
+"""Throughput of AuraInference.predict_batch at different batch sizes, on CPU.
+
+Usage: python -m benchmarks.bench_inference_batch [--model NAME] [--queries 64] [--batch-sizes 1 4 16 64]
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from benchmarks.tiny_model import StaticRetriever, load_model
+from src.generation.backends import HFGenerationBackend
+from src.inference import AuraInference
+
+
+def load_questions(path: Path, n: int) -> list[str]:
+    if path.exists():
+        with open(path, encoding="utf-8") as f:
+            return [item["input"] for item in json.load(f)][:n]
+    templates = [
+        "What is the average humidity in the {} from the last 24 hours?",
+        "Show total energy used by devices in the {}",
+        "How many people were in the {} today and what was the activity level?",
+        "List the latest security events near the {} with high severity",
+    ]
+    rooms = ["Kitchen", "Living Room", "Garage", "Bedroom"]
+    return [templates[i % len(templates)].format(rooms[i % len(rooms)]) * (1 + i % 3) for i in range(n)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=None, help="HF model name; default is an offline tiny GPT-2")
+    parser.add_argument("--dataset", type=Path, default=Path("data/dataset_test.json"))
+    parser.add_argument("--queries", type=int, default=64)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--max-new-tokens", type=int, default=32)
+    args = parser.parse_args()
+
+    model, tokenizer = load_model(args.model)
+    backend = HFGenerationBackend(model, tokenizer, device="cpu")
+    questions = load_questions(args.dataset, args.queries)
+
+    for batch_size in args.batch_sizes:
+        engine = AuraInference(
+            backend=backend,
+            retriever=StaticRetriever(),
+            batch_size=batch_size,
+            max_new_tokens=args.max_new_tokens,
+        )
+        start = time.perf_counter()
+        engine.predict_batch(questions)
+        elapsed = time.perf_counter() - start
+        print(f"batch_size={batch_size:<4} {len(questions) / elapsed:8.2f} queries/s  ({elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Lexer/parser transpilation vs the legacy regex-per-stage translate.
+
+Usage: python -m benchmarks.bench_parser [--n 1000000]
+"""
+
+import argparse
+import re
+import time
+from typing import Any
+
+from src.data_gen.generate import SkeletonGenerator
+from src.engine.parser import parse
+from src.engine.transpiler import AuraTranspiler
+from src.schema import AETHERIS_DB, AetherisSchema
+
+
+def legacy_translate(schema: AetherisSchema, dsl_query: str) -> tuple[str, list[Any]]:
+    """The original str.startswith/regex transpiler, kept as the baseline."""
+    parts = [p.strip() for p in dsl_query.split("|>")]
+
+    table_name = ""
+    where_clauses: list[str] = []
+    params: list[Any] = []
+    select_cols = "*"
+    group_by = ""
+
+    for part in parts:
+        if part.startswith("SOURCE"):
+            raw_table = part.replace("SOURCE", "").strip()
+            target_table = schema.get_table(raw_table)
+            if not target_table:
+                raise ValueError(f"Table {raw_table} not in whitelist.")
+            table_name = f'"{target_table.name}"'
+
+        elif part.startswith("FILTER"):
+            match = re.search(r"(\w+)\s*==\s*['\"](.+?)['\"]", part)
+            if match:
+                col, val = match.groups()
+                table_obj = schema.get_table(table_name.strip('"'))
+                if table_obj and col in table_obj.column_names:
+                    where_clauses.append(f'"{col}" = ?')
+                    params.append(val)
+
+        elif part.startswith("AGGREGATE"):
+            match = re.match(r"AGGREGATE\s+(\w+)\((\w+)\)\s+BY\s+(\w+)", part)
+            if match:
+                func, col, group_col = match.groups()
+                table_obj = schema.get_table(table_name.strip('"'))
+                if table_obj and all(c in table_obj.column_names for c in [col, group_col]):
+                    select_cols = f'"{group_col}", {func}("{col}")'
+                    group_by = f'GROUP BY "{group_col}"'
+
+    query_parts = [f"SELECT {select_cols}", f"FROM {table_name}"]
+    if where_clauses:
+        query_parts.append(f"WHERE {' AND '.join(where_clauses)}")
+    if group_by:
+        query_parts.append(group_by)
+
+    return " ".join(query_parts), params
+
+
+def timed(label: str, fn, queries: list[str]) -> None:
+    start = time.perf_counter()
+    for q in queries:
+        fn(q)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:8.2f}s  {len(queries) / elapsed:>12,.0f} q/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    generator = SkeletonGenerator(AETHERIS_DB)
+    print(f"Generating {args.n:,} skeletons...")
+    queries = [generator.generate_skeleton()["dsl_skeleton"] for _ in range(args.n)]
+
+    transpiler = AuraTranspiler(AETHERIS_DB)
+    timed("legacy regex translate", lambda q: legacy_translate(AETHERIS_DB, q), queries)
+    timed("lex + parse (AST only)", parse, queries)
+    timed("lex + parse + SQL gen", lambda q: transpiler.compile(parse(q)), queries)
+    timed("translate (plan cache)", transpiler.translate, queries)
+    print(f"Plan cache: {transpiler.cache_stats}")
+
+
+if __name__ == "__main__":
+    main()
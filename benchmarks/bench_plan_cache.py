@@ -0,0 +1,67 @@
+"""Plan cache effectiveness of AuraTranspiler on the test split.
+
+Usage: python -m benchmarks.bench_plan_cache [--dataset data/dataset_test.json] [--repeat 20]
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from src.data_gen.generate import SkeletonGenerator
+from src.engine.parser import parse
+from src.engine.transpiler import AuraTranspiler
+from src.schema import AETHERIS_DB
+
+
+def load_queries(path: Path, fallback_size: int = 1000) -> list[str]:
+    """Expected DSL of the dataset, or generated skeletons if it is missing."""
+    if path.exists():
+        with open(path, encoding="utf-8") as f:
+            return [item["output"] for item in json.load(f)]
+    print(f"[!] {path} not found, using {fallback_size} generated skeletons.")
+    generator = SkeletonGenerator(AETHERIS_DB)
+    return [generator.generate_skeleton()["dsl_skeleton"] for _ in range(fallback_size)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dataset", type=Path, default=Path("data/dataset_test.json"))
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--cache-size", type=int, default=1024)
+    args = parser.parse_args()
+
+    queries = load_queries(args.dataset)
+    transpiler = AuraTranspiler(AETHERIS_DB, plan_cache_size=args.cache_size)
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for q in queries:
+            try:
+                transpiler.compile(parse(q))
+            except ValueError:
+                pass
+    uncached = time.perf_counter() - start
+
+    first_pass_hit_rate = 0.0
+    start = time.perf_counter()
+    for i in range(args.repeat):
+        for q in queries:
+            try:
+                transpiler.translate(q)
+            except ValueError:
+                pass
+        if i == 0:
+            first_pass_hit_rate = transpiler.cache_stats.hit_rate
+    cached = time.perf_counter() - start
+
+    n = len(queries) * args.repeat
+    stats = transpiler.cache_stats
+    print(f"Queries: {len(queries)} x {args.repeat} | distinct templates: {len(transpiler.plan_cache)}")
+    print(f"First-pass hit rate: {first_pass_hit_rate:.2%}")
+    print(f"Hits: {stats.hits} | Misses: {stats.misses} | Evictions: {stats.evictions} | Hit rate: {stats.hit_rate:.2%}")
+    print(f"Parse every time: {n / uncached:,.0f} q/s | With plan cache: {n / cached:,.0f} q/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Prompt-prefix KV reuse vs plain batched generation: throughput, prefill saved, output parity.
+
+Runs on CPU with a Hugging Face model, or with `--unsloth PATH` on the GPU with
+the fine-tuned model loaded as in inference, whose patched forward manages its
+own KV cache and positions; that run is the parity check for PREFIX_CACHE_MB.
+
+Usage: python -m benchmarks.bench_prefix_cache [--model NAME | --unsloth PATH] [--queries 64] [--budget-mb 64]
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any
+
+from benchmarks.bench_inference_batch import load_questions
+from benchmarks.tiny_model import StaticRetriever, load_model
+from src.generation.backends import HFGenerationBackend, load_unsloth_backend
+from src.generation.prefix_cache import PrefixCache
+from src.inference import AuraInference
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=None, help="HF model name; default is an offline tiny GPT-2")
+    parser.add_argument("--unsloth", default=None, metavar="PATH", help="fine-tuned model to load with Unsloth on the GPU")
+    parser.add_argument("--dataset", type=Path, default=Path("data/dataset_test.json"))
+    parser.add_argument("--queries", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--max-new-tokens", type=int, default=16)
+    parser.add_argument("--budget-mb", type=int, default=64)
+    args = parser.parse_args()
+
+    if args.unsloth:
+        base = load_unsloth_backend(args.unsloth, prefix_cache_mb=0)
+        model, tokenizer, device = base.model, base.tokenizer, "cuda"
+    else:
+        model, tokenizer = load_model(args.model)
+        device = "cpu"
+    questions = load_questions(args.dataset, args.queries)
+    outputs: dict[str, list[str]] = {}
+
+    for label, cache in (("no cache", None), ("prefix cache", PrefixCache[Any](args.budget_mb * 1024 * 1024))):
+        engine = AuraInference(
+            backend=HFGenerationBackend(model, tokenizer, device=device, prefix_cache=cache),
+            retriever=StaticRetriever(),
+            batch_size=args.batch_size,
+            max_new_tokens=args.max_new_tokens,
+        )
+        start = time.perf_counter()
+        outputs[label] = engine.predict_batch(questions)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<13} {len(questions) / elapsed:8.2f} queries/s  ({elapsed:.2f}s)")
+        if cache is not None:
+            print(f"  entries={len(cache)} bytes={cache.nbytes:,}")
+            print(json.dumps(cache.stats.summary(), indent=2))
+
+    same = sum(a == b for a, b in zip(outputs["no cache"], outputs["prefix cache"], strict=True))
+    print(f"Identical predictions: {same}/{len(questions)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Skeletons packed per LLM call (N) against the local stub LLM: samples/s and tokens per sample.
+
+The stub charges a fixed `--latency` per request plus `--item-latency` per
+skeleton and breaks `--element-error-rate` of batch elements, which the
+generator retries as single requests.
+
+Usage: python -m benchmarks.bench_request_coalescing [--skeletons 400] [--batch-sizes 1 2 4 8]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+from pathlib import Path
+
+from benchmarks.stub_llm_server import StubBehaviour, serve
+from dataset import MassGenerator
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--skeletons", type=int, default=400)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.2, help="per-request overhead (prefill of the system prompt, queueing)")
+    parser.add_argument("--item-latency", type=float, default=0.05, help="per-skeleton decode time")
+    parser.add_argument("--element-error-rate", type=float, default=0.05)
+    args = parser.parse_args()
+
+    behaviour = StubBehaviour(
+        latency=args.latency,
+        item_latency=args.item_latency,
+        capacity=args.concurrency,
+        element_error_rate=args.element_error_rate,
+    )
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for batch_size in args.batch_sizes:
+            generator = MassGenerator(args.concurrency, adaptive=False, batch_size=batch_size)
+            with serve(behaviour) as server:
+                os.environ["OPENAI_API_URL"] = server.url
+                written = asyncio.run(generator.run(args.skeletons, Path(tmp) / "raw.jsonl"))
+            assert generator.stats is not None
+            rows.append((batch_size, written, generator.stats))
+
+    print(f"\n{'N':>3} {'samples':>8} {'requests':>9} {'fallbacks':>10} {'samples/s':>10} {'tokens/sample':>14}")
+    for batch_size, written, stats in rows:
+        print(
+            f"{batch_size:>3} {written:>8} {stats.requests:>9} {stats.fallbacks:>10} "
+            f"{stats.goodput:>10.1f} {stats.tokens_per_sample:>14.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
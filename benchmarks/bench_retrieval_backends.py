@@ -0,0 +1,64 @@
+"""ChromaDB vs in-process NumPy retrieval: startup, per-query latency and top-k agreement.
+
+Usage: python -m benchmarks.bench_retrieval_backends [--queries 500]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.bench_inference_batch import load_questions
+from src.retrieval.cache import normalize_query
+from src.retrieval.vector_store import SchemaRetriever
+from src.schema import AETHERIS_DB
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dataset", type=Path, default=Path("data/dataset_test.json"))
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--top-k", type=int, default=2)
+    args = parser.parse_args()
+
+    questions = [normalize_query(q) for q in load_questions(args.dataset, args.queries)]
+    rankings: dict[str, list[list[str]]] = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in ("chroma", "numpy"):
+            for run in ("cold", "warm"):
+                start = time.perf_counter()
+                retriever = SchemaRetriever(
+                    AETHERIS_DB,
+                    persist_directory=f"{tmp}/chroma",
+                    index_directory=f"{tmp}/numpy",
+                    embedding_cache_path=f"{tmp}/embeddings.db",
+                    backend=backend,
+                )
+                print(f"{backend:<7} {run} start: {time.perf_counter() - start:7.3f}s")
+
+            # Warm the embedding cache so only the index search is timed.
+            vectors = np.stack(retriever.encoder(questions))
+            latencies = []
+            ranked: list[list[str]] = []
+            for i in range(len(questions)):
+                start = time.perf_counter()
+                hits = retriever.index.search(vectors[i : i + 1], args.top_k)
+                latencies.append(time.perf_counter() - start)
+                ranked.append([str(m["name"]) for m in hits[0]])
+            rankings[backend] = ranked
+            p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+            print(f"{backend:<7} search p50 {p50:.3f} ms | p99 {p99:.3f} ms")
+
+            start = time.perf_counter()
+            retriever.index.search(vectors, args.top_k)
+            print(f"{backend:<7} batch of {len(questions)}: {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    agree = sum(a == b for a, b in zip(rankings["chroma"], rankings["numpy"], strict=True))
+    print(f"Identical top-{args.top_k} rankings: {agree}/{len(questions)}")
+
+
+if __name__ == "__main__":
+    main()
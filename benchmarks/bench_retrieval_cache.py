@@ -0,0 +1,32 @@
+"""Hit rate and latency of SchemaRetriever's query and embedding caches on the test questions.
+
+Usage: python -m benchmarks.bench_retrieval_cache [--passes 2]
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+from benchmarks.bench_inference_batch import load_questions
+from src.retrieval.vector_store import SchemaRetriever
+from src.schema import AETHERIS_DB
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dataset", type=Path, default=Path("data/dataset_test.json"))
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--passes", type=int, default=2)
+    args = parser.parse_args()
+
+    retriever = SchemaRetriever(AETHERIS_DB)
+    questions = load_questions(args.dataset, args.queries)
+    for i in range(args.passes):
+        for question in questions:
+            retriever.get_relevant_tables(question)
+        print(f"After pass {i + 1}:")
+        print(json.dumps(retriever.cache_report(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
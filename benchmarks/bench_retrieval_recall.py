@@ -0,0 +1,83 @@
+"""Recall vs context size of table-level and column-pruned schema retrieval on the test set.
+
+A sample counts as recalled when the retrieved context contains the SOURCE table
+of the expected DSL and every column the query references. Each setting runs
+with tables ranked by their table documents only ("table", the training-time
+ranking) and by their best hit among all documents ("fused").
+
+Usage: python -m benchmarks.bench_retrieval_recall [--queries 1000] [--max-columns 0 3 5 8] [--table-ranking table fused]
+"""
+
+import argparse
+import itertools
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+from src.engine.nodes import Aggregate, Filter, Sort
+from src.engine.parser import parse
+from src.prompts import PromptBuilder
+from src.retrieval.vector_store import SchemaRetriever
+from src.schema import AETHERIS_DB
+
+
+def referenced_columns(dsl: str) -> tuple[str, set[str]]:
+    """The SOURCE table and the columns the query's stages reference."""
+    query = parse(dsl)
+    columns: set[str] = set()
+    for stage in query.stages:
+        if isinstance(stage, Filter | Sort):
+            columns.add(stage.column)
+        elif isinstance(stage, Aggregate):
+            columns.update({stage.column, stage.group_by})
+    columns.discard("*")
+    return query.source.table, columns
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dataset", type=Path, default=Path("data/dataset_test.json"))
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--top-k", type=int, default=2)
+    parser.add_argument("--max-columns", type=int, nargs="+", default=[0, 3, 5, 8], help="0 = whole tables")
+    parser.add_argument("--table-ranking", nargs="+", default=["table", "fused"], choices=["table", "fused"])
+    parser.add_argument("--values-db", default=None, help="sample categorical values from this database")
+    args = parser.parse_args()
+
+    if not args.dataset.exists():
+        sys.exit(f"{args.dataset} not found; generate the dataset first.")
+    with open(args.dataset, encoding="utf-8") as f:
+        samples = json.load(f)[: args.queries]
+    questions = [s["input"] for s in samples]
+    targets = [referenced_columns(s["output"]) for s in samples]
+    prompts = PromptBuilder()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'ranking':>8} {'columns':>8} {'table recall':>13} {'column recall':>14} {'context chars':>14}")
+        for ranking, max_columns in itertools.product(args.table_ranking, args.max_columns):
+            retriever = SchemaRetriever(
+                AETHERIS_DB,
+                backend="numpy",
+                index_directory=f"{tmp}/index",
+                embedding_cache_path=f"{tmp}/embeddings.db",
+                max_columns=max_columns,
+                table_ranking=ranking,
+                values_db_path=args.values_db,
+            )
+            retrieved = retriever.get_relevant_tables_batch(questions, top_k=args.top_k)
+            table_hits = column_hits = chars = 0
+            for (source, columns), tables in zip(targets, retrieved, strict=True):
+                chars += len(prompts.context(tables))
+                table = next((t for t in tables if t.name == source), None)
+                if table is None:
+                    continue
+                table_hits += 1
+                column_hits += columns <= set(table.column_names)
+            n = len(samples)
+            label = max_columns or "all"
+            print(f"{ranking:>8} {label:>8} {table_hits / n:>13.2%} {column_hits / n:>14.2%} {chars / n:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Tokens generated per query with and without stop strings, decoding only the new tokens.
+
+The stand-in is the tiny model briefly trained on packed prompt/answer pairs with
+no EOS between them, so like an under-trained fine-tune it answers and then runs
+on into a new "### Input:" block unless it is stopped.
+
+Usage: python -m benchmarks.bench_stop_sequences [--queries 32] [--train-steps 200]
+"""
+
+import argparse
+import json
+import random
+import re
+import time
+from pathlib import Path
+
+from benchmarks.bench_inference_batch import load_questions
+from benchmarks.tiny_model import StaticRetriever, fit_tiny_model, load_model
+from src.data_gen.generate import SkeletonGenerator
+from src.generation.backends import HFGenerationBackend
+from src.inference import AuraInference
+from src.prompts import PromptBuilder
+from src.schema import AETHERIS_DB
+
+
+def training_texts(n: int, questions: list[str], prompts: PromptBuilder) -> list[str]:
+    """Pairs of prompt + DSL answer concatenated without EOS."""
+    generator = SkeletonGenerator(AETHERIS_DB)
+    retriever = StaticRetriever()
+    texts = []
+    for _ in range(n):
+        pair = []
+        for _ in range(2):
+            question = random.choice(questions)
+            dsl = re.sub(r"\{\{\w+\}\}", "Kitchen", generator.generate_skeleton()["dsl_skeleton"])
+            context = prompts.context(retriever.get_relevant_tables(question))
+            pair.append(prompts.training_text(context, question, dsl))
+        texts.append("\n\n".join(pair))
+    return texts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=None, help="HF model name; default is the offline tiny GPT-2, briefly trained")
+    parser.add_argument("--dataset", type=Path, default=Path("data/dataset_test.json"))
+    parser.add_argument("--queries", type=int, default=32)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--max-new-tokens", type=int, default=128)
+    parser.add_argument("--train-steps", type=int, default=200)
+    args = parser.parse_args()
+
+    random.seed(0)
+    questions = load_questions(args.dataset, args.queries)
+    model, tokenizer = load_model(args.model)
+    if args.model is None:
+        start = time.perf_counter()
+        fit_tiny_model(model, tokenizer, training_texts(2000, questions, PromptBuilder(tokenizer)), steps=args.train_steps)
+        print(f"Trained tiny model for {args.train_steps} steps in {time.perf_counter() - start:.1f}s")
+
+    for stop_strings in ((), ("\n", "###")):
+        backend = HFGenerationBackend(model, tokenizer, device="cpu", stop_strings=stop_strings)
+        engine = AuraInference(
+            backend=backend,
+            retriever=StaticRetriever(),
+            batch_size=args.batch_size,
+            max_new_tokens=args.max_new_tokens,
+            constrained=False,
+        )
+        start = time.perf_counter()
+        predictions = engine.predict_batch(questions)
+        elapsed = time.perf_counter() - start
+        label = "stop strings" if stop_strings else "EOS only"
+        print(f"{label:<13} {backend.tokens_generated / len(questions):6.1f} tokens/query | {len(questions) / elapsed:7.2f} queries/s")
+        print(f"  e.g. {json.dumps(predictions[0])}")
+
+
+if __name__ == "__main__":
+    main()
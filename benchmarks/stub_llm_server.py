@@ -0,0 +1,158 @@
+"""Local OpenAI-compatible /chat/completions stub that injects latency, errors and overload.
+
+Requests up to `capacity` in flight are served in `latency` seconds plus
+`item_latency` per skeleton (with jitter); beyond that latency grows linearly
+with load, and beyond twice the capacity the stub answers 429 with
+Retry-After, like an overloaded vLLM. `error_rate` adds random 500s.
+
+The answer fills the prompt's DSL skeleton, or, for a prompt with several,
+returns a JSON array in which `element_error_rate` of the elements are malformed.
+
+Usage: python -m benchmarks.stub_llm_server [--port 8089] [--latency 0.2] [--capacity 16] [--error-rate 0.05]
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SKELETON_RE = re.compile(r"^DSL Skeleton: (.*)$", re.MULTILINE)
+PLACEHOLDER_RE = re.compile(r"\{\{\w+\}\}")
+
+
+@dataclass(slots=True)
+class StubBehaviour:
+    latency: float = 0.2
+    item_latency: float = 0.0
+    jitter: float = 0.5  # fraction of latency, uniform
+    capacity: int = 16
+    error_rate: float = 0.0
+    element_error_rate: float = 0.0
+    seed: int = 0
+
+
+def fill(skeleton: str) -> dict[str, object]:
+    dsl = PLACEHOLDER_RE.sub("Kitchen", skeleton)
+    return {
+        "final_dsl": dsl,
+        "nl_variants": [f"Casual: show {dsl} for the Kitchen", f"Formal: retrieve {dsl} in the Kitchen", "Indirect: Kitchen?"],
+    }
+
+
+def completion(messages: list[dict[str, str]], skeletons: list[str], broken: set[int]) -> dict[str, object]:
+    prompt = "\n".join(m["content"] for m in messages)
+    if len(skeletons) > 1:
+        items = [{"id": i} if i in broken else {"id": i, **fill(s)} for i, s in enumerate(skeletons, 1)]
+        content = json.dumps(items, indent=2)
+    else:
+        content = json.dumps(fill(skeletons[0]) if skeletons else {})
+    return {
+        "choices": [{"message": {"role": "assistant", "content": content}}],
+        # Rough token counts (4 characters per token) so clients can report tokens per sample.
+        "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4},
+    }
+
+
+class StubLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # the default backlog of 5 resets bursts of new connections
+
+    def __init__(self, address: tuple[str, int], behaviour: StubBehaviour):
+        super().__init__(address, _Handler)
+        self.behaviour = behaviour
+        self.in_flight = 0
+        self.served = 0
+        self.rejected = 0
+        self.lock = threading.Lock()
+        self.rng = random.Random(behaviour.seed)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: StubLLMServer
+    protocol_version = "HTTP/1.1"  # keep-alive, like a real endpoint
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+    def _reply(self, status: int, body: dict[str, object], headers: dict[str, str] | None = None) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self) -> None:
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        server, behaviour = self.server, self.server.behaviour
+        skeletons = SKELETON_RE.findall(request["messages"][-1]["content"])
+        with server.lock:
+            server.in_flight += 1
+            load = server.in_flight / behaviour.capacity
+            jitter = server.rng.uniform(1 - behaviour.jitter, 1 + behaviour.jitter)
+            failed = server.rng.random() < behaviour.error_rate
+            broken = {i for i in range(1, len(skeletons) + 1) if server.rng.random() < behaviour.element_error_rate}
+        try:
+            if load > 2:
+                with server.lock:
+                    server.rejected += 1
+                self._reply(429, {"error": "overloaded"}, {"Retry-After": "1"})
+                return
+            service_time = behaviour.latency + behaviour.item_latency * max(1, len(skeletons))
+            time.sleep(service_time * jitter * max(1.0, load))
+            if failed:
+                self._reply(500, {"error": "injected failure"})
+                return
+            with server.lock:
+                server.served += 1
+            self._reply(200, completion(request["messages"], skeletons, broken))
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+
+@contextmanager
+def serve(behaviour: StubBehaviour | None = None, port: int = 0) -> Iterator[StubLLMServer]:
+    """Runs the stub on a background thread; `port=0` picks a free port."""
+    server = StubLLMServer(("127.0.0.1", port), behaviour or StubBehaviour())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--capacity", type=int, default=16)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    args = parser.parse_args()
+
+    behaviour = StubBehaviour(latency=args.latency, capacity=args.capacity, error_rate=args.error_rate)
+    with serve(behaviour, args.port) as server:
+        print(f"Stub LLM listening on {server.url} (set OPENAI_API_URL to it); Ctrl+C to stop")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Tiny randomly initialized causal LM + BPE tokenizer built offline, for CPU benchmarks.
+
+`load_model(name)` loads a real Hugging Face model instead when a name is given.
+"""
+
+import random
+from typing import Any
+
+from src.config import Config
+from src.data_gen.generate import SkeletonGenerator
+from src.schema import AETHERIS_DB
+
+EOS_TOKEN = "<|endoftext|>"
+
+
+def _corpus(n_skeletons: int = 2000, seed: int = 0) -> list[str]:
+    generator = SkeletonGenerator(AETHERIS_DB)
+    texts = [Config.PROMPT_STYLE]
+    for table in AETHERIS_DB.tables:
+        texts.append(f"Table '{table.name}': {table.description}")
+        texts.extend(f"{c.name}: {c.description}" for c in table.columns)
+    # SkeletonGenerator draws from the global RNG; seed it so every run builds the same vocabulary.
+    state = random.getstate()
+    random.seed(seed)
+    try:
+        texts.extend(generator.generate_skeleton()["dsl_skeleton"] for _ in range(n_skeletons))
+    finally:
+        random.setstate(state)
+    return texts
+
+
+def build_tiny_model(vocab_size: int = 2000, n_layer: int = 2, n_embd: int = 64, seed: int = 0) -> tuple[Any, Any]:
+    """Returns (model, tokenizer); the tokenizer is a byte-level BPE trained on schema text."""
+    import torch
+    from tokenizers import Tokenizer, decoders, models, pre_tokenizers, trainers
+    from transformers import GPT2Config, GPT2LMHeadModel, PreTrainedTokenizerFast
+
+    bpe = Tokenizer(models.BPE())
+    bpe.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+    bpe.decoder = decoders.ByteLevel()
+    trainer = trainers.BpeTrainer(
+        vocab_size=vocab_size,
+        special_tokens=[EOS_TOKEN],
+        initial_alphabet=pre_tokenizers.ByteLevel.alphabet(),
+    )
+    bpe.train_from_iterator(_corpus(seed=seed), trainer=trainer)
+    tokenizer = PreTrainedTokenizerFast(tokenizer_object=bpe, eos_token=EOS_TOKEN, pad_token=EOS_TOKEN)
+
+    torch.manual_seed(seed)
+    config = GPT2Config(
+        vocab_size=len(tokenizer),
+        n_positions=Config.MAX_SEQ_LENGTH,
+        n_embd=n_embd,
+        n_layer=n_layer,
+        n_head=2,
+        bos_token_id=tokenizer.eos_token_id,
+        eos_token_id=tokenizer.eos_token_id,
+        pad_token_id=tokenizer.pad_token_id,
+    )
+    return GPT2LMHeadModel(config).eval(), tokenizer
+
+
+def load_model(name: str | None = None) -> tuple[Any, Any]:
+    """A real model by name (CPU), or the offline tiny model when `name` is None."""
+    if name is None:
+        return build_tiny_model()
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+
+    return AutoModelForCausalLM.from_pretrained(name).eval(), AutoTokenizer.from_pretrained(name)
+
+
+def fit_tiny_model(model: Any, tokenizer: Any, texts: list[str], steps: int = 300, batch_size: int = 8, lr: float = 3e-3) -> Any:
+    """A few hundred CPU steps of causal-LM training so the tiny model picks up the prompt format."""
+    import random
+
+    import torch
+
+    rng = random.Random(0)
+    optimizer = torch.optim.AdamW(model.parameters(), lr=lr)
+    model.train()
+    for _ in range(steps):
+        batch = tokenizer(rng.sample(texts, batch_size), return_tensors="pt", padding=True, truncation=True, max_length=512)
+        labels = batch["input_ids"].masked_fill(batch["attention_mask"] == 0, -100)
+        loss = model(**batch, labels=labels).loss
+        loss.backward()
+        optimizer.step()
+        optimizer.zero_grad()
+    return model.eval()
+
+
+class StaticRetriever:
+    """Retriever stub: the first `top_k` tables whose name appears in the query, else the first tables."""
+
+    def get_relevant_tables(self, query: str, top_k: int = 2) -> list:
+        hits = [t for t in AETHERIS_DB.tables if t.name in query]
+        return (hits + [t for t in AETHERIS_DB.tables if t not in hits])[:top_k]
+
+    def get_relevant_tables_batch(self, queries: list[str], top_k: int = 2) -> list[list]:
+        return [self.get_relevant_tables(q, top_k) for q in queries]
@@ -1,7 +1,11 @@
+import argparse
 import asyncio
 import json
 import logging
 import re
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
@@ -9,20 +13,95 @@ import httpx
 from tqdm.asyncio import tqdm
 
 from src.config import Config
+from src.data_gen.dedup import StreamingDeduper
 from src.data_gen.generate import SkeletonGenerator
+from src.data_gen.jsonio import JsonlSink, iter_jsonl, write_json_array
 from src.data_gen.prompt_factory import PromptFactory
+from src.data_gen.throttle import AdaptiveConcurrency, RetryPolicy, parse_retry_after
+from src.prompts import format_table
 from src.schema import AETHERIS_DB
 
 logging.basicConfig(level=logging.WARNING)
 logger = logging.getLogger(__name__)
 
 
+@dataclass(slots=True)
+class RunStats:
+    """Request outcomes of one MassGenerator.run; `requests` counts HTTP attempts, retries included."""
+
+    skeletons: int = 0
+    requests: int = 0
+    retries: int = 0
+    samples: int = 0
+    failures: int = 0
+    fallbacks: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    started: float = field(default_factory=time.perf_counter)
+    finished: float | None = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def requests_per_second(self) -> float:
+        return self.requests / self.elapsed if self.requests else 0.0
+
+    @property
+    def goodput(self) -> float:
+        """Samples written per second."""
+        return self.samples / self.elapsed if self.samples else 0.0
+
+    @property
+    def tokens_per_sample(self) -> float:
+        """LLM tokens (prompt + completion, as reported by the server) per sample written."""
+        return (self.prompt_tokens + self.completion_tokens) / self.samples if self.samples else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.skeletons} skeletons, {self.requests} requests ({self.retries} retries) in {self.elapsed:.1f}s: "
+            f"{self.requests_per_second:.2f} req/s, goodput {self.goodput:.2f} samples/s, "
+            f"{self.tokens_per_sample:.0f} tokens/sample, {self.samples} samples, {self.failures} failed, "
+            f"{self.fallbacks} batch fallbacks"
+        )
+
+
 class MassGenerator:
-    def __init__(self, concurrency: int = 10):
+    """Fills skeletons through the LLM with a pool of workers.
+
+    Skeletons are produced lazily into a bounded queue, so memory stays flat
+    however many are requested. With `adaptive`, the number of requests in
+    flight starts at `concurrency` and follows AdaptiveConcurrency up to
+    `max_concurrency` (default twice as many); otherwise it stays fixed.
+    429s, 5xx and transport errors are retried per `retry`. The HTTP client
+    keeps one keep-alive connection per worker.
+
+    With `batch_size` > 1, each request packs that many skeletons and asks for
+    a JSON array; elements are validated one by one and the skeletons whose
+    element is missing or malformed are retried as single requests.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 10,
+        timeout: float = 60.0,
+        adaptive: bool = True,
+        max_concurrency: int | None = None,
+        retry: RetryPolicy | None = None,
+        batch_size: int = 1,
+    ):
         self.generator = SkeletonGenerator(AETHERIS_DB)
         self.factory = PromptFactory()
         self.concurrency = concurrency
-        self.results: list[dict[str, Any]] = []
+        self.timeout = timeout
+        self.adaptive = adaptive
+        self.max_concurrency = (max_concurrency or 2 * concurrency) if adaptive else concurrency
+        self.retry = retry or RetryPolicy()
+        self.batch_size = batch_size
+        # State of the latest run, for reporting.
+        self.limiter: AdaptiveConcurrency | None = None
+        self.stats: RunStats | None = None
 
     def _extract_json(self, text: str) -> dict[str, Any] | None:
         """Extracts JSON from text, handling potential Markdown or noise."""
@@ -34,111 +113,258 @@ class MassGenerator:
         except (json.JSONDecodeError, ValueError):
             return None
 
-    async def fetch_sample(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore, pbar: tqdm) -> None:
-        async with semaphore:
-            skeleton = self.generator.generate_skeleton()
-            payload = {
-                "model": Config.LLM_MODEL_NAME,
-                "messages": [
-                    {"role": "system", "content": self.factory.get_system_prompt()},
-                    {"role": "user", "content": self.factory.get_user_prompt(skeleton)},
-                ],
-                "temperature": 0.8,
-                "max_tokens": 1024,
-            }
+    def _extract_json_array(self, text: str) -> list[Any] | None:
+        """Extracts a JSON array from text, handling potential Markdown or noise."""
+        try:
+            match = re.search(r"(\[.*\])", text, re.DOTALL)
+            if match:
+                data = json.loads(match.group(1))
+                return data if isinstance(data, list) else None
+            return None
+        except (json.JSONDecodeError, ValueError):
+            return None
 
+    @staticmethod
+    def _is_sample(data: Any) -> bool:
+        return (
+            isinstance(data, dict)
+            and isinstance(data.get("final_dsl"), str)
+            and isinstance(data.get("nl_variants"), list)
+            and all(isinstance(nl, str) for nl in data["nl_variants"])
+        )
+
+    @staticmethod
+    def _match_batch(items: list[Any], size: int) -> list[Any]:
+        """Batch answer elements aligned to the skeletons: by `id` when every element has a valid one, else by position."""
+        ids = [item.get("id") if isinstance(item, dict) else None for item in items]
+        if all(isinstance(i, int) and 1 <= i <= size for i in ids) and len(set(ids)) == len(ids):
+            by_id = dict(zip(ids, items, strict=True))
+            return [by_id.get(i) for i in range(1, size + 1)]
+        return (items + [None] * size)[:size]
+
+    def _write_sample(self, sink: JsonlSink, skeleton: dict[str, Any], data: dict[str, Any], stats: RunStats) -> None:
+        sink.write(
+            {
+                "table": skeleton["table_name"],
+                "context": skeleton,
+                "nl_variants": data["nl_variants"],
+                "dsl": data["final_dsl"],
+            },
+        )
+        stats.samples += 1
+
+    async def fetch_batch(self, client: httpx.AsyncClient, skeletons: list[dict[str, Any]], sink: JsonlSink, stats: RunStats) -> None:
+        """Fills several skeletons with one request, falling back to single requests for the elements that fail."""
+        if len(skeletons) == 1:
+            await self.fetch_sample(client, skeletons[0], sink, stats)
+            return
+        payload = {
+            "model": Config.LLM_MODEL_NAME,
+            "messages": [
+                {"role": "system", "content": self.factory.get_system_prompt(batch=True)},
+                {"role": "user", "content": self.factory.get_batch_user_prompt(skeletons)},
+            ],
+            "temperature": 0.8,
+            "max_tokens": 1024 * len(skeletons),
+        }
+
+        try:
+            result = await self._post(client, payload, stats)
+            items = self._extract_json_array(result["choices"][0]["message"]["content"]) or []
+        except Exception as e:
+            stats.failures += len(skeletons)
+            tqdm.write(f" [X] Batch request failed: {type(e).__name__}")
+            return
+
+        fallbacks = []
+        for skeleton, data in zip(skeletons, self._match_batch(items, len(skeletons)), strict=True):
+            if self._is_sample(data):
+                self._write_sample(sink, skeleton, data, stats)
+            else:
+                fallbacks.append(skeleton)
+        stats.fallbacks += len(fallbacks)
+        for skeleton in fallbacks:
+            await self.fetch_sample(client, skeleton, sink, stats)
+
+    async def fetch_sample(self, client: httpx.AsyncClient, skeleton: dict[str, Any], sink: JsonlSink, stats: RunStats) -> None:
+        payload = {
+            "model": Config.LLM_MODEL_NAME,
+            "messages": [
+                {"role": "system", "content": self.factory.get_system_prompt()},
+                {"role": "user", "content": self.factory.get_user_prompt(skeleton)},
+            ],
+            "temperature": 0.8,
+            "max_tokens": 1024,
+        }
+
+        try:
+            result = await self._post(client, payload, stats)
+            content = result["choices"][0]["message"]["content"]
+
+            data = self._extract_json(content)
+
+            if self._is_sample(data):
+                assert data is not None
+                self._write_sample(sink, skeleton, data, stats)
+            else:
+                stats.failures += 1
+                tqdm.write(f" [!] JSON mismatch in table: {skeleton['table_name']}")
+
+        except Exception as e:
+            stats.failures += 1
+            tqdm.write(f" [X] Request failed: {type(e).__name__}")
+
+    async def _post(self, client: httpx.AsyncClient, payload: dict[str, Any], stats: RunStats) -> dict[str, Any]:
+        """POSTs a chat completion, retrying overload responses and transport errors with backoff."""
+        assert self.limiter is not None
+        self.retry.on_first_attempt()
+        attempt = 0
+        while True:
+            await self.limiter.acquire()
+            started = time.perf_counter()
+            response: httpx.Response | None = None
+            error: Exception | None = None
             try:
-                response = await client.post(
-                    f"{Config.OPENAI_API_URL}/chat/completions",
-                    json=payload,
-                    timeout=60.0,
-                )
+                response = await client.post(f"{Config.OPENAI_API_URL}/chat/completions", json=payload)
+            except httpx.TransportError as e:
+                error = e
+            finally:
+                throttled = response is not None and response.status_code == 429
+                failed = error is not None or (response is not None and response.status_code >= 500)
+                await self.limiter.release(time.perf_counter() - started, failed, throttled)
+                stats.requests += 1
+
+            if not (failed or throttled):
+                assert response is not None
                 response.raise_for_status()
                 result = response.json()
-                content = result["choices"][0]["message"]["content"]
-
-                data = self._extract_json(content)
-
-                if data and "nl_variants" in data and "final_dsl" in data:
-                    self.results.append(
-                        {
-                            "table": skeleton["table_name"],
-                            "context": skeleton,
-                            "nl_variants": data["nl_variants"],
-                            "dsl": data["final_dsl"],
-                        },
-                    )
-                else:
-                    tqdm.write(f" [!] JSON mismatch in table: {skeleton['table_name']}")
-
-            except Exception as e:
-                tqdm.write(f" [X] Request failed: {type(e).__name__}")
-            finally:
-                pbar.update(1)
+                usage = result.get("usage") or {}
+                stats.prompt_tokens += usage.get("prompt_tokens", 0)
+                stats.completion_tokens += usage.get("completion_tokens", 0)
+                return result
+            retry_after = parse_retry_after(response.headers.get("Retry-After")) if response is not None else None
+            delay = self.retry.next_delay(attempt, retry_after)
+            if delay is None:
+                if error is not None:
+                    raise error
+                assert response is not None
+                raise httpx.HTTPStatusError(f"HTTP {response.status_code}", request=response.request, response=response)
+            stats.retries += 1
+            await asyncio.sleep(delay)
+            attempt += 1
 
-    async def run(self, total_skeletons: int):
-        semaphore = asyncio.Semaphore(self.concurrency)
+    async def _worker(
+        self,
+        client: httpx.AsyncClient,
+        queue: asyncio.Queue[list[dict[str, Any]] | None],
+        sink: JsonlSink,
+        stats: RunStats,
+        pbar: tqdm,
+    ) -> None:
+        while (skeletons := await queue.get()) is not None:
+            stats.skeletons += len(skeletons)
+            await self.fetch_batch(client, skeletons, sink, stats)
+            pbar.update(len(skeletons))
+
+    async def run(self, total_skeletons: int, output_path: Path, resume: bool = False) -> int:
+        """Streams samples to `output_path` (JSONL) and returns how many it holds.
+
+        With `resume`, samples already in the file count towards `total_skeletons`
+        and only the remainder is requested; otherwise the file is started afresh.
+        """
+        if not resume:
+            output_path.unlink(missing_ok=True)
         logging.getLogger("httpx").setLevel(logging.WARNING)
+        pool_size = self.max_concurrency
+        limits = httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+            keepalive_expiry=30.0,
+        )
+        # Built per run: its asyncio.Condition belongs to the running event loop.
+        minimum = 1 if self.adaptive else self.concurrency
+        self.limiter = AdaptiveConcurrency(self.concurrency, minimum=minimum, maximum=pool_size)
+        stats = self.stats = RunStats()
+
+        with JsonlSink(output_path) as sink:
+            remaining = max(total_skeletons - sink.count, 0)
+            if sink.count:
+                tqdm.write(f" [>] Resuming {output_path.name}: {sink.count} samples on disk, {remaining} to go")
+            queue: asyncio.Queue[list[dict[str, Any]] | None] = asyncio.Queue(maxsize=2 * pool_size)
+            async with httpx.AsyncClient(limits=limits, timeout=self.timeout) as client:
+                with tqdm(total=remaining, desc="Generating Dataset", unit="skel") as pbar:
+                    workers = [
+                        asyncio.create_task(self._worker(client, queue, sink, stats, pbar)) for _ in range(pool_size)
+                    ]
+                    try:
+                        for start in range(0, remaining, self.batch_size):
+                            size = min(self.batch_size, remaining - start)
+                            await queue.put([self.generator.generate_skeleton() for _ in range(size)])
+                        for _ in workers:
+                            await queue.put(None)
+                        await asyncio.gather(*workers)
+                    finally:
+                        for worker in workers:
+                            worker.cancel()
+            stats.finished = time.perf_counter()
+            tqdm.write(f" [=] {output_path.name}: {stats.summary()}; {self.limiter.summary()}")
+            return sink.count
 
-        async with httpx.AsyncClient() as client:
-            with tqdm(total=total_skeletons, desc="Generating Dataset", unit="skel") as pbar:
-                tasks = [self.fetch_sample(client, semaphore, pbar) for _ in range(total_skeletons)]
-                await asyncio.gather(*tasks)
 
-    def save_raw(self, path: Path):
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(self.results, f, indent=2, ensure_ascii=False)
+def flatten_records(raw_records: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+    """Transforms nested LLM responses into flat training pairs, one raw record at a time."""
+    for item in raw_records:
+        context = format_table(item["table"], item["context"]["table_description"], item["context"]["columns_info"])
+        for nl in item["nl_variants"]:
+            clean_nl = re.sub(r"^(Casual|Formal|Indirect|Variant \d|Short|Detailed|Question):\s*", "", nl, flags=re.IGNORECASE)
+            yield {"input": clean_nl.strip(), "context": context, "output": item["dsl"]}
 
 
-def flatten_dataset(raw_data_path: Path, output_path: Path):
+def flatten_dataset(
+    raw_data_path: Path,
+    output_path: Path,
+    deduper: StreamingDeduper | None = None,
+    against: StreamingDeduper | None = None,
+):
     """
-    Transforms nested LLM responses into flat training pairs.
+    Streams the raw JSONL samples into flat training pairs.
     Removed redundant 'instruction' field as it should be handled by the trainer.
+    With a `deduper`, exact and near duplicates (and anything already in `against`) are dropped on the way.
     """
     if not raw_data_path.exists():
         return
 
-    with open(raw_data_path, encoding="utf-8") as f:
-        raw_data = json.load(f)
-
-    flattened = []
-    for item in raw_data:
-        for nl in item["nl_variants"]:
-            clean_nl = re.sub(r"^(Casual|Formal|Indirect|Variant \d|Short|Detailed|Question):\s*", "", nl, flags=re.IGNORECASE)
-
-            flattened.append(
-                {
-                    "input": clean_nl.strip(),
-                    "context": (
-                        f"Table '{item['table']}': {item['context']['table_description']}. Columns: {item['context']['columns_info']}"
-                    ),
-                    "output": item["dsl"],
-                },
-            )
-
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(flattened, f, indent=2, ensure_ascii=False)
-    print(f"\n[DONE] Dataset cleaned and flattened. Final size: {len(flattened)} samples.")
+    records = flatten_records(iter_jsonl(raw_data_path))
+    if deduper is not None:
+        records = deduper.filter(records, against=against)
+    size = write_json_array(output_path, records)
+    print(f"\n[DONE] Dataset cleaned and flattened. Final size: {size} samples.")
+    if deduper is not None:
+        print(f"[DEDUP] {output_path.name}: {deduper.stats.summary()}")
 
 
-async def main():
+async def main(resume: bool = False, batch_size: int = 1):
     Config.ensure_dirs()
-    mg = MassGenerator(concurrency=50)
+    mg = MassGenerator(concurrency=50, batch_size=batch_size)
 
     # Generate Train dataset
-    await mg.run(total_skeletons=3500)
-    raw_path = Config.DATA_DIR / "dataset_raw_train.json"
-    mg.save_raw(raw_path)
+    raw_path = Config.DATA_DIR / "dataset_raw_train.jsonl"
+    await mg.run(total_skeletons=3500, output_path=raw_path, resume=resume)
     final_path = Config.DATA_DIR / "dataset_train.json"
-    flatten_dataset(raw_path, final_path)
+    train_dedup = StreamingDeduper()
+    flatten_dataset(raw_path, final_path, train_dedup)
 
     # Generate Test dataset
-    await mg.run(total_skeletons=100)
-    raw_path = Config.DATA_DIR / "dataset_raw_test.json"
-    mg.save_raw(raw_path)
+    raw_path = Config.DATA_DIR / "dataset_raw_test.jsonl"
+    await mg.run(total_skeletons=100, output_path=raw_path, resume=resume)
     final_path = Config.DATA_DIR / "dataset_test.json"
-    flatten_dataset(raw_path, final_path)
+    # Test samples that (nearly) repeat a train sample would overstate accuracy, so they are dropped too.
+    flatten_dataset(raw_path, final_path, StreamingDeduper(100_000), against=train_dedup)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resume", action="store_true", help="keep the raw samples on disk and generate only the rest")
+    parser.add_argument("--batch-size", type=int, default=1, help="skeletons packed into each LLM request")
+    args = parser.parse_args()
+    asyncio.run(main(resume=args.resume, batch_size=args.batch_size))
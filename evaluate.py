@@ -1,83 +1,85 @@
+import argparse
 import json
-
-from tqdm import tqdm
+from pathlib import Path
 
 from src.config import Config
-from src.engine.db import DBManager
-from src.engine.transpiler import AuraTranspiler
-from src.inference import AuraInference
-from src.schema import AETHERIS_DB
+from src.evaluation.harness import EvaluationEngine
+from src.evaluation.predictors import AuraPredictor, FakePredictor, Predictor
 
 MODEL_PATH = str(Config.BASE_DIR / "models" / "phi-4-auradsl-20251223_0845")
 DATASET_PATH: str = "data/dataset_test.json"
-
-
-class DSLValidator:
-    def __init__(self, model_path: str):
-        self.inference = AuraInference(model_path)
-        self.transpiler = AuraTranspiler(AETHERIS_DB)
-        self.db = DBManager(AETHERIS_DB)
-
-    def compare_results(self, expected_dsl: str, predicted_dsl: str) -> bool:
-        """Executes both queries and compares resulting data sets."""
-        try:
-            sql_exp, params_exp = self.transpiler.translate(expected_dsl)
-            sql_pred, params_pred = self.transpiler.translate(predicted_dsl)
-
-            res_exp = self.db.execute_query(sql_exp, params_exp)
-            res_pred = self.db.execute_query(sql_pred, params_pred)
-
-            return res_exp == res_pred
-        except Exception:
-            return False
-
-    def get_component_score(self, expected: str, predicted: str) -> float:
-        """Simple token-based similarity for components."""
-        exp_set = set(expected.replace("|>", "").split())
-        pred_set = set(predicted.replace("|>", "").split())
-        if not exp_set:
-            return 0.0
-        return len(exp_set.intersection(pred_set)) / len(exp_set)
-
-
-def run_evaluation(test_data_path: str, model_path: str):
+CHECKPOINT_DIR: str = "data/eval_results"
+RESULT_CACHE_PATH: str = "data/result_cache.db"
+
+
+def default_checkpoint_path(model_path: str, fake_error_rate: float | None = None) -> str:
+    """One checkpoint per model (or fake error rate), so runs of different predictors never mix."""
+    name = f"fake-{fake_error_rate:g}" if fake_error_rate is not None else Path(model_path).name
+    return f"{CHECKPOINT_DIR}/{name}.jsonl"
+
+
+def run_evaluation(
+    test_data_path: str,
+    model_path: str,
+    checkpoint_path: str | None = None,
+    db_path: str = Config.DB_PATH,
+    limit: int | None = None,
+    workers: int = 4,
+    batch_size: int = 32,
+    fake_error_rate: float | None = None,
+    result_cache_path: str | None = RESULT_CACHE_PATH,
+):
     with open(test_data_path) as f:
-        test_data = json.load(f)
-
-    validator = DSLValidator(model_path)
-
-    exec_matches = 0
-    total_comp_score = 0.0
-
-    results = []
-
-    for item in tqdm(test_data[:100], desc="Evaluating"):
-        expected_dsl = item["output"]
-        predicted_dsl = validator.inference.predict(item["input"])
-
-        # Execution Match
-        is_match = validator.compare_results(expected_dsl, predicted_dsl)
-        if is_match:
-            exec_matches += 1
-
-        # Component Score
-        score = validator.get_component_score(expected_dsl, predicted_dsl)
-        total_comp_score += score
-
-        results.append(
-            {
-                "input": item["input"],
-                "expected": expected_dsl,
-                "predicted": predicted_dsl,
-                "exec_match": is_match,
-                "comp_score": score,
-            },
-        )
+        test_data = json.load(f)[:limit]
+
+    predictor: Predictor
+    if fake_error_rate is not None:
+        predictor = FakePredictor({item["input"]: item["output"] for item in test_data}, error_rate=fake_error_rate)
+    else:
+        predictor = AuraPredictor(model_path)
+
+    engine = EvaluationEngine(
+        predictor,
+        Path(checkpoint_path or default_checkpoint_path(model_path, fake_error_rate)),
+        db_path,
+        workers=workers,
+        batch_size=batch_size,
+        result_cache_path=result_cache_path,
+    )
+    report = engine.run(test_data)
 
     print("\n--- EVALUATION RESULTS ---")
-    print(f"Execution Accuracy: {exec_matches / 100:.2%}")
-    print(f"Average Component Match: {total_comp_score / 100:.2%}")
+    print(f"Samples: {report.total} ({report.new_samples} new, {report.samples_per_sec:.1f} samples/s)")
+    print(f"Execution Accuracy: {report.exec_accuracy:.2%}")
+    print(f"Average Component Match: {report.avg_component:.2%}")
 
 
 if __name__ == "__main__":
-    run_evaluation(DATASET_PATH, MODEL_PATH)
+    parser = argparse.ArgumentParser(description="Execution-based evaluation of AuraDSL predictions.")
+    parser.add_argument("--dataset", default=DATASET_PATH)
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument(
+        "--checkpoint",
+        default=None,
+        help=f"JSONL of per-sample results, reused to resume (default: {CHECKPOINT_DIR}/<model or fake-RATE>.jsonl)",
+    )
+    parser.add_argument("--db", default=Config.DB_PATH)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--result-cache", default=RESULT_CACHE_PATH, help="persistent expected-result digests")
+    parser.add_argument("--no-result-cache", action="store_true")
+    parser.add_argument("--fake", type=float, default=None, metavar="ERROR_RATE", help="use the CPU fake predictor")
+    args = parser.parse_args()
+
+    run_evaluation(
+        args.dataset,
+        args.model,
+        checkpoint_path=args.checkpoint,
+        db_path=args.db,
+        limit=args.limit,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        fake_error_rate=args.fake,
+        result_cache_path=None if args.no_result_cache else args.result_cache,
+    )
@@ -1,45 +1,141 @@
-import random
-import sqlite3
+import argparse
+import time
 
-from faker import Faker
+import numpy as np
 
 from src.engine.db import DBManager
-from src.schema import AETHERIS_DB
-
-
-def seed_database(rows_per_table: int = 100):
-    db = DBManager(AETHERIS_DB)
-    db.setup_db()
-    faker = Faker()
-
-    rooms = ["Kitchen", "Living Room", "Garage", "Bedroom", "Home Cinema"]
-    devices = ["Lamp", "Sensor", "Thermostat", "Camera"]
-
-    with sqlite3.connect(db.db_path) as conn:
-        cursor = conn.cursor()
-        for _ in range(rows_per_table):
-            cursor.execute(
-                'INSERT INTO "climate_stats" (room, timestamp, temp, humidity, co2) VALUES (?, ?, ?, ?, ?)',
-                (
-                    random.choice(rooms),
-                    faker.date_time_this_year().isoformat(),
-                    random.uniform(18, 30),
-                    random.uniform(30, 60),
-                    random.randint(400, 1000),
-                ),
-            )
-            cursor.execute(
-                'INSERT INTO "energy_consumption" (device_id, timestamp, kwh, voltage) VALUES (?, ?, ?, ?)',
-                (
-                    f"{random.choice(devices)}_{random.randint(1, 5)}",
-                    faker.date_time_this_year().isoformat(),
-                    random.uniform(0.1, 5.0),
-                    220.0,
-                ),
-            )
-        conn.commit()
-    print(f"Database seeded with {rows_per_table} rows per table.")
+from src.schema import AETHERIS_DB, ColumnSchema, ColumnType, TableSchema
+
+# Value pools for TEXT columns without `categories` in the schema. Device-like
+# ids share one pool so joins between tables line up.
+DEVICE_KINDS = ["Lamp", "Sensor", "Thermostat", "Camera", "Plug", "Fridge", "Vacuum", "Purifier"]
+DEVICE_IDS = [f"{kind}_{i:03d}" for kind in DEVICE_KINDS for i in range(1, 11)]
+DEFAULT_VALUES: dict[str, list[str]] = {
+    "id": DEVICE_IDS,
+    "device_id": DEVICE_IDS,
+    "sensor_id": [f"Water_Meter_{i:02d}" for i in range(1, 9)],
+    "name": [d.replace("_", " ") for d in DEVICE_IDS],
+    "manufacturer": ["Philips", "Xiaomi", "Bosch", "Samsung", "Nest", "Ecobee", "Dyson", "iRobot"],
+    "authorized_person": ["Alice", "Bob", "Carol", "David", "Eve", "Unknown"],
+    "command_text": ["turn on the lights", "set temperature to 21", "play music", "lock the door", "start vacuum", "what's the weather"],
+}
+TIME_START = np.datetime64("2025-01-01T00:00:00", "s")
+TIME_SPAN_SECONDS = 365 * 24 * 3600
+
+
+def generate_column(rng: np.random.Generator, col: ColumnSchema, n: int) -> list:
+    """Generates `n` values for a column from its type, range and categories."""
+    if col.type in (ColumnType.INTEGER, ColumnType.REAL):
+        low = col.min_val if col.min_val is not None else 0
+        high = col.max_val if col.max_val is not None else 100
+        if col.type == ColumnType.INTEGER:
+            return rng.integers(int(low), int(high), size=n, endpoint=True).tolist()
+        return rng.uniform(low, high, size=n).round(2).tolist()
+
+    if col.type == ColumnType.DATETIME:
+        seconds = rng.integers(0, TIME_SPAN_SECONDS, size=n)
+        return np.datetime_as_string(TIME_START + seconds, unit="s").tolist()
+
+    if col.type == ColumnType.DATE:
+        days = rng.integers(0, 365, size=n)
+        return np.datetime_as_string(TIME_START.astype("datetime64[D]") + days, unit="D").tolist()
+
+    pool = col.categories or DEFAULT_VALUES.get(col.name) or [f"{col.name}_{i}" for i in range(100)]
+    return np.asarray(pool, dtype=object)[rng.integers(0, len(pool), size=n)].tolist()
+
+
+def seed_table(db: DBManager, rng: np.random.Generator, table: TableSchema, rows: int, batch_size: int) -> float:
+    """Bulk-inserts `rows` generated rows into a table; returns rows/sec."""
+    conn = db.connection()
+    cols = ", ".join(f'"{c.name}"' for c in table.columns)
+    placeholders = ", ".join("?" for _ in table.columns)
+    sql = f'INSERT INTO "{table.name}" ({cols}) VALUES ({placeholders})'
+
+    start = time.perf_counter()
+    written = 0
+    with conn:
+        while written < rows:
+            n = min(batch_size, rows - written)
+            columns = [generate_column(rng, c, n) for c in table.columns]
+            conn.executemany(sql, zip(*columns, strict=True))
+            written += n
+    return rows / max(time.perf_counter() - start, 1e-9)
+
+
+def seed_database(
+    rows_per_table: int = 100,
+    row_counts: dict[str, int] | None = None,
+    db_path: str = "data/aetheris.db",
+    batch_size: int = 100_000,
+    seed: int | None = None,
+    create_indexes: bool = False,
+    reset: bool = False,
+):
+    """Fills every table in the schema; `row_counts` overrides the per-table default."""
+    row_counts = row_counts or {}
+    unknown = set(row_counts) - {t.name for t in AETHERIS_DB.tables}
+    if unknown:
+        raise ValueError(f"Unknown tables: {', '.join(sorted(unknown))}")
+
+    rng = np.random.default_rng(seed)
+    with DBManager(AETHERIS_DB, db_path) as db:
+        db.setup_db()
+        conn = db.connection()
+        if reset:
+            with conn:
+                for table in AETHERIS_DB.tables:
+                    conn.execute(f'DELETE FROM "{table.name}"')
+
+        # No rollback journal or fsync during the load; a crash means re-seeding anyway.
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        total_rows, total_start = 0, time.perf_counter()
+        try:
+            for table in AETHERIS_DB.tables:
+                rows = row_counts.get(table.name, rows_per_table)
+                if rows <= 0:
+                    continue
+                rate = seed_table(db, rng, table, rows, batch_size)
+                total_rows += rows
+                print(f"  {table.name:<20} {rows:>12,} rows  {rate:>12,.0f} rows/s")
+        finally:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+
+        elapsed = time.perf_counter() - total_start
+        if create_indexes:
+            index_start = time.perf_counter()
+            db.setup_db(create_indexes=True)
+            print(f"Indexes built in {time.perf_counter() - index_start:.1f}s")
+
+    print(f"Database seeded with {total_rows:,} rows in {elapsed:.1f}s ({total_rows / max(elapsed, 1e-9):,.0f} rows/s).")
+
+
+def _parse_row_counts(items: list[str]) -> dict[str, int]:
+    counts: dict[str, int] = {}
+    for item in items:
+        name, _, value = item.partition("=")
+        counts[name] = int(value)
+    return counts
 
 
 if __name__ == "__main__":
-    seed_database()
+    parser = argparse.ArgumentParser(description="Bulk-seed the Aetheris database with synthetic rows.")
+    parser.add_argument("--rows", type=int, default=100, help="rows per table")
+    parser.add_argument("--table", action="append", default=[], metavar="NAME=ROWS", help="per-table override, repeatable")
+    parser.add_argument("--db", default="data/aetheris.db")
+    parser.add_argument("--batch-size", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--indexes", action="store_true", help="build advised indexes after the load")
+    parser.add_argument("--reset", action="store_true", help="delete existing rows first")
+    args = parser.parse_args()
+
+    seed_database(
+        rows_per_table=args.rows,
+        row_counts=_parse_row_counts(args.table),
+        db_path=args.db,
+        batch_size=args.batch_size,
+        seed=args.seed,
+        create_indexes=args.indexes,
+        reset=args.reset,
+    )
@@ -0,0 +1,107 @@
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Generic, TypeVar
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+@dataclass(slots=True)
+class CacheStats:
+    """Hit/miss counters for a cache level."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+
+class LatencyRecorder:
+    """Keeps the most recent latencies (seconds) and reports percentiles in ms."""
+
+    def __init__(self, window: int = 10_000):
+        self.samples: deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentiles(self, points: tuple[int, ...] = (50, 95, 99)) -> dict[str, float]:
+        if not self.samples:
+            return {f"p{p}": 0.0 for p in points}
+        ordered = sorted(self.samples)
+        last = len(ordered) - 1
+        return {f"p{p}": ordered[min(last, round(p / 100 * last))] * 1000 for p in points}
+
+
+@dataclass(slots=True)
+class TimedCacheStats:
+    """Hit/miss counters plus separate latency windows for hits and misses."""
+
+    counts: CacheStats = field(default_factory=CacheStats)
+    hit_latency: LatencyRecorder = field(default_factory=LatencyRecorder)
+    miss_latency: LatencyRecorder = field(default_factory=LatencyRecorder)
+
+    def record(self, hit: bool, seconds: float) -> None:
+        if hit:
+            self.counts.hits += 1
+            self.hit_latency.record(seconds)
+        else:
+            self.counts.misses += 1
+            self.miss_latency.record(seconds)
+
+    def summary(self) -> dict[str, object]:
+        return {
+            "hits": self.counts.hits,
+            "misses": self.counts.misses,
+            "hit_rate": round(self.counts.hit_rate, 4),
+            "hit_ms": self.hit_latency.percentiles(),
+            "miss_ms": self.miss_latency.percentiles(),
+        }
+
+
+class LRUCache(Generic[K, V]):
+    """Small least-recently-used mapping with hit/miss accounting."""
+
+    def __init__(self, maxsize: int = 1024):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive.")
+        self.maxsize = maxsize
+        self.stats = CacheStats()
+        self._data: OrderedDict[K, V] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._data
+
+    def get(self, key: K) -> V | None:
+        """Returns the cached value (marking it recently used) or None."""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.stats.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def put(self, key: K, value: V) -> None:
+        """Stores a value, evicting the least recently used entry if full."""
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.stats.evictions += 1
+
+    def clear(self) -> None:
+        """Drops all entries and resets the counters."""
+        self._data.clear()
+        self.stats = CacheStats()
@@ -1,29 +1,65 @@
 import os
+from collections.abc import Callable
+from functools import cache
 from pathlib import Path
+from typing import Generic, TypeVar
 
-from dotenv import load_dotenv
+T = TypeVar("T")
 
-load_dotenv()
+
+@cache
+def load_env() -> None:
+    """Loads `.env` into os.environ once, on the first setting read."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+
+class EnvSetting(Generic[T]):
+    """Class attribute read from the environment (after `.env`) on every access."""
+
+    def __init__(self, name: str, default: T, parse: Callable[[str], T] | None = None):
+        self.name = name
+        self.default = default
+        self.parse = parse
+
+    def __get__(self, obj: object, owner: type) -> T:
+        load_env()
+        raw = os.getenv(self.name)
+        if not raw:
+            return self.default
+        return self.parse(raw) if self.parse else raw  # type: ignore[return-value]
 
 
 class Config:
     """Centralized configuration for the pipeline."""
 
     # API & LLM Settings
-    OPENAI_API_URL: str = os.getenv("OPENAI_API_URL", "http://localhost:8000/v1")
-    OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "dummy")
-    LLM_MODEL_NAME: str = os.getenv("LLM_MODEL_NAME", "qwen3-235b-fp8")
+    OPENAI_API_URL = EnvSetting("OPENAI_API_URL", "http://localhost:8000/v1")
+    OPENAI_API_KEY = EnvSetting("OPENAI_API_KEY", "dummy")
+    LLM_MODEL_NAME = EnvSetting("LLM_MODEL_NAME", "qwen3-235b-fp8")
+
+    # Retrieval Settings
+    RETRIEVAL_BACKEND = EnvSetting("RETRIEVAL_BACKEND", "chroma")  # "chroma" or "numpy"
+    # Columns kept per retrieved table; unset = whole tables, as in the training prompts.
+    RETRIEVAL_MAX_COLUMNS = EnvSetting[int | None]("RETRIEVAL_MAX_COLUMNS", None, int)
+    # "table": rank tables by their table documents only, as in the training prompts; "fused": by their best hit of any kind.
+    RETRIEVAL_TABLE_RANKING = EnvSetting("RETRIEVAL_TABLE_RANKING", "table")
 
     # Training & Inference Settings
     MAX_SEQ_LENGTH: int = 2048
+    # GPU memory for KV state of shared prompt prefixes (0 = off). Opt-in until
+    # `bench_prefix_cache --unsloth` shows parity on the fine-tuned model.
+    PREFIX_CACHE_MB = EnvSetting("PREFIX_CACHE_MB", 0, int)
 
     # Project Paths
     BASE_DIR: Path = Path(__file__).parent.parent
     DATA_DIR: Path = BASE_DIR / "data"
     CHROMA_DIR: Path = DATA_DIR / "chroma"
+    VECTOR_INDEX_DIR: Path = DATA_DIR / "vector_index"
     DB_PATH: str = str(DATA_DIR / "aetheris.db")
 
-    # Prompt Template (Single Source of Truth)
+    # Plain-text prompt template; PromptBuilder falls back to it for tokenizers without a chat template
     PROMPT_STYLE: str = (
         "Below is an instruction that describes a task, paired with an input that provides further context. "
         "Write a response that appropriately completes the request.\n\n"
@@ -43,6 +79,3 @@ class Config:
         """Creates necessary directories if they don't exist."""
         cls.DATA_DIR.mkdir(parents=True, exist_ok=True)
         cls.CHROMA_DIR.mkdir(parents=True, exist_ok=True)
-
-
-Config.ensure_dirs()
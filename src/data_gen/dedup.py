@@ -0,0 +1,219 @@
+"""Streaming deduplication of generated (input, output) pairs, in one pass and fixed memory.
+
+- Exact duplicates: a hash of the normalized input and output.
+- Near duplicates: MinHash over character shingles of the normalized input,
+  split into LSH bands; a sample is a near duplicate when one of its bands
+  matches an earlier sample *with the same output*, so paraphrases of one
+  query are caught while questions that differ in a value are kept.
+
+Both go into Bloom filters sized by `expected_items`, so memory does not grow
+with the dataset. The price is a small false-positive rate: a unique sample
+is dropped with probability about `error_rate` (exact) plus `bands` x
+`error_rate` (near).
+
+Usage: python -m src.data_gen.dedup [--train data/dataset_train.json] [--test data/dataset_test.json] [--write]
+"""
+
+import argparse
+import math
+import re
+import unicodedata
+import zlib
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from hashlib import blake2b
+from pathlib import Path
+from typing import Any, Literal
+
+import numpy as np
+
+from src.config import Config
+from src.data_gen.jsonio import iter_json_array, write_json_array
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+Duplicate = Literal["exact", "near"]
+
+
+def normalize_text(text: str) -> str:
+    """Case, accents, punctuation and spacing folded away: what a paraphrase check should ignore."""
+    text = unicodedata.normalize("NFKC", text).lower()
+    return " ".join(re.sub(r"[^\w\s]", " ", text).split())
+
+
+def normalize_dsl(dsl: str) -> str:
+    # Operators and quotes are meaningful in DSL, so only case and spacing are folded.
+    return " ".join(dsl.lower().split())
+
+
+class BloomFilter:
+    """Fixed-size set membership with false positives at about `error_rate` up to `capacity` items."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.num_bits = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = np.zeros((self.num_bits + 7) // 8, dtype=np.uint8)
+        self._steps = np.arange(self.num_hashes, dtype=np.uint64)
+
+    @property
+    def nbytes(self) -> int:
+        return self.bits.nbytes
+
+    def _positions(self, keys: list[bytes]) -> np.ndarray:
+        """(len(keys), num_hashes) bit positions by double hashing one 128-bit digest per key."""
+        digests = b"".join(blake2b(key, digest_size=16).digest() for key in keys)
+        halves = np.frombuffer(digests, dtype=np.uint64).reshape(-1, 2)
+        return (halves[:, :1] + self._steps * halves[:, 1:]) % np.uint64(self.num_bits)
+
+    def add_many(self, keys: list[bytes]) -> np.ndarray:
+        """Adds keys; returns, per key, whether it was (probably) present already."""
+        positions = self._positions(keys)
+        byte_idx = (positions >> np.uint64(3)).astype(np.intp)
+        masks = np.left_shift(1, positions & np.uint64(7)).astype(np.uint8)
+        present = ((self.bits[byte_idx] & masks) != 0).all(axis=1)
+        np.bitwise_or.at(self.bits, byte_idx.ravel(), masks.ravel())
+        return present
+
+    def contains_many(self, keys: list[bytes]) -> np.ndarray:
+        positions = self._positions(keys)
+        byte_idx = (positions >> np.uint64(3)).astype(np.intp)
+        masks = np.left_shift(1, positions & np.uint64(7)).astype(np.uint8)
+        return ((self.bits[byte_idx] & masks) != 0).all(axis=1)
+
+
+class MinHasher:
+    """MinHash signatures over character shingles.
+
+    Each permutation is a multiply-add-shift hash of the shingle's 32-bit CRC,
+    ((a * h + b) mod 2**64) >> 32 with random 64-bit a and b, which is
+    2-independent and needs nothing wider than uint64.
+    """
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        top = np.iinfo(np.uint64).max
+        self._a = rng.integers(0, top, num_perm, dtype=np.uint64, endpoint=True)[:, None]
+        self._b = rng.integers(0, top, num_perm, dtype=np.uint64, endpoint=True)[:, None]
+
+    def signature(self, text: str) -> np.ndarray:
+        k = self.shingle_size
+        shingles = {text[i : i + k] for i in range(max(1, len(text) - k + 1))}
+        hashes = np.fromiter((zlib.crc32(s.encode()) for s in shingles), dtype=np.uint64, count=len(shingles))
+        return ((self._a * hashes + self._b) >> np.uint64(32)).astype(np.uint32).min(axis=1)
+
+
+@dataclass(slots=True)
+class DedupStats:
+    seen: int = 0
+    kept: int = 0
+    exact: int = 0
+    near: int = 0
+    leaked_exact: int = 0
+    leaked_near: int = 0
+
+    def summary(self) -> dict[str, int]:
+        return {
+            "seen": self.seen,
+            "kept": self.kept,
+            "exact_duplicates": self.exact,
+            "near_duplicates": self.near,
+            "leaked_exact": self.leaked_exact,
+            "leaked_near": self.leaked_near,
+        }
+
+
+class StreamingDeduper:
+    """One-pass exact + near-duplicate filter over records with `input` and `output` fields."""
+
+    def __init__(
+        self,
+        expected_items: int = 1_000_000,
+        error_rate: float = 1e-4,
+        num_perm: int = 128,
+        bands: int = 16,
+        shingle_size: int = 5,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands.")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm, shingle_size)
+        self.exact = BloomFilter(expected_items, error_rate)
+        self.near = BloomFilter(expected_items * bands, error_rate)
+        self.stats = DedupStats()
+
+    @property
+    def nbytes(self) -> int:
+        return self.exact.nbytes + self.near.nbytes
+
+    def _keys(self, input_text: str, output: str) -> tuple[bytes, list[bytes]]:
+        text = normalize_text(input_text)
+        dsl = normalize_dsl(output).encode()
+        exact_key = blake2b(text.encode() + b"\x00" + dsl, digest_size=16).digest()
+        output_key = blake2b(dsl, digest_size=8).digest()
+        signature = self.hasher.signature(text).reshape(self.bands, self.rows)
+        band_keys = [bytes([band]) + output_key + row.tobytes() for band, row in enumerate(signature)]
+        return exact_key, band_keys
+
+    def classify(self, input_text: str, output: str, add: bool = True) -> Duplicate | None:
+        """Whether the pair duplicates one seen before; with `add`, it is remembered either way."""
+        exact_key, band_keys = self._keys(input_text, output)
+        if add:
+            if self.exact.add_many([exact_key])[0]:
+                return "exact"
+            return "near" if self.near.add_many(band_keys).any() else None
+        if self.exact.contains_many([exact_key])[0]:
+            return "exact"
+        return "near" if self.near.contains_many(band_keys).any() else None
+
+    def filter(self, records: Iterable[dict[str, Any]], against: "StreamingDeduper | None" = None) -> Iterator[dict[str, Any]]:
+        """Yields the records that are neither duplicates of earlier ones nor, if given, of anything in `against`."""
+        stats = self.stats
+        for record in records:
+            stats.seen += 1
+            if against is not None:
+                leak = against.classify(record["input"], record["output"], add=False)
+                if leak is not None:
+                    if leak == "exact":
+                        stats.leaked_exact += 1
+                    else:
+                        stats.leaked_near += 1
+                    continue
+            duplicate = self.classify(record["input"], record["output"])
+            if duplicate == "exact":
+                stats.exact += 1
+            elif duplicate == "near":
+                stats.near += 1
+            else:
+                stats.kept += 1
+                yield record
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--train", type=Path, default=Config.DATA_DIR / "dataset_train.json")
+    parser.add_argument("--test", type=Path, default=Config.DATA_DIR / "dataset_test.json")
+    parser.add_argument("--expected-items", type=int, default=1_000_000)
+    parser.add_argument("--write", action="store_true", help="rewrite both files without duplicates and leaked test samples")
+    args = parser.parse_args()
+
+    train = StreamingDeduper(args.expected_items)
+    test = StreamingDeduper(max(1, args.expected_items // 10))
+    if args.write:
+        write_json_array(args.train, train.filter(iter_json_array(args.train)))
+        write_json_array(args.test, test.filter(iter_json_array(args.test), against=train))
+    else:
+        for _ in train.filter(iter_json_array(args.train)):
+            pass
+        for _ in test.filter(iter_json_array(args.test), against=train):
+            pass
+    logger.info("Dedup index memory: %.1f MB", (train.nbytes + test.nbytes) / 1e6)
+    logger.info("Train: %s", train.stats.summary())
+    logger.info("Test (vs train): %s", test.stats.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -51,6 +51,7 @@ class SkeletonGenerator:
 
         dsl_parts = [f"SOURCE {table.name}"]
         used_cols = set()
+        agg_cols: list[str] = []
 
         # 1. FILTER
         if complexity in ["filter", "agg", "full"]:
@@ -72,11 +73,13 @@ class SkeletonGenerator:
                 dsl_parts.append(f"AGGREGATE {func}({n_col.name}) BY {g_col.name}")
                 used_cols.add(n_col.name)
                 used_cols.add(g_col.name)
+                agg_cols = [n_col.name, g_col.name]
 
         # 3. SORT & LIMIT
         if complexity == "full":
-            sort_col = random.choice(table.columns)
-            dsl_parts.append(f"SORT {sort_col.name} DESC")
+            # A grouped result can only be sorted by its value or group column.
+            sort_col = random.choice(agg_cols or table.column_names)
+            dsl_parts.append(f"SORT {sort_col} DESC")
             dsl_parts.append("LIMIT 5")
 
         return {
@@ -89,6 +92,6 @@ class SkeletonGenerator:
     def _get_random_formatted_val(self, col: ColumnSchema) -> str:
         """Helper to wrap text placeholders in quotes and leave numbers raw."""
         val = self._get_value_skeleton(col)
-        if col.type in [ColumnType.TEXT, ColumnType.DATETIME]:
+        if col.type in [ColumnType.TEXT, ColumnType.DATETIME, ColumnType.DATE]:
             return f"'{val}'"
         return val
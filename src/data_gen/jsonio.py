@@ -0,0 +1,133 @@
+"""Streaming JSON / JSONL storage for generated datasets: crash-safe appends, resumable counts, O(1)-memory reads and writes."""
+
+import json
+import os
+import textwrap
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from types import TracebackType
+from typing import Any
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def count_jsonl(path: Path, chunk_size: int = 1 << 20) -> int:
+    """Number of complete records in a JSONL file, cutting off a line torn by a crash."""
+    if not path.exists():
+        return 0
+    lines = 0
+    end = 0  # offset just past the last newline
+    with open(path, "rb+") as f:
+        offset = 0
+        while chunk := f.read(chunk_size):
+            lines += chunk.count(b"\n")
+            last = chunk.rfind(b"\n")
+            if last >= 0:
+                end = offset + last + 1
+            offset += len(chunk)
+        if end < offset:
+            f.truncate(end)
+    return lines
+
+
+def iter_jsonl(path: Path) -> Iterator[dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning("Skipping malformed line %d of %s", line_no, path)
+
+
+class JsonlSink:
+    """Append-only JSONL output: one line per sample, flushed at once and fsynced every `fsync_every` lines.
+
+    A crash loses at most the samples since the last fsync, and `count` starts
+    at what is already on disk so a run can resume.
+    """
+
+    def __init__(self, path: Path, fsync_every: int = 50):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.count = count_jsonl(path)
+        self._file = open(path, "a", encoding="utf-8")  # noqa: SIM115
+        self._unsynced = 0
+
+    def write(self, record: dict[str, Any]) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.count += 1
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every:
+            self.sync()
+
+    def sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+    def __enter__(self) -> "JsonlSink":
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, exc: BaseException | None, tb: TracebackType | None) -> None:
+        self.close()
+
+
+def write_json_array(path: Path, records: Iterable[dict[str, Any]]) -> int:
+    """Writes records as an indented JSON array without holding them in memory; the file is replaced atomically."""
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    count = 0
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for record in records:
+            f.write(",\n" if count else "\n")
+            f.write(textwrap.indent(json.dumps(record, indent=2, ensure_ascii=False), "  "))
+            count += 1
+        f.write("\n]" if count else "]")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return count
+
+
+def iter_json_array(path: Path, chunk_size: int = 1 << 20) -> Iterator[Any]:
+    """Yields the elements of a top-level JSON array one at a time, reading the file in chunks."""
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as f:
+        buffer = ""
+        while not buffer and (chunk := f.read(chunk_size)):
+            buffer = chunk.lstrip()
+        if not buffer.startswith("["):
+            raise ValueError(f"{path} does not contain a JSON array")
+        pos, eof = 1, False
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buffer) and buffer[pos] == "]":
+                return
+            element, end = None, None
+            if pos < len(buffer):
+                try:
+                    element, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+            # Only trust an element followed by a delimiter: a number cut by the chunk boundary ("2." of "2.5") also decodes.
+            if end is None or end == len(buffer) or buffer[end] not in " \t\r\n,]":
+                if eof:
+                    raise ValueError(f"{path}: malformed or unterminated JSON array")
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            yield element
+            pos = end
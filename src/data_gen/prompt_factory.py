@@ -2,7 +2,12 @@ class PromptFactory:
     """Generates structured prompts for the LLM to fill DSL skeletons."""
 
     @staticmethod
-    def get_system_prompt() -> str:
+    def get_system_prompt(batch: bool = False) -> str:
+        output_rule = (
+            "5. Return ONLY a valid JSON array with one object per skeleton, in the given order."
+            if batch
+            else "5. Return ONLY a valid JSON object."
+        )
         return (
             "You are a specialized data synthesis agent for Aetheris Smart Home OS.\n"
             "Your goal is to convert technical DSL Skeletons into realistic training samples.\n\n"
@@ -14,19 +19,41 @@ class PromptFactory:
             "2. Replace placeholders (e.g., '{{ROOM_NAME}}') with realistic smart home values.\n"
             "3. Keep the DSL structure, operators, and single quotes EXACTLY as provided.\n"
             "4. Generate 3 diverse NL variants (Casual, Formal, Indirect).\n"
-            "5. Return ONLY a valid JSON object."
+            f"{output_rule}"
         )
 
     @staticmethod
-    def get_user_prompt(skeleton: dict) -> str:
+    def _describe(skeleton: dict) -> str:
         return (
             f"Table Name: {skeleton['table_name']}\n"
             f"Table Description: {skeleton['table_description']}\n"
             f"Columns Information: {skeleton['columns_info']}\n"
-            f"DSL Skeleton: {skeleton['dsl_skeleton']}\n\n"
+            f"DSL Skeleton: {skeleton['dsl_skeleton']}\n"
+        )
+
+    @staticmethod
+    def get_user_prompt(skeleton: dict) -> str:
+        return (
+            f"{PromptFactory._describe(skeleton)}\n"
             "Provide the result in this JSON format:\n"
             "{\n"
             '  "final_dsl": "the dsl with values instead of placeholders",\n'
             '  "nl_variants": ["variant 1", "variant 2", "variant 3"]\n'
             "}"
         )
+
+    @staticmethod
+    def get_batch_user_prompt(skeletons: list[dict]) -> str:
+        """Several skeletons in one request, answered as a JSON array of `id`-tagged objects."""
+        described = "\n".join(f"### Skeleton {i}\n{PromptFactory._describe(s)}" for i, s in enumerate(skeletons, 1))
+        return (
+            f"{described}\n"
+            f"Provide the results as a JSON array of exactly {len(skeletons)} objects, one per skeleton, in this format:\n"
+            "[\n"
+            "  {\n"
+            '    "id": 1,\n'
+            '    "final_dsl": "the dsl with values instead of placeholders",\n'
+            '    "nl_variants": ["variant 1", "variant 2", "variant 3"]\n'
+            "  }\n"
+            "]"
+        )
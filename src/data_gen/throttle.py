@@ -0,0 +1,139 @@
+"""Client-side flow control for the synthetic data LLM calls: AIMD concurrency and budgeted retries."""
+
+import asyncio
+import math
+import random
+import time
+
+
+class AdaptiveConcurrency:
+    """AIMD limit on in-flight requests, driven by error rate and latency.
+
+    Every healthy response adds 1/limit (about +1 per round of requests). The
+    limit is multiplied by `backoff` when the server throttles (429), when the
+    smoothed failure rate (5xx, timeouts) exceeds `error_tolerance`, or when
+    smoothed latency exceeds `latency_tolerance` times the best smoothed
+    latency seen; at most once per smoothed latency, so one burst of failures
+    counts as one decrease. `minimum == maximum` gives a fixed limit.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int = 1,
+        maximum: int = 64,
+        backoff: float = 0.7,
+        latency_tolerance: float = 2.0,
+        error_tolerance: float = 0.25,
+        smoothing: float = 0.1,
+        baseline_drift: float = 0.001,
+    ):
+        if not 1 <= minimum <= initial <= maximum:
+            raise ValueError("Expected 1 <= minimum <= initial <= maximum.")
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.error_tolerance = error_tolerance
+        self.smoothing = smoothing
+        # The baseline creeps up so one lucky early response cannot pin the limit down forever.
+        self.baseline_drift = baseline_drift
+        self.limit = float(initial)
+        self.in_flight = 0
+        self.decreases = 0
+        self.latency: float | None = None
+        self.error_rate = 0.0
+        self._baseline = math.inf
+        self._last_decrease = -math.inf
+        self._limit_sum = 0.0
+        self._releases = 0
+        self._cond = asyncio.Condition()
+
+    @property
+    def mean_limit(self) -> float:
+        return self._limit_sum / self._releases if self._releases else self.limit
+
+    async def acquire(self) -> None:
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self, seconds: float, failed: bool = False, throttled: bool = False) -> None:
+        async with self._cond:
+            self.in_flight -= 1
+            self._update(seconds, failed, throttled)
+            self._limit_sum += self.limit
+            self._releases += 1
+            self._cond.notify_all()
+
+    def _update(self, seconds: float, failed: bool, throttled: bool) -> None:
+        self.error_rate = (1 - self.smoothing) * self.error_rate + self.smoothing * (failed or throttled)
+        overloaded = throttled or self.error_rate > self.error_tolerance
+        if not (failed or throttled):
+            self.latency = seconds if self.latency is None else (1 - self.smoothing) * self.latency + self.smoothing * seconds
+            self._baseline = min(self.latency, self._baseline * (1 + self.baseline_drift))
+            overloaded = overloaded or self.latency > self.latency_tolerance * self._baseline
+        if not overloaded:
+            self.limit = min(float(self.maximum), self.limit + 1 / self.limit)
+            return
+        now = time.monotonic()
+        if now - self._last_decrease >= (self.latency or 0.0):
+            self.limit = max(float(self.minimum), self.limit * self.backoff)
+            self._last_decrease = now
+            self.decreases += 1
+
+    def summary(self) -> str:
+        return f"concurrency limit mean {self.mean_limit:.1f}, final {self.limit:.1f}, {self.decreases} decreases"
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, capped by a retry budget.
+
+    The budget is a token bucket holding up to `budget_reserve` retries and
+    refilled by `budget_ratio` per first attempt, so retries stay a bounded
+    fraction of traffic and an outage cannot turn into a retry storm.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        budget_ratio: float = 0.2,
+        budget_reserve: float = 10.0,
+        rng: random.Random | None = None,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget_ratio = budget_ratio
+        self.budget_reserve = budget_reserve
+        self.rng = rng or random.Random()
+        self.retries = 0
+        self.denied = 0
+        self._tokens = budget_reserve
+
+    def on_first_attempt(self) -> None:
+        self._tokens = min(self.budget_reserve, self._tokens + self.budget_ratio)
+
+    def next_delay(self, attempt: int, retry_after: float | None = None) -> float | None:
+        """Seconds to wait before retrying after failed `attempt` (0-based), or None to give up."""
+        if attempt + 1 >= self.max_attempts:
+            return None
+        if self._tokens < 1:
+            self.denied += 1
+            return None
+        self._tokens -= 1
+        self.retries += 1
+        delay = self.rng.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Retry-After given in seconds; HTTP dates are ignored."""
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
@@ -1,31 +1,126 @@
 import pathlib
 import sqlite3
+import threading
+from collections.abc import Iterable, Iterator
 from typing import Any
 
+from src.engine.index_advisor import IndexAdvisor, IndexSpec
 from src.schema import AetherisSchema
 
+DEFAULT_PRAGMAS: dict[str, str | int] = {
+    "journal_mode": "WAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,  # negative = KiB, i.e. 64 MiB of page cache
+    "temp_store": "MEMORY",
+}
+
 
 class DBManager:
-    """Manages SQLite database operations based on Pydantic schema."""
+    """Manages SQLite database operations based on Pydantic schema.
+
+    Connections are long-lived and pooled per thread, so repeated queries reuse
+    the parsed schema, the page cache and sqlite3's prepared-statement cache.
+    """
 
-    def __init__(self, schema: AetherisSchema, db_path: str = "data/aetheris.db"):
+    def __init__(
+        self,
+        schema: AetherisSchema,
+        db_path: str = "data/aetheris.db",
+        *,
+        read_only: bool = False,
+        statement_cache_size: int = 256,
+        pragmas: dict[str, str | int] | None = None,
+    ):
         self.schema = schema
         self.db_path = db_path
-        pathlib.Path("data").mkdir(exist_ok=True)
+        self.read_only = read_only
+        self.statement_cache_size = statement_cache_size
+        self.pragmas = dict(DEFAULT_PRAGMAS if pragmas is None else pragmas)
+        if read_only:
+            # Changing the journal mode is a write.
+            self.pragmas.pop("journal_mode", None)
+        else:
+            pathlib.Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Opens a new connection and applies the configured pragmas."""
+        if self.read_only:
+            target, uri = pathlib.Path(self.db_path).resolve().as_uri() + "?mode=ro", True
+        else:
+            target, uri = self.db_path, False
+        # Each connection is only used by the thread that opened it; the flag
+        # just lets close() run from another thread.
+        conn = sqlite3.connect(
+            target,
+            uri=uri,
+            cached_statements=self.statement_cache_size,
+            check_same_thread=False,
+        )
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """Returns this thread's pooled connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self) -> None:
+        """Closes every pooled connection."""
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
 
-    def setup_db(self) -> None:
-        """Initializes tables using schema definitions."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+    def __enter__(self) -> "DBManager":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def setup_db(self, create_indexes: bool = False) -> None:
+        """Initializes tables using schema definitions, optionally with advised indexes."""
+        conn = self.connection()
+        with conn:
             for table in self.schema.tables:
                 cols = ", ".join([f'"{c.name}" {c.type.value}' for c in table.columns])
                 query = f'CREATE TABLE IF NOT EXISTS "{table.name}" ({cols})'
-                cursor.execute(query)
-            conn.commit()
+                conn.execute(query)
+        if create_indexes:
+            self.create_indexes(IndexAdvisor(self.schema).recommend())
+
+    def create_indexes(self, specs: Iterable[IndexSpec]) -> None:
+        """Creates the given indexes and refreshes planner statistics."""
+        conn = self.connection()
+        with conn:
+            for spec in specs:
+                conn.execute(spec.create_sql())
+        conn.execute("ANALYZE")
+
+    def explain(self, sql: str, params: list[Any]) -> list[str]:
+        """Returns the EXPLAIN QUERY PLAN details for a query."""
+        rows = self.connection().execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        return [row[-1] for row in rows]
 
     def execute_query(self, sql: str, params: list[Any]) -> list[Any]:
         """Safely executes a parameterized SQL query."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(sql, params)
-            return cursor.fetchall()
+        return self.connection().execute(sql, params).fetchall()
+
+    def iter_query(self, sql: str, params: list[Any], chunk_size: int = 1000) -> Iterator[list[Any]]:
+        """Yields query results in chunks of at most `chunk_size` rows."""
+        cursor = self.connection().execute(sql, params)
+        try:
+            while chunk := cursor.fetchmany(chunk_size):
+                yield chunk
+        finally:
+            cursor.close()
@@ -0,0 +1,224 @@
+"""Character-level recognizer for canonically formatted AuraDSL, used to constrain decoding.
+
+Accepts exactly what SkeletonGenerator emits and AuraTranspiler compiles:
+
+    SOURCE <table> ( |> FILTER <column> <op> <literal>)*
+                   [ |> AGGREGATE <func>(<numeric column>) BY <text column>]
+                   [ |> SORT <column, or after AGGREGATE its value or group column> ASC|DESC]
+                   [ |> LIMIT <up to 4 digits>]
+
+with single spaces, columns from the SOURCE table, numbers for numeric columns
+and string literals of at most MAX_STRING_CHARS for the rest. With `closed_values`, strings for columns
+that have `categories` must be one of them.
+"""
+
+import re
+from collections.abc import Sequence
+
+from src.cache import LRUCache
+from src.engine.parser import STAGES
+from src.engine.transpiler import AGGREGATE_FUNCS, SQL_OPERATORS
+from src.schema import ColumnType, TableSchema
+
+# A terminal still to be matched: ("lit", text), ("word", role), ("string", column) or ("number", signed).
+Terminal = tuple[str, ...]
+# (table, level, pending terminals, partial match of pending[0], sortable); level
+# is the index of the last stage kind used, so stages can only move forward, and
+# sortable holds the AGGREGATE's columns, the only ones SORT may name after it.
+State = tuple[str, int, tuple[Terminal, ...], str, tuple[str, ...]]
+
+NUMERIC_TYPES = frozenset({ColumnType.INTEGER, ColumnType.REAL})
+PIPE: Terminal = ("lit", " |> ")
+NUMBER_RE = re.compile(r"-?d+(?:\.d+)?")
+# Caps that keep a degenerate model from spending the whole token budget on one literal.
+MAX_NUMBER_CHARS = 16
+MAX_LIMIT_DIGITS = 4
+MAX_STRING_CHARS = 32
+
+
+class AuraGrammar:
+    """Incremental recognizer over the given tables; states are hashable so callers can memoize on them."""
+
+    def __init__(self, tables: Sequence[TableSchema], closed_values: bool = False):
+        self.tables = {t.name: t for t in tables}
+        self.closed_values = closed_values
+        self.key = (tuple((t.name, tuple(t.column_names)) for t in tables), closed_values)
+        self._aggregatable = {
+            t.name: any(c.type in NUMERIC_TYPES for c in t.columns) and any(c.type == ColumnType.TEXT for c in t.columns)
+            for t in tables
+        }
+        self.initial: State = ("", -1, (("lit", "SOURCE "), ("word", "table")), "", ())
+        self._steps: dict[tuple[State, str], State | None] = {}
+
+    def _choices(self, role: str, table: str, level: int, sortable: tuple[str, ...] = ()) -> Sequence[str]:
+        if role == "table":
+            return list(self.tables)
+        if role == "stage":
+            # FILTER may repeat; every other stage kind appears at most once, in order.
+            stages = [s for i, s in enumerate(STAGES) if i > level or (i == 0 and level == 0)]
+            if "AGGREGATE" in stages and not self._aggregatable[table]:
+                stages.remove("AGGREGATE")  # it could not be completed
+            return stages
+        if role == "column":
+            return sortable or self.tables[table].column_names
+        if role == "filter_column":
+            return self.tables[table].column_names
+        if role == "numeric_column":
+            return [c.name for c in self.tables[table].columns if c.type in NUMERIC_TYPES]
+        if role == "text_column":
+            return [c.name for c in self.tables[table].columns if c.type == ColumnType.TEXT]
+        if role == "op":
+            return list(SQL_OPERATORS)
+        if role == "func":
+            return sorted(AGGREGATE_FUNCS)
+        return ("ASC", "DESC")
+
+    def _categories(self, table: str, column: str) -> list[str] | None:
+        if not self.closed_values:
+            return None
+        return next(c.categories for c in self.tables[table].columns if c.name == column)
+
+    def _complete(self, state: State) -> State:
+        """State after the current terminal of `state` (already fully matched) is consumed."""
+        table, level, pending, partial, sortable = state
+        head, rest = pending[0], pending[1:]
+        if head[0] != "word":
+            return (table, level, rest, "", sortable)
+        role = head[1]
+        if role == "table":
+            return (partial, 0, rest, "", ())
+        if role == "stage":
+            level = STAGES.index(partial)
+            body: tuple[Terminal, ...] = {
+                "FILTER": (("lit", " "), ("word", "filter_column")),
+                "AGGREGATE": (
+                    ("lit", " "),
+                    ("word", "func"),
+                    ("lit", "("),
+                    ("word", "numeric_column"),
+                    ("lit", ") BY "),
+                    ("word", "text_column"),
+                ),
+                "SORT": (("lit", " "), ("word", "column"), ("lit", " "), ("word", "direction")),
+                "LIMIT": (("lit", " "), ("number", "")),
+            }[partial]
+            return (table, level, body + rest, "", sortable)
+        if role in ("numeric_column", "text_column"):
+            # AGGREGATE's value column, then its group column.
+            return (table, level, rest, "", (*sortable, partial))
+        if role == "filter_column":
+            column = next(c for c in self.tables[table].columns if c.name == partial)
+            literal: Terminal = ("number", "signed") if column.type in NUMERIC_TYPES else ("string", column.name)
+            return (table, level, (("lit", " "), ("word", "op"), ("lit", " "), literal) + rest, "", sortable)
+        return (table, level, rest, "", sortable)
+
+    def _is_complete(self, state: State) -> bool:
+        """Whether pending[0] has been fully matched (it may still be extendable)."""
+        table, level, pending, partial, sortable = state
+        head = pending[0]
+        if head[0] == "lit":
+            return partial == head[1]
+        if head[0] == "word":
+            return partial in self._choices(head[1], table, level, sortable)
+        if head[0] == "string":
+            return False  # closing quote completes it inside step()
+        return bool(NUMBER_RE.fullmatch(partial))
+
+    def _advance(self, state: State, ch: str) -> State | None:
+        table, level, pending, partial, sortable = state
+        if not pending:
+            if level >= len(STAGES) - 1:
+                return None
+            return self._advance((table, level, (PIPE, ("word", "stage")), "", sortable), ch)
+
+        head = pending[0]
+        kind = head[0]
+        extended: State | None = None
+        if kind == "lit":
+            if head[1].startswith(partial + ch):
+                extended = (table, level, pending, partial + ch, sortable)
+        elif kind == "word":
+            if any(c.startswith(partial + ch) for c in self._choices(head[1], table, level, sortable)):
+                extended = (table, level, pending, partial + ch, sortable)
+        elif kind == "string":
+            # partial = opening quote, then the text so far when the value is one of `categories`,
+            # else one placeholder per character: only the length of free text matters.
+            if not partial:
+                return (table, level, pending, ch, sortable) if ch in "'\"" else None
+            categories = self._categories(table, head[1])
+            if ch == partial[0]:
+                return self._complete(state) if categories is None or partial[1:] in categories else None
+            if categories is None:
+                if ch == "\n" or len(partial) > MAX_STRING_CHARS:
+                    return None  # at the cap only the closing quote remains
+                return (table, level, pending, partial + "_", sortable)
+            if any(c.startswith(partial[1:] + ch) for c in categories):
+                return (table, level, pending, partial + ch, sortable)
+            return None
+        else:
+            signed = head[1] == "signed"
+            shape = _number_shape(partial, ch, signed)
+            if shape is not None and len(shape) <= (MAX_NUMBER_CHARS if signed else MAX_LIMIT_DIGITS):
+                extended = (table, level, pending, shape, sortable)
+
+        if extended is not None:
+            if kind == "lit" and extended[3] == head[1]:
+                return self._complete(extended)
+            return extended
+        # Words and numbers end where the next terminal begins.
+        if kind != "lit" and self._is_complete(state):
+            return self._advance(self._complete(state), ch)
+        return None
+
+    def step(self, state: State, ch: str) -> State | None:
+        """Next state after one character, or None if it cannot continue a valid query."""
+        key = (state, ch)
+        try:
+            return self._steps[key]
+        except KeyError:
+            result = self._steps[key] = self._advance(state, ch)
+            return result
+
+    def feed(self, state: State | None, text: str) -> State | None:
+        for ch in text:
+            if state is None:
+                return None
+            state = self.step(state, ch)
+        return state
+
+    def accepts(self, state: State) -> bool:
+        """Whether the text that led to `state` is a complete query."""
+        pending = state[2]
+        if pending:
+            if len(pending) > 1 or pending[0][0] == "lit" or not self._is_complete(state):
+                return False
+            state = self._complete(state)
+        return bool(state[0]) and not state[2]
+
+    def matches(self, text: str) -> bool:
+        state = self.feed(self.initial, text)
+        return state is not None and self.accepts(state)
+
+
+def _number_shape(partial: str, ch: str, signed: bool) -> str | None:
+    """Shape of a number so far with every digit as "d" (e.g. "-dd.d"), so states don't multiply per digit."""
+    if ch.isdigit() and ch.isascii():
+        return partial + "d"
+    if signed and ch == "-" and partial == "":
+        return "-"
+    if signed and ch == "." and partial.lstrip("-") and "." not in partial:
+        return partial + "."
+    return None
+
+
+_GRAMMARS: LRUCache[tuple[object, ...], AuraGrammar] = LRUCache(256)
+
+
+def grammar_for(tables: Sequence[TableSchema], closed_values: bool = False) -> AuraGrammar:
+    """Shared grammar per distinct table set, so step and mask memos are reused across queries."""
+    key = (tuple((t.name, tuple(t.column_names)) for t in tables), closed_values)
+    grammar = _GRAMMARS.get(key)
+    if grammar is None:
+        grammar = AuraGrammar(tables, closed_values)
+        _GRAMMARS.put(key, grammar)
+    return grammar
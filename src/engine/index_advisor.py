@@ -0,0 +1,89 @@
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from src.engine.nodes import Aggregate, Filter, Sort
+from src.engine.parser import parse
+from src.schema import AetherisSchema, ColumnType
+
+
+@dataclass(frozen=True, slots=True)
+class IndexSpec:
+    """A (possibly composite) index on one table."""
+
+    table: str
+    columns: tuple[str, ...]
+
+    @property
+    def name(self) -> str:
+        return f"idx_{self.table}_{'_'.join(self.columns)}"
+
+    def create_sql(self) -> str:
+        cols = ", ".join(f'"{c}"' for c in self.columns)
+        return f'CREATE INDEX IF NOT EXISTS "{self.name}" ON "{self.table}" ({cols})'
+
+
+class IndexAdvisor:
+    """Derives candidate indexes from the schema and from a DSL workload.
+
+    The DSL only filters and groups on columns and sorts on one column, so a
+    composite index ordered equality-filters, then sort/group column, then
+    range-filter covers every query shape it can produce.
+    """
+
+    def __init__(self, schema: AetherisSchema):
+        self.schema = schema
+
+    def from_schema(self) -> list[IndexSpec]:
+        """TEXT columns lead (filters, grouping), paired with the table's time column for SORT."""
+        specs: list[IndexSpec] = []
+        for table in self.schema.tables:
+            time_cols = [c.name for c in table.columns if c.type == ColumnType.DATETIME]
+            text_cols = [c.name for c in table.columns if c.type == ColumnType.TEXT]
+            for col in text_cols:
+                specs.append(IndexSpec(table.name, (col, *time_cols[:1])))
+            specs.extend(IndexSpec(table.name, (col,)) for col in time_cols)
+        return specs
+
+    def from_workload(self, dsl_queries: Iterable[str]) -> list[IndexSpec]:
+        """Indexes for the query shapes in a workload, most frequent first."""
+        counts: Counter[IndexSpec] = Counter()
+        for dsl in dsl_queries:
+            try:
+                query = parse(dsl)
+            except ValueError:
+                continue
+            table = self.schema.get_table(query.source.table)
+            if table is None:
+                continue
+            known = set(table.column_names)
+
+            equality: list[str] = []
+            ranged: list[str] = []
+            order: list[str] = []
+            for stage in query.stages:
+                if isinstance(stage, Filter):
+                    (equality if stage.op == "==" else ranged).append(stage.column)
+                elif isinstance(stage, Aggregate):
+                    order = [stage.group_by]
+                elif isinstance(stage, Sort):
+                    order = [stage.column]
+
+            columns = tuple(dict.fromkeys([*sorted(equality), *order, *ranged[:1]]))
+            if columns and all(c in known for c in columns):
+                counts[IndexSpec(table.name, columns)] += 1
+        return [spec for spec, _ in counts.most_common()]
+
+    def recommend(self, dsl_queries: Iterable[str] | None = None) -> list[IndexSpec]:
+        """Schema and workload candidates, minus indexes that a longer one already prefixes."""
+        candidates = list(dict.fromkeys([*self.from_workload(dsl_queries or []), *self.from_schema()]))
+        return [
+            spec
+            for spec in candidates
+            if not any(
+                other.table == spec.table
+                and len(other.columns) > len(spec.columns)
+                and other.columns[: len(spec.columns)] == spec.columns
+                for other in candidates
+            )
+        ]
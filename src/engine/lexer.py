@@ -0,0 +1,56 @@
+import re
+from typing import NamedTuple
+
+# One alternation, tried left to right at each position. Every branch is a
+# simple character class run, so scanning is a single linear pass.
+TOKEN_RE = re.compile(
+    r"""
+    (?P<WS>\s+)
+    |(?P<PIPE>\|>)
+    |(?P<OP>==|!=|<=|>=|<|>)
+    |(?P<LPAREN>\()
+    |(?P<RPAREN>\))
+    |(?P<STRING>'[^'\n]*'|"[^"\n]*")
+    |(?P<NUMBER>-?\d+(?:\.\d+)?(?![\w.]))
+    |(?P<IDENT>[A-Za-z_]\w*)
+    |(?P<ERROR>.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+LITERAL_KINDS = frozenset({"STRING", "NUMBER"})
+
+
+class DSLSyntaxError(ValueError):
+    """Raised when an AuraDSL query cannot be tokenized or parsed."""
+
+    def __init__(self, message: str, pos: int):
+        super().__init__(f"{message} at position {pos}")
+        self.pos = pos
+
+
+class Token(NamedTuple):
+    kind: str
+    value: str
+    pos: int
+
+
+def tokenize(text: str) -> list[Token]:
+    """Splits an AuraDSL query into tokens, dropping whitespace."""
+    tokens: list[Token] = []
+    for m in TOKEN_RE.finditer(text):
+        kind = m.lastgroup
+        if kind == "WS":
+            continue
+        if kind == "ERROR":
+            raise DSLSyntaxError(f"Unexpected character {m.group()!r}", m.start())
+        tokens.append(Token(kind, m.group(), m.start()))  # pyright: ignore[reportArgumentType]
+    tokens.append(Token("EOF", "", len(text)))
+    return tokens
+
+
+def literal_value(token: Token) -> str | int | float:
+    """Python value of a STRING or NUMBER token."""
+    if token.kind == "STRING":
+        return token.value[1:-1]
+    return float(token.value) if "." in token.value else int(token.value)
@@ -0,0 +1,87 @@
+"""AST node types for AuraDSL queries."""
+
+from typing import Any
+
+
+class Literal:
+    """A constant in the query; `slot` is its position among the query's literals."""
+
+    __slots__ = ("slot", "value")
+
+    def __init__(self, value: Any, slot: int):
+        self.value = value
+        self.slot = slot
+
+    def __repr__(self) -> str:
+        return f"Literal({self.value!r}, slot={self.slot})"
+
+
+class Source:
+    __slots__ = ("table",)
+
+    def __init__(self, table: str):
+        self.table = table
+
+    def __repr__(self) -> str:
+        return f"Source({self.table!r})"
+
+
+class Filter:
+    __slots__ = ("column", "op", "value")
+
+    def __init__(self, column: str, op: str, value: Literal):
+        self.column = column
+        self.op = op
+        self.value = value
+
+    def __repr__(self) -> str:
+        return f"Filter({self.column!r}, {self.op!r}, {self.value!r})"
+
+
+class Aggregate:
+    __slots__ = ("column", "func", "group_by")
+
+    def __init__(self, func: str, column: str, group_by: str):
+        self.func = func
+        self.column = column
+        self.group_by = group_by
+
+    def __repr__(self) -> str:
+        return f"Aggregate({self.func!r}, {self.column!r}, by={self.group_by!r})"
+
+
+class Sort:
+    __slots__ = ("column", "descending")
+
+    def __init__(self, column: str, descending: bool):
+        self.column = column
+        self.descending = descending
+
+    def __repr__(self) -> str:
+        return f"Sort({self.column!r}, descending={self.descending})"
+
+
+class Limit:
+    __slots__ = ("count",)
+
+    def __init__(self, count: Literal):
+        self.count = count
+
+    def __repr__(self) -> str:
+        return f"Limit({self.count!r})"
+
+
+Stage = Filter | Aggregate | Sort | Limit
+
+
+class Query:
+    """Root node: a SOURCE followed by the remaining pipeline stages in order."""
+
+    __slots__ = ("source", "stages")
+
+    def __init__(self, source: Source, stages: list[Stage]):
+        self.source = source
+        self.stages = stages
+
+    def __repr__(self) -> str:
+        return f"Query({self.source!r}, {self.stages!r})"
@@ -0,0 +1,90 @@
+from src.engine.lexer import LITERAL_KINDS, DSLSyntaxError, Token, literal_value, tokenize
+from src.engine.nodes import Aggregate, Filter, Limit, Literal, Query, Sort, Source, Stage
+
+# Stage kinds in the only order they may appear; FILTER alone may repeat.
+STAGES = ("FILTER", "AGGREGATE", "SORT", "LIMIT")
+
+
+class Parser:
+    """Recursive-descent parser for AuraDSL.
+
+    Grammar:
+        query     := SOURCE IDENT ("|>" filter)* ["|>" aggregate] ["|>" sort] ["|>" limit] EOF
+        filter    := FILTER IDENT OP literal
+        aggregate := AGGREGATE IDENT "(" IDENT ")" BY IDENT
+        sort      := SORT IDENT [ASC | DESC]
+        limit     := LIMIT NUMBER
+    """
+
+    def __init__(self, tokens: list[Token]):
+        self.tokens = tokens
+        self.index = 0
+        self.literal_count = 0
+
+    def _peek(self) -> Token:
+        return self.tokens[self.index]
+
+    def _advance(self) -> Token:
+        token = self.tokens[self.index]
+        self.index += 1
+        return token
+
+    def _expect(self, kind: str, value: str | None = None) -> Token:
+        token = self._advance()
+        if token.kind != kind or (value is not None and token.value != value):
+            expected = value or kind
+            raise DSLSyntaxError(f"Expected {expected}, got {token.value or token.kind!r}", token.pos)
+        return token
+
+    def _literal(self, kinds: frozenset[str] = LITERAL_KINDS) -> Literal:
+        token = self._advance()
+        if token.kind not in kinds:
+            raise DSLSyntaxError(f"Expected literal, got {token.value or token.kind!r}", token.pos)
+        node = Literal(literal_value(token), self.literal_count)
+        self.literal_count += 1
+        return node
+
+    def parse(self) -> Query:
+        self._expect("IDENT", "SOURCE")
+        source = Source(self._expect("IDENT").value)
+        stages: list[Stage] = []
+        level = -1
+        while self._peek().kind == "PIPE":
+            self._advance()
+            keyword = self._peek()
+            stages.append(self._stage())
+            # Reordered or repeated stages mean a different query; compile() must never rearrange them.
+            rank = STAGES.index(keyword.value)
+            if rank < level or rank == level != 0:
+                raise DSLSyntaxError(f"{keyword.value} cannot follow {STAGES[level]}; stages go FILTER* [AGGREGATE] [SORT] [LIMIT]", keyword.pos)
+            level = rank
+        self._expect("EOF")
+        return Query(source, stages)
+
+    def _stage(self) -> Stage:
+        keyword = self._expect("IDENT")
+        if keyword.value == "FILTER":
+            column = self._expect("IDENT").value
+            op = self._expect("OP").value
+            return Filter(column, op, self._literal())
+        if keyword.value == "AGGREGATE":
+            func = self._expect("IDENT").value
+            self._expect("LPAREN")
+            column = self._expect("IDENT").value
+            self._expect("RPAREN")
+            self._expect("IDENT", "BY")
+            return Aggregate(func, column, self._expect("IDENT").value)
+        if keyword.value == "SORT":
+            column = self._expect("IDENT").value
+            descending = False
+            if self._peek().kind == "IDENT" and self._peek().value in ("ASC", "DESC"):
+                descending = self._advance().value == "DESC"
+            return Sort(column, descending)
+        if keyword.value == "LIMIT":
+            return Limit(self._literal(frozenset({"NUMBER"})))
+        raise DSLSyntaxError(f"Unknown stage {keyword.value!r}", keyword.pos)
+
+
+def parse(text: str) -> Query:
+    """Parses an AuraDSL query into its AST."""
+    return Parser(tokenize(text)).parse()
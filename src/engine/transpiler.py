@@ -1,58 +1,148 @@
 import re
+from dataclasses import dataclass
 from typing import Any
 
+from src.cache import CacheStats, LRUCache
+from src.engine.lexer import LITERAL_KINDS, literal_value, tokenize
+from src.engine.nodes import Aggregate, Filter, Limit, Query, Sort
+from src.engine.parser import Parser
 from src.schema import AetherisSchema
 
+# Mirrors the lexer's STRING/NUMBER tokens so a template can be built with one
+# C-level substitution, without tokenizing on a cache hit.
+LITERAL_RE = re.compile(r"'([^'\n]*)'|\"([^\"\n]*)\"|(?<![\w.])(-?\d+(?:\.\d+)?)(?![\w.])")
+SQL_OPERATORS = {"==": "=", "!=": "!=", "<": "<", "<=": "<=", ">": ">", ">=": ">="}
+AGGREGATE_FUNCS = frozenset({"SUM", "AVG", "MAX", "MIN", "COUNT"})
+
+
+@dataclass(frozen=True, slots=True)
+class QueryPlan:
+    """Compiled SQL for a DSL template; `param_slots` index into the query's literals."""
+
+    sql: str
+    param_slots: tuple[int, ...]
+    ordered: bool = False
+
 
 class AuraTranspiler:
     """AuraDSL to SQL translator with identifier validation."""
 
-    def __init__(self, schema: AetherisSchema):
+    def __init__(self, schema: AetherisSchema, plan_cache_size: int = 1024):
         self.schema = schema
+        self.plan_cache: LRUCache[str, QueryPlan] = LRUCache(plan_cache_size)
+        self._columns = {t.name: frozenset(t.column_names) for t in schema.tables}
+
+    @property
+    def cache_stats(self) -> CacheStats:
+        """Hit/miss counters of the plan cache."""
+        return self.plan_cache.stats
+
+    @staticmethod
+    def normalize(dsl_query: str) -> tuple[str, list[Any]]:
+        """Splits a query into its shape template and the literal values it binds."""
+        literals: list[Any] = []
+
+        def _slot(match: re.Match[str]) -> str:
+            single, double, number = match.groups()
+            if number is not None:
+                if "." in number:
+                    literals.append(float(number))
+                    return "?f"
+                literals.append(int(number))
+                # Sign is part of the shape: LIMIT only accepts non-negative ints.
+                return "?n" if number.startswith("-") else "?i"
+            literals.append(single if single is not None else double)
+            return "?s"
+
+        return " ".join(LITERAL_RE.sub(_slot, dsl_query).split()), literals
+
+    def parse(self, dsl_query: str) -> Query:
+        """Parses a query into its AST."""
+        return Parser(tokenize(dsl_query)).parse()
+
+    def prepare(self, dsl_query: str) -> tuple[QueryPlan, list[Any]]:
+        """Returns the (possibly cached) plan for a query and its bound params."""
+        template, literals = self.normalize(dsl_query)
+        plan = self.plan_cache.get(template)
+        if plan is None:
+            parser = Parser(tokenize(dsl_query))
+            plan = self.compile(parser.parse())
+            # Only cache when the template saw the same literals as the lexer.
+            if parser.literal_count == len(literals):
+                self.plan_cache.put(template, plan)
+            else:
+                literals = [literal_value(t) for t in parser.tokens if t.kind in LITERAL_KINDS]
+        return plan, [literals[i] for i in plan.param_slots]
 
     def translate(self, dsl_query: str) -> tuple[str, list[Any]]:
         """Translates DSL to SQL returning (query_string, params)."""
-        parts = [p.strip() for p in dsl_query.split("|>")]
+        plan, params = self.prepare(dsl_query)
+        return plan.sql, params
+
+    def compile(self, query: Query) -> QueryPlan:
+        """Generates SQL by walking a parsed query, validating every identifier."""
+        table = query.source.table
+        columns = self._columns.get(table)
+        if columns is None:
+            raise ValueError(f"Table {table} not in whitelist.")
+
+        def _column(name: str) -> str:
+            if name not in columns:
+                raise ValueError(f"Column {name} not in table {table}.")
+            return f'"{name}"'
 
-        table_name = ""
         where_clauses: list[str] = []
-        params: list[Any] = []
+        param_slots: list[int] = []
         select_cols = "*"
         group_by = ""
+        aggregate: Aggregate | None = None
+        aggregate_expr = ""
+        sort: Sort | None = None
+        limit_slot: int | None = None
+
+        for stage in query.stages:
+            if isinstance(stage, Filter):
+                where_clauses.append(f"{_column(stage.column)} {SQL_OPERATORS[stage.op]} ?")
+                param_slots.append(stage.value.slot)
+
+            elif isinstance(stage, Aggregate):
+                if stage.func not in AGGREGATE_FUNCS:
+                    raise ValueError(f"Aggregate function {stage.func} not supported.")
+                group_col = _column(stage.group_by)
+                aggregate = stage
+                aggregate_expr = f"{stage.func}({_column(stage.column)})"
+                select_cols = f"{group_col}, {aggregate_expr}"
+                group_by = f"GROUP BY {group_col}"
+
+            elif isinstance(stage, Sort):
+                sort = stage
+
+            elif isinstance(stage, Limit):
+                count = stage.count.value
+                if not isinstance(count, int) or count < 0:
+                    raise ValueError(f"LIMIT expects a non-negative integer, got {count}.")
+                limit_slot = stage.count.slot
+
+        order_by = ""
+        if sort is not None:
+            sort_expr = _column(sort.column)
+            if aggregate is not None:
+                # Any other column would be an arbitrary row's value per group, and so would its order.
+                if sort.column not in (aggregate.column, aggregate.group_by):
+                    raise ValueError(f"After AGGREGATE, SORT must use {aggregate.column} or {aggregate.group_by}, got {sort.column}.")
+                if sort.column != aggregate.group_by:
+                    sort_expr = aggregate_expr
+            order_by = f"ORDER BY {sort_expr} {'DESC' if sort.descending else 'ASC'}"
 
-        for part in parts:
-            if part.startswith("SOURCE"):
-                raw_table = part.replace("SOURCE", "").strip()
-                target_table = self.schema.get_table(raw_table)
-                if not target_table:
-                    raise ValueError(f"Table {raw_table} not in whitelist.")
-                table_name = f'"{target_table.name}"'
-
-            elif part.startswith("FILTER"):
-                # Regex for: column == 'value'
-                match = re.search(r"(\w+)\s*==\s*['\"](.+?)['\"]", part)
-                if match:
-                    col, val = match.groups()
-                    table_obj = self.schema.get_table(table_name.strip('"'))
-                    if table_obj and col in table_obj.column_names:
-                        where_clauses.append(f'"{col}" = ?')
-                        params.append(val)
-
-            elif part.startswith("AGGREGATE"):
-                # AGGREGATE SUM(kwh) BY device_id
-                match = re.match(r"AGGREGATE\s+(\w+)\((\w+)\)\s+BY\s+(\w+)", part)
-                if match:
-                    func, col, group_col = match.groups()
-                    # Validate columns
-                    table_obj = self.schema.get_table(table_name.strip('"'))
-                    if table_obj and all(c in table_obj.column_names for c in [col, group_col]):
-                        select_cols = f'"{group_col}", {func}("{col}")'
-                        group_by = f'GROUP BY "{group_col}"'
-
-        query_parts = [f"SELECT {select_cols}", f"FROM {table_name}"]
+        query_parts = [f"SELECT {select_cols}", f'FROM "{table}"']
         if where_clauses:
             query_parts.append(f"WHERE {' AND '.join(where_clauses)}")
         if group_by:
             query_parts.append(group_by)
+        if order_by:
+            query_parts.append(order_by)
+        if limit_slot is not None:
+            query_parts.append("LIMIT ?")
+            param_slots.append(limit_slot)
 
-        return " ".join(query_parts), params
+        return QueryPlan(" ".join(query_parts), tuple(param_slots), ordered=bool(order_by))
@@ -0,0 +1,171 @@
+import json
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from tqdm import tqdm
+
+from src.evaluation.predictors import Predictor
+from src.evaluation.result_cache import database_fingerprint
+from src.evaluation.validator import DSLValidator
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Per-process validator, created by the pool initializer so every worker owns
+# its own SQLite connections.
+_VALIDATOR: DSLValidator | None = None
+
+
+def _init_worker(db_path: str, result_cache_path: str | None, fingerprint: str | None) -> None:
+    global _VALIDATOR
+    _VALIDATOR = DSLValidator(db_path, result_cache_path, fingerprint=fingerprint)
+
+
+def _score_batch(samples: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Transpiles and executes expected vs predicted DSL for a batch of samples."""
+    assert _VALIDATOR is not None, "worker not initialized"
+    for sample in samples:
+        sample["exec_match"] = _VALIDATOR.compare_results(sample["expected"], sample["predicted"])
+        sample["comp_score"] = _VALIDATOR.get_component_score(sample["expected"], sample["predicted"])
+    return samples
+
+
+@dataclass(slots=True)
+class EvaluationReport:
+    total: int
+    exec_matches: int
+    comp_score_sum: float
+    new_samples: int
+    elapsed: float
+
+    @property
+    def exec_accuracy(self) -> float:
+        return self.exec_matches / self.total if self.total else 0.0
+
+    @property
+    def avg_component(self) -> float:
+        return self.comp_score_sum / self.total if self.total else 0.0
+
+    @property
+    def samples_per_sec(self) -> float:
+        return self.new_samples / self.elapsed if self.elapsed else 0.0
+
+
+class EvaluationEngine:
+    """Batched prediction feeding a process pool of SQL workers, checkpointed to JSONL.
+
+    Each finished sample is appended to `checkpoint_path` with the predictor's
+    name; rerunning with the same file skips samples already recorded for the
+    same input and expected DSL. A checkpoint written by another predictor is
+    refused rather than reported as this one's results.
+    """
+
+    def __init__(
+        self,
+        predictor: Predictor,
+        checkpoint_path: Path,
+        db_path: str = "data/aetheris.db",
+        workers: int = 4,
+        batch_size: int = 32,
+        result_cache_path: str | None = None,
+    ):
+        self.predictor = predictor
+        self.checkpoint_path = checkpoint_path
+        self.db_path = db_path
+        self.workers = workers
+        self.batch_size = batch_size
+        self.result_cache_path = result_cache_path
+
+    def load_checkpoint(self) -> dict[int, dict[str, Any]]:
+        """Finished samples by index; a torn last line from a crash is ignored."""
+        done: dict[int, dict[str, Any]] = {}
+        if not self.checkpoint_path.exists():
+            return done
+        with open(self.checkpoint_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                done[record["index"]] = record
+        return done
+
+    def run(self, test_data: list[dict[str, Any]]) -> EvaluationReport:
+        predictor = self.predictor.name
+        records = self.load_checkpoint()
+        foreign = sorted({str(r.get("predictor")) for r in records.values()} - {predictor})
+        if foreign:
+            raise ValueError(
+                f"{self.checkpoint_path} holds results of {', '.join(foreign)}, not {predictor}; "
+                "use another checkpoint path or delete it.",
+            )
+        done = {
+            i: record
+            for i, record in records.items()
+            if i < len(test_data) and (record["input"], record["expected"]) == (test_data[i]["input"], test_data[i]["output"])
+        }
+        if len(done) < len(records):
+            logger.info("Ignoring %d checkpoint records that no longer match the dataset", len(records) - len(done))
+        pending = [i for i in range(len(test_data)) if i not in done]
+        if done:
+            logger.info("Resuming: %d/%d samples already evaluated", len(done), len(test_data))
+
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        # Taken once, before any worker opens the database, so every worker uses the same cache keys.
+        fingerprint = database_fingerprint(self.db_path) if self.result_cache_path else None
+        start = time.perf_counter()
+        with (
+            open(self.checkpoint_path, "a", encoding="utf-8") as out,
+            # Spawn, not fork: the predictor may already hold torch/CUDA state and threads,
+            # which a forked child inherits half-initialized.
+            ProcessPoolExecutor(
+                self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.db_path, self.result_cache_path, fingerprint),
+            ) as pool,
+            tqdm(total=len(test_data), initial=len(done), desc="Evaluating") as pbar,
+        ):
+            in_flight: set[Future[list[dict[str, Any]]]] = set()
+
+            def _drain(block: bool) -> None:
+                nonlocal in_flight
+                finished, in_flight = wait(in_flight, timeout=None if block else 0, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    for record in future.result():
+                        done[record["index"]] = record
+                        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    out.flush()
+                    pbar.update(len(future.result()))
+
+            for offset in range(0, len(pending), self.batch_size):
+                indices = pending[offset : offset + self.batch_size]
+                predictions = self.predictor.predict_batch([test_data[i]["input"] for i in indices])
+                samples = [
+                    {
+                        "index": i,
+                        "predictor": predictor,
+                        "input": test_data[i]["input"],
+                        "expected": test_data[i]["output"],
+                        "predicted": predicted,
+                    }
+                    for i, predicted in zip(indices, predictions, strict=True)
+                ]
+                # SQL for this batch runs in the pool while the next batch is predicted.
+                in_flight.add(pool.submit(_score_batch, samples))
+                _drain(block=len(in_flight) > 2 * self.workers)
+
+            while in_flight:
+                _drain(block=True)
+
+        return EvaluationReport(
+            total=len(done),
+            exec_matches=sum(1 for r in done.values() if r["exec_match"]),
+            comp_score_sum=sum(r["comp_score"] for r in done.values()),
+            new_samples=len(pending),
+            elapsed=time.perf_counter() - start,
+        )
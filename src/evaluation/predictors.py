@@ -0,0 +1,48 @@
+import random
+from pathlib import Path
+from typing import Protocol
+
+
+class Predictor(Protocol):
+    """Anything that turns a batch of NL queries into AuraDSL.
+
+    `name` identifies the predictor in checkpoints, so results of one model
+    are never resumed as another's.
+    """
+
+    name: str
+
+    def predict_batch(self, queries: list[str]) -> list[str]: ...
+
+
+class AuraPredictor:
+    """Adapter around the fine-tuned model; loads it on construction."""
+
+    def __init__(self, model_path: str, batch_size: int = 16):
+        from src.inference import AuraInference  # heavy (unsloth/torch), only for real runs
+
+        self.name = f"model:{Path(model_path).resolve()}"
+        self.inference = AuraInference(model_path, batch_size=batch_size)
+
+    def predict_batch(self, queries: list[str]) -> list[str]:
+        return self.inference.predict_batch(queries)
+
+
+class FakePredictor:
+    """CPU-only stand-in that answers from reference DSL, optionally corrupting some answers."""
+
+    def __init__(self, references: dict[str, str], error_rate: float = 0.0, seed: int = 0):
+        self.name = f"fake:error_rate={error_rate:g},seed={seed}"
+        self.references = references
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+
+    def predict_batch(self, queries: list[str]) -> list[str]:
+        predictions: list[str] = []
+        for query in queries:
+            dsl = self.references.get(query, "")
+            if dsl and self.rng.random() < self.error_rate:
+                # Drop the last stage: still valid DSL, usually a different result.
+                dsl = dsl.rsplit("|>", 1)[0].strip() if "|>" in dsl else dsl + " |> LIMIT 0"
+            predictions.append(dsl)
+        return predictions
@@ -0,0 +1,67 @@
+import hashlib
+import json
+import os
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+# Bump when the digest format changes so stale entries are never matched.
+DIGEST_VERSION = 2
+
+
+@dataclass(frozen=True, slots=True)
+class ResultDigest:
+    """Compact stand-in for a result set: row count plus a hash of the rows."""
+
+    row_count: int
+    digest: str
+
+
+def database_fingerprint(db_path: str) -> str:
+    """Identifies a database snapshot by path, size and modification time.
+
+    An empty WAL holds no data: read-only connections create or touch it, so it
+    is left out, otherwise merely opening the database would change the key.
+    """
+    stat = os.stat(db_path)
+    wal = Path(f"{db_path}-wal")
+    wal_stat = wal.stat() if wal.exists() else None
+    wal_state = (wal_stat.st_size, wal_stat.st_mtime_ns) if wal_stat and wal_stat.st_size else None
+    raw = json.dumps([str(Path(db_path).resolve()), stat.st_size, stat.st_mtime_ns, wal_state])
+    return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+
+class ResultCache:
+    """Persistent (SQL, params, database) -> ResultDigest store, shared across runs and processes."""
+
+    def __init__(self, path: str = "data/result_cache.db"):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, row_count INTEGER NOT NULL, digest TEXT NOT NULL)",
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def key(sql: str, params: list[Any], fingerprint: str) -> str:
+        raw = json.dumps([DIGEST_VERSION, " ".join(sql.split()), params, fingerprint], default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, sql: str, params: list[Any], fingerprint: str) -> ResultDigest | None:
+        row = self.conn.execute(
+            "SELECT row_count, digest FROM results WHERE key = ?",
+            (self.key(sql, params, fingerprint),),
+        ).fetchone()
+        return ResultDigest(row[0], row[1]) if row else None
+
+    def put(self, sql: str, params: list[Any], fingerprint: str, result: ResultDigest) -> None:
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO results (key, row_count, digest) VALUES (?, ?, ?)",
+                (self.key(sql, params, fingerprint), result.row_count, result.digest),
+            )
+
+    def close(self) -> None:
+        self.conn.close()
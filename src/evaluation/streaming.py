@@ -0,0 +1,81 @@
+import hashlib
+from collections.abc import Iterable, Iterator
+from itertools import chain, zip_longest
+from typing import Any
+
+from src.evaluation.result_cache import ResultDigest
+
+_MOD = 1 << 128
+_SENTINEL = object()
+
+
+def row_hash(row: Any) -> bytes:
+    """Stable 128-bit hash of one result row."""
+    return hashlib.blake2b(repr(tuple(row)).encode(), digest_size=16).digest()
+
+
+class StreamingDigest:
+    """Incremental result-set digest with O(1) state.
+
+    Ordered results chain row hashes into one running hash. Unordered results
+    sum them modulo 2**128, which is a multiset hash: any permutation of the
+    same rows gives the same value.
+    """
+
+    def __init__(self, ordered: bool):
+        self.ordered = ordered
+        self.row_count = 0
+        self._chain = hashlib.blake2b(digest_size=16)
+        self._sum = 0
+
+    def update(self, rows: Iterable[Any]) -> None:
+        for row in rows:
+            h = row_hash(row)
+            self.row_count += 1
+            if self.ordered:
+                self._chain.update(h)
+            else:
+                self._sum = (self._sum + int.from_bytes(h, "little")) % _MOD
+
+    def result(self) -> ResultDigest:
+        value = self._chain.hexdigest() if self.ordered else f"{self._sum:032x}"
+        return ResultDigest(self.row_count, value)
+
+
+def digest_chunks(chunks: Iterable[list[Any]], ordered: bool, max_rows: int | None = None) -> ResultDigest:
+    """Digests a chunked result stream.
+
+    Stops reading once more than `max_rows` rows were seen; the partial digest
+    then has a larger row count and can never equal the reference.
+    """
+    digest = StreamingDigest(ordered)
+    for chunk in chunks:
+        digest.update(chunk)
+        if max_rows is not None and digest.row_count > max_rows:
+            break
+    return digest.result()
+
+
+def streams_equal(left: Iterable[list[Any]], right: Iterable[list[Any]], ordered: bool) -> bool:
+    """Compares two chunked result streams with bounded memory.
+
+    Ordered streams are compared row by row and stop at the first divergence;
+    unordered ones compare multiset digests, stopping early if one side runs out.
+    Rows are equal when their `row_hash` is, as with cached digests, so 1 and
+    1.0 differ on both paths.
+    """
+    left_rows: Iterator[Any] = chain.from_iterable(left)
+    right_rows: Iterator[Any] = chain.from_iterable(right)
+    if ordered:
+        return all(
+            a is not _SENTINEL and b is not _SENTINEL and row_hash(a) == row_hash(b)
+            for a, b in zip_longest(left_rows, right_rows, fillvalue=_SENTINEL)
+        )
+
+    left_digest, right_digest = StreamingDigest(False), StreamingDigest(False)
+    for a, b in zip_longest(left_rows, right_rows, fillvalue=_SENTINEL):
+        if a is _SENTINEL or b is _SENTINEL:
+            return False
+        left_digest.update((a,))
+        right_digest.update((b,))
+    return left_digest.result() == right_digest.result()
@@ -0,0 +1,66 @@
+from src.engine.db import DBManager
+from src.engine.transpiler import AuraTranspiler, QueryPlan
+from src.evaluation.result_cache import ResultCache, ResultDigest, database_fingerprint
+from src.evaluation.streaming import digest_chunks, streams_equal
+from src.schema import AETHERIS_DB
+
+
+class DSLValidator:
+    """Execution-based comparison of expected and predicted AuraDSL.
+
+    Expected queries never change between checkpoints, so their result digests
+    are memoized in a persistent ResultCache when `cache_path` is given. Results
+    are streamed in `chunk_size` batches, so memory per comparison is bounded.
+    Pass the `fingerprint` taken once by the caller so that parallel validators
+    agree on the cache keys.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "data/aetheris.db",
+        cache_path: str | None = None,
+        chunk_size: int = 1000,
+        fingerprint: str | None = None,
+    ):
+        self.chunk_size = chunk_size
+        self.transpiler = AuraTranspiler(AETHERIS_DB)
+        self.cache = ResultCache(cache_path) if cache_path else None
+        self.fingerprint = (fingerprint or database_fingerprint(db_path)) if self.cache else ""
+        self.db = DBManager(AETHERIS_DB, db_path, read_only=True)
+
+    def expected_digest(self, plan: QueryPlan, params: list) -> ResultDigest:
+        """Digest of the expected query's result, from the cache when possible."""
+        if self.cache:
+            cached = self.cache.get(plan.sql, params, self.fingerprint)
+            if cached is not None:
+                return cached
+        result = digest_chunks(self.db.iter_query(plan.sql, params, self.chunk_size), plan.ordered)
+        if self.cache:
+            self.cache.put(plan.sql, params, self.fingerprint, result)
+        return result
+
+    def compare_results(self, expected_dsl: str, predicted_dsl: str) -> bool:
+        """Executes both queries and compares resulting data sets."""
+        try:
+            plan_exp, params_exp = self.transpiler.prepare(expected_dsl)
+            plan_pred, params_pred = self.transpiler.prepare(predicted_dsl)
+
+            pred_rows = self.db.iter_query(plan_pred.sql, params_pred, self.chunk_size)
+            # Row order only matters when the expected query asks for one.
+            if self.cache is None:
+                exp_rows = self.db.iter_query(plan_exp.sql, params_exp, self.chunk_size)
+                return streams_equal(exp_rows, pred_rows, plan_exp.ordered)
+
+            expected = self.expected_digest(plan_exp, params_exp)
+            predicted = digest_chunks(pred_rows, plan_exp.ordered, max_rows=expected.row_count)
+            return predicted == expected
+        except Exception:
+            return False
+
+    def get_component_score(self, expected: str, predicted: str) -> float:
+        """Simple token-based similarity for components."""
+        exp_set = set(expected.replace("|>", "").split())
+        pred_set = set(predicted.replace("|>", "").split())
+        if not exp_set:
+            return 0.0
+        return len(exp_set.intersection(pred_set)) / len(exp_set)
@@ -0,0 +1,226 @@
+import copy
+from collections.abc import Callable
+from functools import cached_property
+from typing import Any, Protocol
+
+from src.cache import LRUCache
+from src.config import Config
+from src.engine.grammar import AuraGrammar
+from src.generation.constrained import GrammarLogitsProcessor, TokenIndex
+from src.generation.prefix_cache import PrefixCache, TokenIds
+from src.logger import get_logger
+from src.prompts import PromptBuilder
+
+logger = get_logger(__name__)
+
+
+# A DSL query is one line; the model running on into a new "### Input:" block is waste.
+DEFAULT_STOP_STRINGS = ("\n", "###")
+
+
+class GenerationBackend(Protocol):
+    """Turns a batch of prompts into their generated continuations (prompt excluded).
+
+    `grammars`, one per prompt, restrict the continuation to valid AuraDSL.
+    """
+
+    def generate(self, prompts: list[str], max_new_tokens: int, grammars: list[AuraGrammar] | None = None) -> list[str]: ...
+
+
+def truncate_at_stop(text: str, stop_strings: tuple[str, ...]) -> str:
+    """Cuts `text` at the first occurrence of any stop string."""
+    cut = min((i for i in (text.find(s) for s in stop_strings) if i >= 0), default=len(text))
+    return text[:cut]
+
+
+def kv_cache_nbytes(cache: Any) -> int:
+    """Memory held by a Hugging Face KV cache (DynamicCache or legacy tuples)."""
+    if hasattr(cache, "layers"):
+        return sum(layer.keys.nbytes + layer.values.nbytes for layer in cache.layers)
+    if hasattr(cache, "key_cache"):
+        return sum(t.nbytes for t in (*cache.key_cache, *cache.value_cache))
+    return sum(t.nbytes for layer in cache for t in layer)
+
+
+class HFGenerationBackend:
+    """Batched `generate` for any Hugging Face causal LM, with left padding.
+
+    Prompts are expected in the format of `prompt_builder` (by default built on
+    this tokenizer). With a `prefix_cache`, the KV state of frequent prompt
+    prefixes (see PromptBuilder.prefixes) is kept and prompts sharing one are generated together
+    from a copy of it, so only the remaining suffix is prefilled. The padding
+    then sits between prefix and suffix and is masked out.
+
+    Rows stop at EOS or at any of `stop_strings`, and only the new tokens are
+    decoded, cut before the stop string.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        tokenizer: Any,
+        device: str = "cuda",
+        prefix_cache: PrefixCache[Any] | None = None,
+        split_prefixes: Callable[[str], list[str]] | None = None,
+        stop_strings: tuple[str, ...] = DEFAULT_STOP_STRINGS,
+        prompt_builder: PromptBuilder | None = None,
+    ):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.device = device
+        self.prefix_cache = prefix_cache
+        self.prompt_builder = prompt_builder or PromptBuilder(tokenizer)
+        self.split_prefixes = split_prefixes or self.prompt_builder.prefixes
+        # Chat templates carry their own special tokens; plain prompts get the tokenizer's.
+        self._add_special_tokens = not self.prompt_builder.chat
+        self.stop_strings = stop_strings
+        # New non-pad tokens across all generate() calls, stop-string overshoot included.
+        self.tokens_generated = 0
+        self._prefix_ids: LRUCache[str, TokenIds] = LRUCache(4096)
+        # Decoder-only models continue from the last position, so pad on the left.
+        self.tokenizer.padding_side = "left"
+        if self.tokenizer.pad_token_id is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+
+    @cached_property
+    def _stopping_criteria(self) -> Any:
+        from transformers import StoppingCriteriaList, StopStringCriteria
+
+        # Built once: StopStringCriteria precomputes per-token tables over the whole vocabulary.
+        return StoppingCriteriaList([StopStringCriteria(self.tokenizer, list(self.stop_strings))])
+
+    def _generation_kwargs(self, grammars: list[AuraGrammar] | None) -> dict[str, Any]:
+        kwargs: dict[str, Any] = {
+            "use_cache": True,
+            "eos_token_id": self.tokenizer.eos_token_id,
+            "pad_token_id": self.tokenizer.pad_token_id,
+        }
+        if self.stop_strings:
+            kwargs["stopping_criteria"] = self._stopping_criteria
+        if grammars is not None:
+            from transformers import LogitsProcessorList
+
+            processor = GrammarLogitsProcessor(grammars, TokenIndex.for_tokenizer(self.tokenizer))
+            kwargs["logits_processor"] = LogitsProcessorList([processor])
+        return kwargs
+
+    def _decode_new(self, outputs: Any, input_width: int) -> list[str]:
+        new_tokens = outputs[:, input_width:]
+        self.tokens_generated += int((new_tokens != self.tokenizer.pad_token_id).sum())
+        decoded = self.tokenizer.batch_decode(new_tokens, skip_special_tokens=True)
+        return [truncate_at_stop(text, self.stop_strings) for text in decoded]
+
+    def generate(self, prompts: list[str], max_new_tokens: int, grammars: list[AuraGrammar] | None = None) -> list[str]:
+        if self.prefix_cache is None:
+            inputs = self.tokenizer(
+                prompts, return_tensors="pt", padding=True, add_special_tokens=self._add_special_tokens
+            ).to(self.device)
+            outputs = self.model.generate(**inputs, max_new_tokens=max_new_tokens, **self._generation_kwargs(grammars))
+            return self._decode_new(outputs, inputs["input_ids"].shape[1])
+
+        groups: dict[TokenIds, tuple[Any, list[int]]] = {}
+        token_ids = [self.tokenizer(p, add_special_tokens=self._add_special_tokens)["input_ids"] for p in prompts]
+        for i, (prompt, ids) in enumerate(zip(prompts, token_ids, strict=True)):
+            prefix, state = self._cached_prefix(self.prefix_cache, prompt, ids)
+            groups.setdefault(prefix, (state, []))[1].append(i)
+
+        results: list[str] = [""] * len(prompts)
+        for prefix, (state, members) in groups.items():
+            decoded = self._generate_from_prefix(
+                prefix,
+                state,
+                [token_ids[i] for i in members],
+                max_new_tokens,
+                None if grammars is None else [grammars[i] for i in members],
+            )
+            for i, text in zip(members, decoded, strict=True):
+                results[i] = text
+        return results
+
+    def _tokenize_prefix(self, text: str) -> TokenIds:
+        ids = self._prefix_ids.get(text)
+        if ids is None:
+            ids = tuple(self.tokenizer(text, add_special_tokens=self._add_special_tokens)["input_ids"])
+            self._prefix_ids.put(text, ids)
+        return ids
+
+    def _cached_prefix(self, cache: PrefixCache[Any], prompt: str, ids: list[int]) -> tuple[TokenIds, Any]:
+        """Longest usable prefix of `ids` with KV state, prefilling admitted prefixes on the way."""
+        best: TokenIds = ()
+        state: Any = None
+        reused = 0
+        for text in self.split_prefixes(prompt):
+            prefix = self._tokenize_prefix(text)
+            # The prefix must tokenize identically inside the full prompt and leave a suffix.
+            if len(prefix) >= len(ids) or tuple(ids[: len(prefix)]) != prefix:
+                break
+            cached = cache.get(prefix)
+            if cached is not None:
+                reused = len(prefix)
+            else:
+                if not cache.admit(prefix):
+                    break
+                cached = self._prefill(prefix, best, state)
+                cache.put(prefix, cached, kv_cache_nbytes(cached))
+            best, state = prefix, cached
+        cache.record(ids, reused)
+        return best, state
+
+    def _prefill(self, prefix: TokenIds, base: TokenIds, base_state: Any) -> Any:
+        """KV state for `prefix`, extending a copy of the state already held for `base`."""
+        import torch
+
+        past = copy.deepcopy(base_state) if base_state is not None else None
+        new_ids = torch.tensor([prefix[len(base) :]], device=self.device)
+        with torch.no_grad():
+            return self.model(input_ids=new_ids, past_key_values=past, use_cache=True).past_key_values
+
+    def _generate_from_prefix(
+        self,
+        prefix: TokenIds,
+        state: Any,
+        token_ids: list[list[int]],
+        max_new_tokens: int,
+        grammars: list[AuraGrammar] | None,
+    ) -> list[str]:
+        import torch
+
+        suffixes = [ids[len(prefix) :] for ids in token_ids]
+        width = max(len(s) for s in suffixes)
+        pad = self.tokenizer.pad_token_id
+        input_ids = [[*prefix, *[pad] * (width - len(s)), *s] for s in suffixes]
+        attention_mask = [[1] * len(prefix) + [0] * (width - len(s)) + [1] * len(s) for s in suffixes]
+        kwargs: dict[str, Any] = {}
+        if state is not None:
+            past = copy.deepcopy(state)
+            past.batch_repeat_interleave(len(suffixes))
+            kwargs["past_key_values"] = past
+        outputs = self.model.generate(
+            input_ids=torch.tensor(input_ids, device=self.device),
+            attention_mask=torch.tensor(attention_mask, device=self.device),
+            max_new_tokens=max_new_tokens,
+            **kwargs,
+            **self._generation_kwargs(grammars),
+        )
+        return self._decode_new(outputs, len(input_ids[0]))
+
+
+def load_unsloth_backend(model_path: str, prefix_cache_mb: int | None = None) -> HFGenerationBackend:
+    """Loads the fine-tuned 4-bit model with Unsloth for GPU inference.
+
+    `prefix_cache_mb` (default Config.PREFIX_CACHE_MB) budgets prompt-prefix KV
+    reuse; 0 disables it.
+    """
+    from unsloth import FastLanguageModel
+
+    logger.info("Loading model for inference from: %s", model_path)
+    model, tokenizer = FastLanguageModel.from_pretrained(
+        model_name=model_path,
+        max_seq_length=Config.MAX_SEQ_LENGTH,
+        dtype=None,
+        load_in_4bit=True,
+    )
+    FastLanguageModel.for_inference(model)
+    budget_mb = Config.PREFIX_CACHE_MB if prefix_cache_mb is None else prefix_cache_mb
+    prefix_cache = PrefixCache[Any](budget_mb * 1024 * 1024) if budget_mb > 0 else None
+    return HFGenerationBackend(model, tokenizer, device="cuda", prefix_cache=prefix_cache)
@@ -0,0 +1,100 @@
+from bisect import bisect_left
+from typing import Any
+
+from src.engine.grammar import AuraGrammar, State
+
+# TokenIndex per tokenizer object; the tokenizer is kept alive alongside so its id() is never reused.
+_INDEXES: dict[int, tuple[Any, "TokenIndex"]] = {}
+
+
+class TokenIndex:
+    """Vocabulary of a tokenizer as a sorted string list, walked like a trie to build grammar masks.
+
+    Allowed-token sets are memoized per (grammar, state): after the first few
+    queries every mask is a dictionary lookup.
+    """
+
+    def __init__(self, tokenizer: Any):
+        self.eos_token_id: int = tokenizer.eos_token_id
+        special = set(tokenizer.all_special_ids)
+        ids = [i for i in range(len(tokenizer)) if i not in special]
+        # Decode after an anchor token so leading spaces survive (SentencePiece drops them otherwise).
+        anchor = tokenizer.encode("a", add_special_tokens=False)[-1:]
+        anchor_len = len(tokenizer.decode(anchor))
+        texts = tokenizer.batch_decode([anchor + [i] for i in ids])
+        self.texts: dict[int, str] = {}
+        by_text: dict[str, list[int]] = {}
+        for token_id, text in zip(ids, texts, strict=True):
+            text = text[anchor_len:]
+            self.texts[token_id] = text
+            if text:
+                by_text.setdefault(text, []).append(token_id)
+        self.keys = sorted(by_text)
+        self.ids = [by_text[k] for k in self.keys]
+        self._masks: dict[tuple[Any, State], list[int]] = {}
+
+    @classmethod
+    def for_tokenizer(cls, tokenizer: Any) -> "TokenIndex":
+        entry = _INDEXES.get(id(tokenizer))
+        if entry is None:
+            entry = _INDEXES[id(tokenizer)] = (tokenizer, cls(tokenizer))
+        return entry[1]
+
+    def allowed(self, grammar: AuraGrammar, state: State) -> list[int]:
+        """Token ids whose text keeps `state` on a valid query, plus EOS if the query may end here."""
+        key = (grammar.key, state)
+        allowed = self._masks.get(key)
+        if allowed is None:
+            allowed = []
+            self._walk(grammar, state, 0, len(self.keys), 0, allowed)
+            if grammar.accepts(state):
+                allowed.append(self.eos_token_id)
+            self._masks[key] = allowed
+        return allowed
+
+    def _walk(self, grammar: AuraGrammar, state: State, lo: int, hi: int, depth: int, out: list[int]) -> None:
+        """Visits keys[lo:hi] (sharing their first `depth` chars, already fed) one character level deeper."""
+        keys = self.keys
+        while lo < hi and len(keys[lo]) == depth:
+            out.extend(self.ids[lo])
+            lo += 1
+        while lo < hi:
+            ch = keys[lo][depth]
+            end = bisect_left(keys, keys[lo][:depth] + chr(ord(ch) + 1), lo, hi)
+            nxt = grammar.step(state, ch)
+            if nxt is not None:
+                self._walk(grammar, nxt, lo, end, depth + 1, out)
+            lo = end
+
+
+class GrammarLogitsProcessor:
+    """Hugging Face logits processor restricting each row to its own AuraGrammar.
+
+    Rows are tracked by the last token of `input_ids` on every step after the
+    first; once a row's query is complete only EOS remains, so decoding stops
+    as soon as the pipeline ends instead of running to max_new_tokens.
+    """
+
+    def __init__(self, grammars: list[AuraGrammar], index: TokenIndex):
+        self.grammars = grammars
+        self.index = index
+        self.states: list[State | None] | None = None
+
+    def __call__(self, input_ids: Any, scores: Any) -> Any:
+        import torch
+
+        if self.states is None:
+            self.states = [g.initial for g in self.grammars]
+        else:
+            for row, token_id in enumerate(input_ids[:, -1].tolist()):
+                state = self.states[row]
+                if state is not None:
+                    text = self.index.texts.get(token_id)
+                    self.states[row] = None if text is None else self.grammars[row].feed(state, text)
+
+        masked = torch.full_like(scores, float("-inf"))
+        for row, state in enumerate(self.states):
+            allowed = [self.index.eos_token_id] if state is None else self.index.allowed(self.grammars[row], state)
+            idx = torch.tensor(allowed or [self.index.eos_token_id], device=scores.device)
+            masked[row, idx] = scores[row, idx]
+        return masked
@@ -0,0 +1,116 @@
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+from src.cache import LRUCache
+
+V = TypeVar("V")
+
+TokenIds = tuple[int, ...]
+
+
+def template_prefixes(template: str, prompt: str) -> list[str]:
+    """Cacheable prefixes of a prompt built from `template` with str.format.
+
+    A prefix ends after every fixed part of the template before the last field
+    (the question), which varies per request. For PromptBuilder.template that
+    is the instruction header and header + schema context.
+    """
+    parts = template.split("{}")
+    if not prompt.startswith(parts[0]):
+        return []
+    prefixes: list[str] = []
+    pos = 0
+    for i, part in enumerate(parts[:-1]):
+        idx = 0 if i == 0 else prompt.find(part, pos)
+        if idx < 0:
+            break
+        pos = idx + len(part)
+        prefixes.append(prompt[:pos])
+    return prefixes
+
+
+@dataclass(slots=True)
+class PrefixCacheStats:
+    """Lookups plus prompt tokens whose prefill was served from cached state."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    prompt_tokens: int = 0
+    prefill_tokens_saved: int = 0
+
+    @property
+    def saved_ratio(self) -> float:
+        return self.prefill_tokens_saved / self.prompt_tokens if self.prompt_tokens else 0.0
+
+    def summary(self) -> dict[str, object]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "prompt_tokens": self.prompt_tokens,
+            "prefill_tokens_saved": self.prefill_tokens_saved,
+            "saved_ratio": round(self.saved_ratio, 4),
+        }
+
+
+class PrefixCache(Generic[V]):
+    """LRU map from prompt-prefix token ids to backend state (e.g. a KV cache) under a byte budget.
+
+    The state is opaque; callers report its size. A prefix is only admitted
+    once it has been seen `admit_after` times, so one-off contexts never push
+    out the shared header.
+    """
+
+    def __init__(self, budget_bytes: int, admit_after: int = 2, track_prefixes: int = 4096):
+        if budget_bytes <= 0:
+            raise ValueError("budget_bytes must be positive.")
+        self.budget_bytes = budget_bytes
+        self.admit_after = admit_after
+        self.nbytes = 0
+        self.stats = PrefixCacheStats()
+        self._data: OrderedDict[TokenIds, tuple[V, int]] = OrderedDict()
+        self._seen: LRUCache[TokenIds, int] = LRUCache(track_prefixes)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: TokenIds) -> bool:
+        return key in self._data
+
+    def get(self, key: TokenIds) -> V | None:
+        """Returns the cached state (marking it recently used) or None."""
+        entry = self._data.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.stats.hits += 1
+        return entry[0]
+
+    def admit(self, key: TokenIds) -> bool:
+        """Counts a sighting of an uncached prefix; True once it is frequent enough to store."""
+        seen = (self._seen.get(key) or 0) + 1
+        self._seen.put(key, seen)
+        return seen >= self.admit_after
+
+    def put(self, key: TokenIds, value: V, nbytes: int) -> bool:
+        """Stores state for a prefix, evicting least recently used entries to fit the budget."""
+        if nbytes > self.budget_bytes:
+            return False
+        if key in self._data:
+            self.nbytes -= self._data.pop(key)[1]
+        while self._data and self.nbytes + nbytes > self.budget_bytes:
+            _, (_, evicted_bytes) = self._data.popitem(last=False)
+            self.nbytes -= evicted_bytes
+            self.stats.evictions += 1
+        self._data[key] = (value, nbytes)
+        self.nbytes += nbytes
+        return True
+
+    def record(self, prompt_ids: Sequence[int], reused: int) -> None:
+        """Accounts one prompt of which the first `reused` tokens came from cached state."""
+        self.stats.prompt_tokens += len(prompt_ids)
+        self.stats.prefill_tokens_saved += reused
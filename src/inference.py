@@ -1,61 +1,109 @@
-from unsloth import FastLanguageModel
+from typing import Protocol
 
-from src.config import Config
+from src.engine.grammar import grammar_for
+from src.generation.backends import GenerationBackend, load_unsloth_backend
 from src.logger import get_logger
-from src.retrieval.vector_store import SchemaRetriever
+from src.prompts import PromptBuilder
 from src.schema import AETHERIS_DB, TableSchema
 
 logger = get_logger(__name__)
 
+RESPONSE_MARKER = "### Response:"
+
+
+class TableRetriever(Protocol):
+    def get_relevant_tables(self, query: str, top_k: int = 2) -> list[TableSchema]: ...
+
+    def get_relevant_tables_batch(self, queries: list[str], top_k: int = 2) -> list[list[TableSchema]]: ...
+
 
 class AuraInference:
     """End-to-end inference pipeline: RAG + Fine-tuned LLM."""
 
-    def __init__(self, model_path: str) -> None:
-        """Initialize the model and the schema retriever."""
-        logger.info("Loading model for inference from: %s", model_path)
-        self.model, self.tokenizer = FastLanguageModel.from_pretrained(
-            model_name=model_path,
-            max_seq_length=Config.MAX_SEQ_LENGTH,
-            dtype=None,
-            load_in_4bit=True,
-        )
-        FastLanguageModel.for_inference(self.model)
-        self.retriever = SchemaRetriever(AETHERIS_DB)
-
-    def _format_context(self, tables: list[TableSchema]) -> str:
-        """Formats the retrieved tables into a clean context string."""
-        context_parts: list[str] = []
-        for table in tables:
-            cols = [{"name": c.name, "description": c.description} for c in table.columns]
-            part = f"Table '{table.name}': {table.description}. Columns: {cols}"
-            context_parts.append(part)
-        return "\n".join(context_parts)
+    def __init__(
+        self,
+        model_path: str | None = None,
+        *,
+        backend: GenerationBackend | None = None,
+        retriever: TableRetriever | None = None,
+        batch_size: int = 16,
+        max_new_tokens: int = 128,
+        constrained: bool = True,
+        closed_values: bool = False,
+        prompt_builder: PromptBuilder | None = None,
+    ) -> None:
+        """Initialize the generation backend and the schema retriever.
+
+        Without an explicit `backend` the fine-tuned model at `model_path` is
+        loaded with Unsloth; pass a backend and retriever to run elsewhere (CPU, stubs).
+        With `constrained`, decoding is limited to valid AuraDSL over the retrieved
+        tables; `closed_values` also limits string literals to column categories.
+        Prompts come from `prompt_builder`, by default the backend's own (the
+        chat template the model was trained with).
+        """
+        if backend is None:
+            if model_path is None:
+                raise ValueError("Either model_path or backend is required.")
+            backend = load_unsloth_backend(model_path)
+        if retriever is None:
+            from src.retrieval.vector_store import SchemaRetriever
+
+            retriever = SchemaRetriever(AETHERIS_DB)
+        self.backend = backend
+        self.retriever = retriever
+        self.batch_size = batch_size
+        self.max_new_tokens = max_new_tokens
+        self.constrained = constrained
+        self.closed_values = closed_values
+        self.prompts = prompt_builder or getattr(backend, "prompt_builder", None) or PromptBuilder()
 
     def get_full_context_and_prompt(self, nl_query: str) -> tuple[str, str]:
         """Returns the formatted context and the final prompt for debugging."""
         relevant_tables = self.retriever.get_relevant_tables(nl_query, top_k=2)
-        context = self._format_context(relevant_tables)
-        full_prompt = Config.PROMPT_STYLE.format(context, nl_query, "")
+        context = self.prompts.context(relevant_tables)
+        full_prompt = self.prompts.prompt(context, nl_query)
         return context, full_prompt
 
-    def predict(self, nl_query: str) -> str:
-        """Executes the full Text-to-DSL pipeline."""
-        _, full_prompt = self.get_full_context_and_prompt(nl_query)
+    def build_prompts(self, nl_queries: list[str]) -> list[str]:
+        """Final prompts for many queries, retrieving all their schemas in one batch."""
+        return self._prepare(nl_queries)[0]
 
-        inputs = self.tokenizer([full_prompt], return_tensors="pt").to("cuda")
+    def _prepare(self, nl_queries: list[str]) -> tuple[list[str], list[list[TableSchema]]]:
+        tables_per_query = self.retriever.get_relevant_tables_batch(nl_queries, top_k=2)
+        prompts = [
+            self.prompts.prompt(self.prompts.context(tables), query)
+            for query, tables in zip(nl_queries, tables_per_query, strict=True)
+        ]
+        return prompts, tables_per_query
 
-        outputs = self.model.generate(
-            **inputs,
-            max_new_tokens=128,
-            use_cache=True,
-            eos_token_id=self.tokenizer.eos_token_id,
-            pad_token_id=self.tokenizer.pad_token_id,
-        )
+    @staticmethod
+    def extract_response(decoded: str) -> str:
+        """Returns the text after the response marker, if the backend echoed the prompt."""
+        if RESPONSE_MARKER in decoded:
+            return decoded.split(RESPONSE_MARKER)[1].strip()
+        return decoded.strip()
 
-        decoded = self.tokenizer.batch_decode(outputs, skip_special_tokens=True)[0]
+    @staticmethod
+    def length_buckets(prompts: list[str], batch_size: int) -> list[list[int]]:
+        """Groups prompt indices into batches of similar length to minimize padding."""
+        order = sorted(range(len(prompts)), key=lambda i: len(prompts[i]))
+        return [order[i : i + batch_size] for i in range(0, len(order), batch_size)]
 
-        if "### Response:" in decoded:
-            return decoded.split("### Response:")[1].strip()
+    def predict_batch(self, nl_queries: list[str]) -> list[str]:
+        """Executes the Text-to-DSL pipeline for many queries, batching generation."""
+        prompts, tables_per_query = self._prepare(nl_queries)
+        grammars = [grammar_for(tables, self.closed_values) for tables in tables_per_query] if self.constrained else None
+        results: list[str] = [""] * len(prompts)
+        for bucket in self.length_buckets(prompts, self.batch_size):
+            decoded = self.backend.generate(
+                [prompts[i] for i in bucket],
+                self.max_new_tokens,
+                None if grammars is None else [grammars[i] for i in bucket],
+            )
+            for i, text in zip(bucket, decoded, strict=True):
+                results[i] = self.extract_response(text)
+        return results
 
-        return decoded
+    def predict(self, nl_query: str) -> str:
+        """Executes the full Text-to-DSL pipeline."""
+        return self.predict_batch([nl_query])[0]
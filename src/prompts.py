@@ -0,0 +1,111 @@
+from collections.abc import Sequence
+from typing import Any
+
+from src.cache import LRUCache
+from src.config import Config
+from src.generation.prefix_cache import template_prefixes
+from src.schema import TableSchema
+
+SYSTEM_PROMPT = "You are an expert in AuraDSL. Translate the natural language request into a valid AuraDSL query based on the provided schema."
+USER_TEMPLATE = "Context: {}\n\nInput: {}"
+
+# Placeholders used to find the fixed parts of a rendered template.
+_CONTEXT, _QUESTION, _ANSWER = "\x00CONTEXT\x00", "\x00QUESTION\x00", "\x00ANSWER\x00"
+
+
+def format_table(name: str, description: str, columns: Sequence[dict[str, Any]]) -> str:
+    """One table of schema context, as seen in training and at inference."""
+    return f"Table '{name}': {description}. Columns: {list(columns)}"
+
+
+class PromptBuilder:
+    """The one place prompts are formatted, for dataset building, training and inference.
+
+    With a tokenizer that has a chat template the prompt is a system + user
+    chat (what train.py has always rendered); otherwise it is Config.PROMPT_STYLE.
+    Context strings are memoized per table set and context-prefix token ids per
+    context, so the schema text is tokenized once rather than once per sample.
+    """
+
+    def __init__(self, tokenizer: Any | None = None, cache_size: int = 1024):
+        self.tokenizer = tokenizer
+        self.chat = bool(tokenizer is not None and getattr(tokenizer, "chat_template", None))
+        self._contexts: LRUCache[tuple[str, ...], str] = LRUCache(cache_size)
+        self._prefix_ids: LRUCache[str, tuple[list[int], bool]] = LRUCache(cache_size)
+
+        generation = self._render(_CONTEXT, _QUESTION, None).split(_CONTEXT)
+        self.head = generation[0]
+        self.middle, self.tail = generation[1].split(_QUESTION)
+        training = self._render(_CONTEXT, _QUESTION, _ANSWER).split(_QUESTION)[1]
+        self.answer_head, self.answer_tail = training.split(_ANSWER)
+        # Template with "{}" for context and question, for template_prefixes.
+        self.template = f"{self.head}{{}}{self.middle}{{}}{self.tail}"
+
+    def _render(self, context: str, question: str, answer: str | None) -> str:
+        if not self.chat:
+            return Config.PROMPT_STYLE.format(context, question, answer or "")
+        assert self.tokenizer is not None
+        messages = self.messages(context, question, answer)
+        return self.tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=answer is None)
+
+    @staticmethod
+    def messages(context: str, question: str, answer: str | None = None) -> list[dict[str, str]]:
+        messages = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": USER_TEMPLATE.format(context, question)},
+        ]
+        if answer is not None:
+            messages.append({"role": "assistant", "content": answer})
+        return messages
+
+    def context(self, tables: Sequence[TableSchema]) -> str:
+        """Schema context for the retrieved tables, memoized per table set."""
+        key = tuple(f"{t.name}:{','.join(t.column_names)}" for t in tables)
+        text = self._contexts.get(key)
+        if text is None:
+            text = "\n".join(
+                format_table(t.name, t.description, [{"name": c.name, "description": c.description} for c in t.columns])
+                for t in tables
+            )
+            self._contexts.put(key, text)
+        return text
+
+    def prompt(self, context: str, question: str) -> str:
+        """Generation prompt, ending where the model's answer starts."""
+        return f"{self.head}{context}{self.middle}{question}{self.tail}"
+
+    def training_text(self, context: str, question: str, answer: str) -> str:
+        return f"{self.head}{context}{self.middle}{question}{self.answer_head}{answer}{self.answer_tail}"
+
+    def prefixes(self, prompt: str) -> list[str]:
+        """Cacheable prompt prefixes (header, header + context), ending before any trailing space.
+
+        A trailing space would tokenize on its own instead of merging into the
+        question's first token, so the prefix ids would never match the prompt's.
+        """
+        return [p.rstrip(" ") for p in template_prefixes(self.template, prompt)]
+
+    def encode(self, context: str, question: str, answer: str | None = None) -> list[int]:
+        """Token ids of the prompt (or training text), reusing the cached ids of the context prefix.
+
+        Splitting is checked against a full tokenization the first time a context
+        is seen; contexts whose boundary tokenizes differently are always encoded whole.
+        """
+        assert self.tokenizer is not None, "encode() needs a tokenizer"
+        special = not self.chat  # chat templates already contain their special tokens
+        prefix = f"{self.head}{context}{self.middle}".rstrip(" ")
+        text = self.training_text(context, question, answer) if answer is not None else self.prompt(context, question)
+        suffix = text[len(prefix) :]
+
+        cached = self._prefix_ids.get(prefix)
+        if cached is None:
+            full = self.tokenizer(text, add_special_tokens=special)["input_ids"]
+            prefix_ids = self.tokenizer(prefix, add_special_tokens=special)["input_ids"]
+            suffix_ids = self.tokenizer(suffix, add_special_tokens=False)["input_ids"]
+            self._prefix_ids.put(prefix, (prefix_ids, prefix_ids + suffix_ids == full))
+            return full
+
+        prefix_ids, splittable = cached
+        if not splittable:
+            return self.tokenizer(text, add_special_tokens=special)["input_ids"]
+        return prefix_ids + self.tokenizer(suffix, add_special_tokens=False)["input_ids"]
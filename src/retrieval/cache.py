@@ -0,0 +1,85 @@
+import hashlib
+import re
+import sqlite3
+import time
+from collections.abc import Callable, Sequence
+from pathlib import Path
+
+import numpy as np
+
+from src.cache import TimedCacheStats
+
+_PUNCT_RE = re.compile(r"[^\w\s']+")
+
+
+def normalize_query(text: str) -> str:
+    """Lowercases, drops punctuation and collapses whitespace so near-identical questions share a key."""
+    return " ".join(_PUNCT_RE.sub(" ", text.lower()).split())
+
+
+class EmbeddingCache:
+    """On-disk cache of text embeddings keyed by (model name, text hash)."""
+
+    def __init__(self, path: str, model_name: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.model_name = model_name
+        self.stats = TimedCacheStats()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings "
+            "(model TEXT, text_hash TEXT, dim INTEGER, vector BLOB, PRIMARY KEY (model, text_hash))",
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def get(self, text: str) -> np.ndarray | None:
+        row = self.conn.execute(
+            "SELECT vector FROM embeddings WHERE model = ? AND text_hash = ?",
+            (self.model_name, self.text_hash(text)),
+        ).fetchone()
+        return np.frombuffer(row[0], dtype=np.float32) if row else None
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[np.ndarray]) -> None:
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, dim, vector) VALUES (?, ?, ?, ?)",
+                [
+                    (self.model_name, self.text_hash(t), len(v), np.asarray(v, dtype=np.float32).tobytes())
+                    for t, v in zip(texts, vectors, strict=True)
+                ],
+            )
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class CachedEncoder:
+    """Wraps an embedding function so texts already on disk skip the encoder."""
+
+    def __init__(self, encode: Callable[[list[str]], Sequence[np.ndarray]], cache: EmbeddingCache):
+        self.encode = encode
+        self.cache = cache
+
+    def __call__(self, texts: list[str]) -> list[np.ndarray]:
+        results: list[np.ndarray | None] = []
+        for text in texts:
+            start = time.perf_counter()
+            vector = self.cache.get(text)
+            if vector is not None:
+                self.cache.stats.record(True, time.perf_counter() - start)
+            results.append(vector)
+
+        missing = [i for i, v in enumerate(results) if v is None]
+        if missing:
+            start = time.perf_counter()
+            encoded = [np.asarray(v, dtype=np.float32) for v in self.encode([texts[i] for i in missing])]
+            self.cache.put_many([texts[i] for i in missing], encoded)
+            per_text = (time.perf_counter() - start) / len(missing)
+            for i, vector in zip(missing, encoded, strict=True):
+                results[i] = vector
+                self.cache.stats.record(False, per_text)
+        return results  # pyright: ignore[reportReturnType]
@@ -0,0 +1,153 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Protocol
+
+import numpy as np
+
+
+class VectorIndex(Protocol):
+    """Storage/search backend for schema documents with precomputed embeddings."""
+
+    def count(self) -> int: ...
+
+    def metadata_by_id(self) -> dict[str, dict[str, Any]]: ...
+
+    def upsert(self, ids: list[str], documents: list[str], metadatas: list[dict[str, Any]], embeddings: np.ndarray) -> None: ...
+
+    def delete(self, ids: list[str]) -> None: ...
+
+    def search(self, vectors: np.ndarray, top_k: int, kind: str | None = None) -> list[list[dict[str, Any]]]:
+        """Metadata of the `top_k` nearest documents per query, only of `kind` if given."""
+        ...
+
+
+class ChromaIndex:
+    """Persistent ChromaDB collection (HNSW)."""
+
+    def __init__(self, persist_directory: str, collection_name: str, embedding_function: Any):
+        import chromadb
+
+        Path(persist_directory).mkdir(parents=True, exist_ok=True)
+        self.client = chromadb.PersistentClient(path=persist_directory)
+        self.collection = self.client.get_or_create_collection(
+            name=collection_name,
+            embedding_function=embedding_function,
+        )
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def metadata_by_id(self) -> dict[str, dict[str, Any]]:
+        stored = self.collection.get(include=["metadatas"])  # pyright: ignore[reportArgumentType]
+        return {id_: dict(m or {}) for id_, m in zip(stored["ids"], stored["metadatas"] or [], strict=True)}
+
+    def upsert(self, ids: list[str], documents: list[str], metadatas: list[dict[str, Any]], embeddings: np.ndarray) -> None:
+        self.collection.upsert(
+            ids=ids,
+            documents=documents,
+            metadatas=metadatas,  # pyright: ignore[reportArgumentType]
+            embeddings=embeddings,  # pyright: ignore[reportArgumentType]
+        )
+
+    def delete(self, ids: list[str]) -> None:
+        if ids:
+            self.collection.delete(ids=ids)
+
+    def search(self, vectors: np.ndarray, top_k: int, kind: str | None = None) -> list[list[dict[str, Any]]]:
+        results = self.collection.query(
+            query_embeddings=vectors,  # pyright: ignore[reportArgumentType]
+            n_results=top_k,
+            where={"kind": kind} if kind else None,
+        )
+        return [[dict(m) for m in metadata_list] for metadata_list in results["metadatas"] or []]
+
+
+class NumpyIndex:
+    """Exact cosine search over a normalized float32 matrix memory-mapped from a .npy file.
+
+    For a corpus of a few hundred documents one matrix product is faster than
+    any ANN structure and needs no database or server at startup.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.vectors_path = self.directory / "vectors.npy"
+        self.meta_path = self.directory / "documents.json"
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+        self.ids: list[str] = []
+        self.documents: list[str] = []
+        self.metadatas: list[dict[str, Any]] = []
+        self._load()
+
+    def _load(self) -> None:
+        if not (self.vectors_path.exists() and self.meta_path.exists()):
+            return
+        with open(self.meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        self.ids, self.documents, self.metadatas = meta["ids"], meta["documents"], meta["metadatas"]
+        self.matrix = np.load(self.vectors_path, mmap_mode="r")
+
+    def _save(self, matrix: np.ndarray) -> None:
+        # Write-then-rename so a crash never leaves a half-written index.
+        tmp_vectors = self.vectors_path.with_suffix(".tmp.npy")
+        np.save(tmp_vectors, matrix)
+        tmp_meta = self.meta_path.with_suffix(".tmp")
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump({"ids": self.ids, "documents": self.documents, "metadatas": self.metadatas}, f)
+        os.replace(tmp_vectors, self.vectors_path)
+        os.replace(tmp_meta, self.meta_path)
+        self.matrix = np.load(self.vectors_path, mmap_mode="r")
+
+    @staticmethod
+    def normalize(vectors: np.ndarray) -> np.ndarray:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def count(self) -> int:
+        return len(self.ids)
+
+    def metadata_by_id(self) -> dict[str, dict[str, Any]]:
+        return dict(zip(self.ids, self.metadatas, strict=True))
+
+    def _keep_rows(self, rows: list[int]) -> np.ndarray:
+        """Drops every row not in `rows` from the lists; returns the kept vectors."""
+        self.ids = [self.ids[i] for i in rows]
+        self.documents = [self.documents[i] for i in rows]
+        self.metadatas = [self.metadatas[i] for i in rows]
+        return np.asarray(self.matrix)[rows]
+
+    def upsert(self, ids: list[str], documents: list[str], metadatas: list[dict[str, Any]], embeddings: np.ndarray) -> None:
+        new = self.normalize(np.atleast_2d(embeddings))
+        replaced = set(ids)
+        rows = [i for i, id_ in enumerate(self.ids) if id_ not in replaced]
+        # Always prune, even to nothing: replacing every stored id must not keep the old entries.
+        kept = self._keep_rows(rows)
+        matrix = np.concatenate([kept, new]) if len(kept) else new
+        self.ids += ids
+        self.documents += documents
+        self.metadatas += metadatas
+        self._save(matrix)
+
+    def delete(self, ids: list[str]) -> None:
+        removed = set(ids)
+        rows = [i for i, id_ in enumerate(self.ids) if id_ not in removed]
+        if len(rows) < self.count():
+            self._save(self._keep_rows(rows))
+
+    def search(self, vectors: np.ndarray, top_k: int, kind: str | None = None) -> list[list[dict[str, Any]]]:
+        """Top-k by cosine similarity; a batch of queries is one matrix-matrix product."""
+        if kind is None:
+            rows, matrix = range(self.count()), self.matrix
+        else:
+            rows = [i for i, metadata in enumerate(self.metadatas) if metadata.get("kind") == kind]
+            matrix = np.asarray(self.matrix)[rows]
+        if not len(rows):
+            return [[] for _ in range(len(vectors))]
+        scores = self.normalize(np.atleast_2d(vectors)) @ matrix.T
+        k = min(top_k, len(rows))
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        ranked = np.take_along_axis(top, np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1), axis=1)
+        return [[self.metadatas[rows[i]] for i in row] for row in ranked.tolist()]
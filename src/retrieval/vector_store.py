@@ -1,72 +1,301 @@
-import pathlib
-from typing import cast
+import hashlib
+import time
+from collections.abc import Callable, Sequence
+from functools import cached_property
+from pathlib import Path
+from typing import Any
 
-import chromadb
-from chromadb.utils import embedding_functions
+import numpy as np
 
-from src.schema import AetherisSchema, TableSchema
+from src.cache import LRUCache, TimedCacheStats
+from src.config import Config
+from src.logger import get_logger
+from src.retrieval.cache import CachedEncoder, EmbeddingCache, normalize_query
+from src.retrieval.indexes import ChromaIndex, NumpyIndex, VectorIndex
+from src.schema import AetherisSchema, ColumnType, TableSchema
+
+logger = get_logger(__name__)
+
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+# Part of every table fingerprint; bump when the document layout changes.
+INDEX_LAYOUT_VERSION = 2
+
+# A ranked table with the names of the columns to keep (None = all of them).
+RankedTable = tuple[str, tuple[str, ...] | None]
+
+
+def sample_column_values(db_path: str, schema: AetherisSchema, max_distinct: int = 50) -> dict[tuple[str, str], list[str]]:
+    """Distinct values of low-cardinality TEXT columns that have no `categories` in the schema."""
+    from src.engine.db import DBManager
+
+    values: dict[tuple[str, str], list[str]] = {}
+    with DBManager(schema, db_path, read_only=True) as db:
+        for table in schema.tables:
+            for col in table.columns:
+                if col.type != ColumnType.TEXT or col.categories:
+                    continue
+                sql = f'SELECT DISTINCT "{col.name}" FROM "{table.name}" WHERE "{col.name}" IS NOT NULL LIMIT ?'
+                rows = db.execute_query(sql, [max_distinct + 1])
+                if 0 < len(rows) <= max_distinct:
+                    values[(table.name, col.name)] = [str(r[0]) for r in rows]
+    return values
+
+
+def table_fingerprint(table: TableSchema, sampled_values: dict[tuple[str, str], list[str]]) -> str:
+    """Content hash of everything a table contributes to the index."""
+    h = hashlib.sha256(f"v{INDEX_LAYOUT_VERSION}\n{table.model_dump_json()}".encode())
+    for col in table.columns:
+        for value in sampled_values.get((table.name, col.name), []):
+            h.update(f"\n{col.name}={value}".encode())
+    return h.hexdigest()[:16]
+
+
+def schema_documents(
+    schema: AetherisSchema,
+    sampled_values: dict[tuple[str, str], list[str]] | None = None,
+) -> tuple[list[str], list[str], list[dict[str, Any]]]:
+    """Table, column and categorical-value documents for the hierarchical index.
+
+    Every document's metadata carries its table under "name" and that table's
+    fingerprint under "hash"; column and value documents add "column" so a hit
+    can be credited to both levels.
+    """
+    sampled_values = sampled_values or {}
+    ids: list[str] = []
+    documents: list[str] = []
+    metadatas: list[dict[str, Any]] = []
+
+    for table in schema.tables:
+        fingerprint = table_fingerprint(table, sampled_values)
+        columns_str = ", ".join([c.name for c in table.columns])
+        ids.append(f"table:{table.name}")
+        documents.append(f"Table: {table.name}. Description: {table.description}. Columns: {columns_str}")
+        metadatas.append({"kind": "table", "name": table.name, "hash": fingerprint})
+
+        for col in table.columns:
+            ids.append(f"column:{table.name}.{col.name}")
+            documents.append(f"Column {col.name} of table {table.name} ({col.type.value}): {col.description}")
+            metadatas.append({"kind": "column", "name": table.name, "column": col.name, "hash": fingerprint})
+
+            for value in col.categories or sampled_values.get((table.name, col.name), []):
+                ids.append(f"value:{table.name}.{col.name}={value}")
+                documents.append(f"{value} ({col.name} of {table.name})")
+                metadatas.append({"kind": "value", "name": table.name, "column": col.name, "hash": fingerprint})
+
+    return ids, documents, metadatas
+
+
+def sentence_transformer_encoder(model_name: str) -> Callable[[list[str]], Sequence[np.ndarray]]:
+    """Plain SentenceTransformer encoding, for backends that don't bring their own."""
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(model_name)
+    return lambda texts: model.encode(texts, convert_to_numpy=True)
 
 
 class SchemaRetriever:
-    """Handles indexing and searching of table schemas using ChromaDB."""
+    """Handles indexing and searching of table schemas.
+
+    The index backend is "chroma" (persistent ChromaDB collection) or "numpy"
+    (memory-mapped matrix, see NumpyIndex). It holds table, column and
+    categorical-value documents. Tables are ranked by their table documents
+    alone (`table_ranking="table"`, the ranking the model was trained with) or
+    by their best hit among all documents ("fused"); with `max_columns` set,
+    each table is pruned to its best-matching columns. Lookups go through two
+    cache levels: an in-memory LRU of normalized query text to ranking, then
+    an on-disk embedding cache so repeated questions skip the encoder.
+    """
 
     def __init__(
         self,
         schema: AetherisSchema,
         persist_directory: str = "data/chroma",
         collection_name: str = "home_schema",
+        query_cache_size: int = 1024,
+        embedding_cache_path: str = "data/embedding_cache.db",
+        backend: str | None = None,
+        index_directory: str = "data/vector_index",
+        max_columns: int | None = None,
+        table_ranking: str | None = None,
+        candidates: int = 32,
+        values_db_path: str | None = None,
     ):
+        """Cheap, no I/O: the index and embedding cache are opened on first search, the encoder model on first cache miss.
+
+        `backend`, `max_columns` and `table_ranking` default to their
+        Config.RETRIEVAL_* settings; `max_columns=0` keeps whole tables.
+        """
         self.schema = schema
-        pathlib.Path(persist_directory).mkdir(parents=True, exist_ok=True)
-        self.client = chromadb.PersistentClient(path=persist_directory)
+        self.backend = backend or Config.RETRIEVAL_BACKEND
+        if self.backend not in ("chroma", "numpy"):
+            raise ValueError(f"Unknown retrieval backend: {self.backend}")
+        self.persist_directory = persist_directory
+        self.collection_name = collection_name
+        self.index_directory = index_directory
+        self.max_columns = (Config.RETRIEVAL_MAX_COLUMNS if max_columns is None else max_columns) or None
+        self.table_ranking = table_ranking or Config.RETRIEVAL_TABLE_RANKING
+        if self.table_ranking not in ("table", "fused"):
+            raise ValueError(f"Unknown table ranking: {self.table_ranking}")
+        self.candidates = candidates
+        self.values_db_path = values_db_path
+        self.embedding_cache_path = embedding_cache_path
+
+        self.query_cache: LRUCache[tuple[str, int], list[RankedTable]] = LRUCache(query_cache_size)
+        self.query_stats = TimedCacheStats()
+
+    @cached_property
+    def emb_fn(self) -> Any:
+        """Chroma's SentenceTransformer embedding function (loads the model)."""
+        from chromadb.utils import embedding_functions
+
+        return embedding_functions.SentenceTransformerEmbeddingFunction(model_name=EMBEDDING_MODEL)
+
+    @cached_property
+    def base_encoder(self) -> Callable[[list[str]], Sequence[Any]]:
+        if self.backend == "chroma":
+            return self.emb_fn
+        return sentence_transformer_encoder(EMBEDDING_MODEL)
+
+    def _encode(self, texts: list[str]) -> Sequence[Any]:
+        return self.base_encoder(texts)
+
+    @cached_property
+    def encoder(self) -> CachedEncoder:
+        """Encoder behind the on-disk embedding cache (opened on first use)."""
+        return CachedEncoder(self._encode, EmbeddingCache(self.embedding_cache_path, EMBEDDING_MODEL))
 
-        self.emb_fn = embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name="all-MiniLM-L6-v2",
-        )
+    @cached_property
+    def index(self) -> VectorIndex:
+        """The backend index, synced with the schema on first access."""
+        index: VectorIndex
+        if self.backend == "chroma":
+            index = ChromaIndex(self.persist_directory, self.collection_name, self.emb_fn)
+        else:
+            index = NumpyIndex(self.index_directory)
+        self._sync_index(index)
+        return index
 
-        self.collection = self.client.get_or_create_collection(
-            name=collection_name,
-            embedding_function=cast("chromadb.EmbeddingFunction", self.emb_fn),
-        )
+    def _sync_index(self, index: VectorIndex) -> None:
+        """Brings the index in line with the schema, re-embedding only changed tables.
 
-        if self.collection.count() == 0:
-            self._index_tables()
+        A document is rewritten when its table's fingerprint differs from the
+        stored one and deleted when the schema no longer produces its id.
+        """
+        sampled: dict[tuple[str, str], list[str]] = {}
+        if self.values_db_path and Path(self.values_db_path).exists():
+            sampled = sample_column_values(self.values_db_path, self.schema)
+        ids, documents, metadatas = schema_documents(self.schema, sampled)
+        stored = index.metadata_by_id()
 
-    def _index_tables(self) -> None:
-        """Indexes all tables from the Pydantic schema into ChromaDB."""
-        documents: list[str] = []
-        metadatas: list[dict] = []
-        ids: list[str] = []
+        changed = [i for i, id_ in enumerate(ids) if stored.get(id_, {}).get("hash") != metadatas[i]["hash"]]
+        removed = sorted(stored.keys() - set(ids))
+        if removed:
+            index.delete(removed)
+        if changed:
+            texts = [documents[i] for i in changed]
+            index.upsert(
+                [ids[i] for i in changed],
+                texts,
+                [metadatas[i] for i in changed],
+                np.stack(self.encoder(texts)),
+            )
+        if changed or removed:
+            tables = {metadatas[i]["name"] for i in changed} | {str(stored[id_].get("name")) for id_ in removed}
+            logger.info("Schema index synced: %d documents upserted, %d deleted (%d tables)", len(changed), len(removed), len(tables))
 
-        for table in self.schema.tables:
-            columns_str = ", ".join([c.name for c in table.columns])
-            doc = f"Table: {table.name}. Description: {table.description}. Columns: {columns_str}"
+    def _rank(self, hits: list[dict[str, Any]], top_k: int, tables: list[str] | None = None) -> list[RankedTable]:
+        """Credits document hits to tables and columns; `tables` gives the table order instead of the hits.
 
-            documents.append(doc)
-            metadatas.append({"name": table.name})
-            ids.append(table.name)
+        A table or column scores by its single best hit, so one with many value
+        documents (every room of every table with a room column) cannot win on volume.
+        """
+        table_scores: dict[str, float] = {}
+        column_scores: dict[str, dict[str, float]] = {}
+        for rank, metadata in enumerate(hits):
+            table = str(metadata.get("name", ""))
+            score = 1.0 / (rank + 1)
+            table_scores[table] = max(table_scores.get(table, 0.0), score)
+            if "column" in metadata:
+                cols = column_scores.setdefault(table, {})
+                cols[metadata["column"]] = max(cols.get(metadata["column"], 0.0), score)
 
-        self.collection.add(
-            documents=documents,
-            metadatas=metadatas,  # pyright: ignore[reportArgumentType]
-            ids=ids,
-        )
+        if tables is None:
+            tables = sorted(table_scores, key=table_scores.__getitem__, reverse=True)
+        ranked: list[RankedTable] = []
+        for table in tables[:top_k]:
+            if self.max_columns is None:
+                ranked.append((table, None))
+                continue
+            cols = column_scores.get(table, {})
+            ranked.append((table, tuple(sorted(cols, key=cols.__getitem__, reverse=True)[: self.max_columns])))
+        return ranked
+
+    def _search(self, texts: list[str], top_k: int) -> list[list[RankedTable]]:
+        """Ranks tables for normalized queries with one encoder pass and at most two index searches."""
+        vectors = np.stack(self.encoder(texts))
+        orders: list[list[str] | None] = [None] * len(texts)
+        if self.table_ranking == "table":
+            orders = [[str(m.get("name", "")) for m in row] for row in self.index.search(vectors, top_k, kind="table")]
+        hits: list[list[dict[str, Any]]] = [[] for _ in texts]
+        if self.table_ranking == "fused" or self.max_columns is not None:
+            hits = self.index.search(vectors, min(max(self.candidates, top_k), self.index.count()))
+        return [self._rank(row, top_k, order) for row, order in zip(hits, orders, strict=True)]
+
+    def _materialize(self, ranked: list[RankedTable]) -> list[TableSchema]:
+        """Schema objects for a ranking, pruned to the kept columns in schema order."""
+        tables: list[TableSchema] = []
+        for name, keep in ranked:
+            table = self.schema.get_table(name)
+            if table is None:
+                continue
+            if keep is not None:
+                columns = [c for c in table.columns if c.name in keep] or table.columns[: self.max_columns]
+                table = table.model_copy(update={"columns": columns})
+            tables.append(table)
+        return tables
+
+    def get_relevant_tables_batch(
+        self,
+        queries: list[str],
+        top_k: int = 2,
+        batch_size: int = 64,
+    ) -> list[list[TableSchema]]:
+        """Returns the most relevant table schemas for each query.
+
+        Query-cache misses are de-duplicated and encoded `batch_size` at a time.
+        """
+        start = time.perf_counter()
+        keys = [(normalize_query(q), top_k) for q in queries]
+        ranked: dict[tuple[str, int], list[RankedTable]] = {}
+        for key in keys:
+            tables = self.query_cache.get(key)
+            if tables is not None:
+                ranked[key] = tables
+        lookup_time = (time.perf_counter() - start) / max(len(keys), 1)
+        missing = list(dict.fromkeys(k for k in keys if k not in ranked))
+        # Repeats of a missing query within the batch are served by its single search.
+        for _ in range(len(keys) - len(missing)):
+            self.query_stats.record(True, lookup_time)
+
+        for offset in range(0, len(missing), batch_size):
+            chunk = missing[offset : offset + batch_size]
+            chunk_start = time.perf_counter()
+            for key, tables in zip(chunk, self._search([k[0] for k in chunk], top_k), strict=True):
+                ranked[key] = tables
+                self.query_cache.put(key, tables)
+            per_query = (time.perf_counter() - chunk_start) / len(chunk)
+            for _ in chunk:
+                self.query_stats.record(False, per_query)
+
+        return [self._materialize(ranked[key]) for key in keys]
 
     def get_relevant_tables(self, query: str, top_k: int = 2) -> list[TableSchema]:
         """Returns the most relevant table schemas for a given NL query."""
-        results = self.collection.query(
-            query_texts=[query],
-            n_results=top_k,
-        )
-
-        relevant_tables: list[TableSchema] = []
-
-        if results["metadatas"]:
-            for metadata_list in results["metadatas"]:
-                for metadata in metadata_list:
-                    table_name = str(metadata.get("name", ""))
-                    table = self.schema.get_table(table_name)
-                    if table:
-                        relevant_tables.append(table)
-
-        return relevant_tables
+        return self.get_relevant_tables_batch([query], top_k=top_k)[0]
+
+    def cache_report(self) -> dict[str, dict[str, object]]:
+        """Hit rate and latency percentiles (ms) for both cache levels."""
+        return {
+            "query_cache": self.query_stats.summary(),
+            "embedding_cache": self.encoder.cache.stats.summary(),
+        }
@@ -39,6 +39,8 @@ class AetherisSchema(BaseModel):
         return next((t for t in self.tables if t.name == name), None)
 
 
+ROOMS = ["Kitchen", "Living Room", "Bedroom", "Bathroom", "Garage", "Office", "Hallway", "Home Cinema"]
+
 AETHERIS_DB = AetherisSchema(
     tables=[
         TableSchema(
@@ -47,10 +49,25 @@ AETHERIS_DB = AetherisSchema(
             columns=[
                 ColumnSchema(name="id", type=ColumnType.TEXT, description="Unique identifier for the hardware device"),
                 ColumnSchema(name="name", type=ColumnType.TEXT, description="Human-readable name assigned to the device"),
-                ColumnSchema(name="room", type=ColumnType.TEXT, description="Location/Room where the device is installed"),
-                ColumnSchema(name="type", type=ColumnType.TEXT, description="Category of device (e.g., sensor, actuator, light)"),
+                ColumnSchema(
+                    name="room",
+                    type=ColumnType.TEXT,
+                    description="Location/Room where the device is installed",
+                    categories=ROOMS,
+                ),
+                ColumnSchema(
+                    name="type",
+                    type=ColumnType.TEXT,
+                    description="Category of device (e.g., sensor, actuator, light)",
+                    categories=["sensor", "actuator", "light", "camera", "thermostat", "plug", "speaker"],
+                ),
                 ColumnSchema(name="manufacturer", type=ColumnType.TEXT, description="Company that produced the device"),
-                ColumnSchema(name="status", type=ColumnType.TEXT, description="Current operational state (online, offline, standby)"),
+                ColumnSchema(
+                    name="status",
+                    type=ColumnType.TEXT,
+                    description="Current operational state (online, offline, standby)",
+                    categories=["online", "offline", "standby"],
+                ),
             ],
         ),
         TableSchema(
@@ -59,19 +76,49 @@ AETHERIS_DB = AetherisSchema(
             columns=[
                 ColumnSchema(name="device_id", type=ColumnType.TEXT, description="Reference to the device being monitored"),
                 ColumnSchema(name="timestamp", type=ColumnType.DATETIME, description="Exact time of the energy reading"),
-                ColumnSchema(name="kwh", type=ColumnType.REAL, description="Energy consumed since last reading in kilowatt-hours"),
-                ColumnSchema(name="voltage", type=ColumnType.REAL, description="Main line voltage measured at the device plug"),
+                ColumnSchema(
+                    name="kwh",
+                    type=ColumnType.REAL,
+                    description="Energy consumed since last reading in kilowatt-hours",
+                    min_val=0.0,
+                    max_val=5.0,
+                ),
+                ColumnSchema(
+                    name="voltage",
+                    type=ColumnType.REAL,
+                    description="Main line voltage measured at the device plug",
+                    min_val=210.0,
+                    max_val=240.0,
+                ),
             ],
         ),
         TableSchema(
             name="climate_stats",
             description="Indoor climate and air quality metrics.",
             columns=[
-                ColumnSchema(name="room", type=ColumnType.TEXT, description="Room where the climate sensor is located"),
+                ColumnSchema(name="room", type=ColumnType.TEXT, description="Room where the climate sensor is located", categories=ROOMS),
                 ColumnSchema(name="timestamp", type=ColumnType.DATETIME, description="Time of environmental data capture"),
-                ColumnSchema(name="temp", type=ColumnType.REAL, description="Ambient temperature in degrees Celsius"),
-                ColumnSchema(name="humidity", type=ColumnType.REAL, description="Relative humidity percentage (0-100%)"),
-                ColumnSchema(name="co2", type=ColumnType.INTEGER, description="Carbon dioxide concentration in ppm (parts per million)"),
+                ColumnSchema(
+                    name="temp",
+                    type=ColumnType.REAL,
+                    description="Ambient temperature in degrees Celsius",
+                    min_val=15.0,
+                    max_val=32.0,
+                ),
+                ColumnSchema(
+                    name="humidity",
+                    type=ColumnType.REAL,
+                    description="Relative humidity percentage (0-100%)",
+                    min_val=0.0,
+                    max_val=100.0,
+                ),
+                ColumnSchema(
+                    name="co2",
+                    type=ColumnType.INTEGER,
+                    description="Carbon dioxide concentration in ppm (parts per million)",
+                    min_val=400,
+                    max_val=2000,
+                ),
             ],
         ),
         TableSchema(
@@ -79,8 +126,18 @@ AETHERIS_DB = AetherisSchema(
             description="Security events and access logs.",
             columns=[
                 ColumnSchema(name="timestamp", type=ColumnType.DATETIME, description="Event occurrence time"),
-                ColumnSchema(name="event_type", type=ColumnType.TEXT, description="Type of event (e.g., motion detected, door opened)"),
-                ColumnSchema(name="severity", type=ColumnType.TEXT, description="Alert level: low, medium, high, or critical"),
+                ColumnSchema(
+                    name="event_type",
+                    type=ColumnType.TEXT,
+                    description="Type of event (e.g., motion detected, door opened)",
+                    categories=["motion detected", "door opened", "door closed", "window opened", "glass break", "face recognized"],
+                ),
+                ColumnSchema(
+                    name="severity",
+                    type=ColumnType.TEXT,
+                    description="Alert level: low, medium, high, or critical",
+                    categories=["low", "medium", "high", "critical"],
+                ),
                 ColumnSchema(name="authorized_person", type=ColumnType.TEXT, description="Name of the person identified, if applicable"),
             ],
         ),
@@ -89,9 +146,26 @@ AETHERIS_DB = AetherisSchema(
             description="States of smart lighting including brightness and color.",
             columns=[
                 ColumnSchema(name="device_id", type=ColumnType.TEXT, description="ID of the smart bulb or light strip"),
-                ColumnSchema(name="brightness", type=ColumnType.INTEGER, description="Current light intensity (0-100)"),
-                ColumnSchema(name="color_temp", type=ColumnType.INTEGER, description="Color temperature in Kelvin"),
-                ColumnSchema(name="mode", type=ColumnType.TEXT, description="Active lighting scene (e.g., movie, reading, night)"),
+                ColumnSchema(
+                    name="brightness",
+                    type=ColumnType.INTEGER,
+                    description="Current light intensity (0-100)",
+                    min_val=0,
+                    max_val=100,
+                ),
+                ColumnSchema(
+                    name="color_temp",
+                    type=ColumnType.INTEGER,
+                    description="Color temperature in Kelvin",
+                    min_val=2700,
+                    max_val=6500,
+                ),
+                ColumnSchema(
+                    name="mode",
+                    type=ColumnType.TEXT,
+                    description="Active lighting scene (e.g., movie, reading, night)",
+                    categories=["movie", "reading", "night", "relax", "focus", "party"],
+                ),
             ],
         ),
         TableSchema(
@@ -100,21 +174,40 @@ AETHERIS_DB = AetherisSchema(
             columns=[
                 ColumnSchema(name="sensor_id", type=ColumnType.TEXT, description="ID of the water flow meter"),
                 ColumnSchema(name="timestamp", type=ColumnType.DATETIME, description="Time of measurement"),
-                ColumnSchema(name="liters", type=ColumnType.REAL, description="Total volume of water used in the interval"),
-                ColumnSchema(name="flow_rate", type=ColumnType.REAL, description="Current speed of water flow in liters per minute"),
+                ColumnSchema(
+                    name="liters",
+                    type=ColumnType.REAL,
+                    description="Total volume of water used in the interval",
+                    min_val=0.0,
+                    max_val=50.0,
+                ),
+                ColumnSchema(
+                    name="flow_rate",
+                    type=ColumnType.REAL,
+                    description="Current speed of water flow in liters per minute",
+                    min_val=0.0,
+                    max_val=15.0,
+                ),
             ],
         ),
         TableSchema(
             name="occupancy",
             description="Room occupancy and activity levels.",
             columns=[
-                ColumnSchema(name="room", type=ColumnType.TEXT, description="Room being monitored"),
+                ColumnSchema(name="room", type=ColumnType.TEXT, description="Room being monitored", categories=ROOMS),
                 ColumnSchema(name="timestamp", type=ColumnType.DATETIME, description="Measurement time"),
-                ColumnSchema(name="person_count", type=ColumnType.INTEGER, description="Estimated number of people present"),
+                ColumnSchema(
+                    name="person_count",
+                    type=ColumnType.INTEGER,
+                    description="Estimated number of people present",
+                    min_val=0,
+                    max_val=8,
+                ),
                 ColumnSchema(
                     name="activity_level",
                     type=ColumnType.TEXT,
                     description="Level of movement detected (stationary, active, high)",
+                    categories=["stationary", "active", "high"],
                 ),
             ],
         ),
@@ -123,8 +216,20 @@ AETHERIS_DB = AetherisSchema(
             description="Maintenance and health status of home appliances.",
             columns=[
                 ColumnSchema(name="device_id", type=ColumnType.TEXT, description="ID of the appliance (e.g., vacuum, air purifier)"),
-                ColumnSchema(name="battery_level", type=ColumnType.INTEGER, description="Remaining battery charge percentage"),
-                ColumnSchema(name="filter_life", type=ColumnType.INTEGER, description="Remaining consumable life percentage"),
+                ColumnSchema(
+                    name="battery_level",
+                    type=ColumnType.INTEGER,
+                    description="Remaining battery charge percentage",
+                    min_val=0,
+                    max_val=100,
+                ),
+                ColumnSchema(
+                    name="filter_life",
+                    type=ColumnType.INTEGER,
+                    description="Remaining consumable life percentage",
+                    min_val=0,
+                    max_val=100,
+                ),
                 ColumnSchema(name="last_service", type=ColumnType.DATE, description="Date of the last professional maintenance"),
             ],
         ),
@@ -133,9 +238,27 @@ AETHERIS_DB = AetherisSchema(
             description="Internet and local network usage per device.",
             columns=[
                 ColumnSchema(name="device_id", type=ColumnType.TEXT, description="ID of the connected device"),
-                ColumnSchema(name="bandwidth_up", type=ColumnType.REAL, description="Current upload speed in Mbps"),
-                ColumnSchema(name="bandwidth_down", type=ColumnType.REAL, description="Current download speed in Mbps"),
-                ColumnSchema(name="signal_strength", type=ColumnType.INTEGER, description="Wi-Fi signal strength in dBm or percentage"),
+                ColumnSchema(
+                    name="bandwidth_up",
+                    type=ColumnType.REAL,
+                    description="Current upload speed in Mbps",
+                    min_val=0.0,
+                    max_val=100.0,
+                ),
+                ColumnSchema(
+                    name="bandwidth_down",
+                    type=ColumnType.REAL,
+                    description="Current download speed in Mbps",
+                    min_val=0.0,
+                    max_val=500.0,
+                ),
+                ColumnSchema(
+                    name="signal_strength",
+                    type=ColumnType.INTEGER,
+                    description="Wi-Fi signal strength in dBm or percentage",
+                    min_val=-90,
+                    max_val=-30,
+                ),
             ],
         ),
         TableSchema(
@@ -143,9 +266,15 @@ AETHERIS_DB = AetherisSchema(
             description="History of voice assistant interactions.",
             columns=[
                 ColumnSchema(name="timestamp", type=ColumnType.DATETIME, description="When the command was issued"),
-                ColumnSchema(name="room", type=ColumnType.TEXT, description="Room where the voice was captured"),
+                ColumnSchema(name="room", type=ColumnType.TEXT, description="Room where the voice was captured", categories=ROOMS),
                 ColumnSchema(name="command_text", type=ColumnType.TEXT, description="Transcribed text of the voice command"),
-                ColumnSchema(name="success_rate", type=ColumnType.REAL, description="Confidence level or execution success score"),
+                ColumnSchema(
+                    name="success_rate",
+                    type=ColumnType.REAL,
+                    description="Confidence level or execution success score",
+                    min_val=0.0,
+                    max_val=1.0,
+                ),
             ],
         ),
     ],
@@ -1,5 +1,3 @@
-import torch
-
 from src.config import Config
 from src.inference import AuraInference
 from src.logger import get_logger
@@ -41,6 +39,8 @@ def run_debug_test() -> None:
 
 
 if __name__ == "__main__":
+    import torch
+
     if torch.cuda.is_available():
         torch.cuda.empty_cache()
 
@@ -0,0 +1,110 @@
+import unittest
+
+from src.engine.grammar import MAX_LIMIT_DIGITS, MAX_STRING_CHARS, AuraGrammar
+from src.generation.constrained import TokenIndex
+from src.schema import AETHERIS_DB
+
+
+class CharTokenizer:
+    """Just enough of a Hugging Face tokenizer for TokenIndex: single characters plus a few words."""
+
+    eos_token_id = 0
+
+    def __init__(self):
+        chars = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 _'|>=(),.-\n"
+        self.vocab = ["<eos>", *chars, "SOURCE ", " |> ", "FILTER", "LIMIT", "devices", "Kitchen'"]
+        self.ids = {text: i for i, text in enumerate(self.vocab)}
+        self.all_special_ids = [self.eos_token_id]
+
+    def __len__(self) -> int:
+        return len(self.vocab)
+
+    def encode(self, text: str, add_special_tokens: bool = False) -> list[int]:
+        return [self.ids[ch] for ch in text]
+
+    def decode(self, ids: list[int]) -> str:
+        return "".join(self.vocab[i] for i in ids)
+
+    def batch_decode(self, batch: list[list[int]]) -> list[str]:
+        return [self.decode(ids) for ids in batch]
+
+
+class GrammarMatchTest(unittest.TestCase):
+    def setUp(self):
+        self.grammar = AuraGrammar(AETHERIS_DB.tables)
+
+    def test_accepts_canonical_queries(self):
+        for dsl in (
+            "SOURCE devices",
+            "SOURCE devices |> FILTER room == 'Kitchen' |> FILTER status != 'offline'",
+            "SOURCE energy_consumption |> FILTER kwh > -1.5 |> AGGREGATE SUM(kwh) BY device_id |> SORT kwh DESC |> LIMIT 5",
+            "SOURCE devices |> SORT name ASC |> LIMIT 10",
+            "SOURCE devices |> FILTER name == ''",
+        ):
+            with self.subTest(dsl=dsl):
+                self.assertTrue(self.grammar.matches(dsl))
+
+    def test_rejects_invalid_queries(self):
+        for dsl in (
+            "SOURCE devices |>",  # incomplete
+            "SOURCE nowhere",  # unknown table
+            "SOURCE devices |> FILTER kwh > 1",  # column of another table
+            "SOURCE energy_consumption |> FILTER kwh > 'high'",  # string for a numeric column
+            "SOURCE devices |> LIMIT 5 |> FILTER room == 'Kitchen'",  # out of order
+            "SOURCE devices |> SORT name ASC |> SORT room ASC",  # repeated
+            "SOURCE energy_consumption |> AGGREGATE SUM(kwh) BY device_id |> SORT timestamp DESC",
+            "SOURCE devices  |> LIMIT 5",  # not canonical spacing
+            "SOURCE devices |> AGGREGATE COUNT(name) BY room",  # devices has no numeric column
+            f"SOURCE devices |> LIMIT {'9' * (MAX_LIMIT_DIGITS + 1)}",
+        ):
+            with self.subTest(dsl=dsl):
+                self.assertFalse(self.grammar.matches(dsl))
+
+    def test_string_length_cap(self):
+        self.assertTrue(self.grammar.matches(f"SOURCE devices |> FILTER name == '{'a' * MAX_STRING_CHARS}'"))
+        self.assertFalse(self.grammar.matches(f"SOURCE devices |> FILTER name == '{'a' * (MAX_STRING_CHARS + 1)}'"))
+
+    def test_closed_values(self):
+        closed = AuraGrammar(AETHERIS_DB.tables, closed_values=True)
+        room = AETHERIS_DB.get_table("devices").columns[2]
+        self.assertEqual(room.name, "room")
+        self.assertTrue(closed.matches(f"SOURCE devices |> FILTER room == '{room.categories[0]}'"))
+        self.assertFalse(closed.matches("SOURCE devices |> FILTER room == 'Attic'"))
+
+
+class TokenIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.tokenizer = CharTokenizer()
+        self.index = TokenIndex(self.tokenizer)
+        self.grammar = AuraGrammar(AETHERIS_DB.tables)
+
+    def allowed(self, prefix: str) -> set[str]:
+        state = self.grammar.feed(self.grammar.initial, prefix)
+        assert state is not None, prefix
+        return {self.tokenizer.vocab[i] for i in self.index.allowed(self.grammar, state)}
+
+    def test_start_of_query(self):
+        self.assertEqual(self.allowed(""), {"S", "SOURCE "})
+
+    def test_multi_char_tokens_must_fit_the_grammar(self):
+        allowed = self.allowed("SOURCE devices |> ")
+        self.assertIn("FILTER", allowed)
+        self.assertIn("LIMIT", allowed)
+        self.assertNotIn("devices", allowed)
+        self.assertNotIn("A", allowed)  # no AGGREGATE: devices has nothing numeric to aggregate
+        self.assertNotIn("<eos>", allowed)
+
+    def test_eos_only_where_the_query_may_end(self):
+        self.assertIn("<eos>", self.allowed("SOURCE devices"))
+        self.assertIn(" |> ", self.allowed("SOURCE devices"))
+        self.assertEqual(self.allowed(f"SOURCE devices |> LIMIT {'9' * MAX_LIMIT_DIGITS}"), {"<eos>"})
+
+    def test_open_string_is_forced_closed_at_the_cap(self):
+        prefix = "SOURCE devices |> FILTER name == '"
+        self.assertIn("Kitchen'", self.allowed(prefix))
+        self.assertNotIn("\n", self.allowed(prefix))
+        self.assertEqual(self.allowed(prefix + "a" * MAX_STRING_CHARS), {"'"})
+
+
+if __name__ == "__main__":
+    unittest.main()
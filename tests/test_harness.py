@@ -0,0 +1,55 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.engine.db import DBManager
+from src.evaluation.harness import EvaluationEngine
+from src.evaluation.predictors import FakePredictor
+from src.schema import AETHERIS_DB
+
+SAMPLES = [
+    {"input": "total energy per device", "output": "SOURCE energy_consumption |> AGGREGATE SUM(kwh) BY device_id"},
+    {"input": "readings above 2 kwh", "output": "SOURCE energy_consumption |> FILTER kwh > 2 |> LIMIT 10"},
+]
+
+
+class CheckpointResumeTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.tmp.name) / "aetheris.db")
+        self.checkpoint = Path(self.tmp.name) / "results.jsonl"
+        with DBManager(AETHERIS_DB, self.db_path) as db:
+            db.setup_db()
+            with db.connection() as conn:
+                conn.executemany(
+                    "INSERT INTO energy_consumption (device_id, kwh) VALUES (?, ?)",
+                    [("Lamp_001", 1.0), ("Plug_002", 2.5), ("Lamp_001", 3.0)],
+                )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def engine(self, error_rate: float) -> EvaluationEngine:
+        predictor = FakePredictor({s["input"]: s["output"] for s in SAMPLES}, error_rate=error_rate)
+        return EvaluationEngine(predictor, self.checkpoint, self.db_path, workers=1)
+
+    def test_resume_same_predictor(self):
+        first = self.engine(0.0).run(SAMPLES)
+        second = self.engine(0.0).run(SAMPLES)
+        self.assertEqual((first.new_samples, second.new_samples), (2, 0))
+        self.assertEqual(second.exec_matches, 2)
+
+    def test_other_predictor_is_refused(self):
+        self.engine(0.0).run(SAMPLES)
+        with self.assertRaisesRegex(ValueError, "error_rate=0,"):
+            self.engine(1.0).run(SAMPLES)
+
+    def test_changed_expected_dsl_is_evaluated_again(self):
+        self.engine(0.0).run(SAMPLES)
+        changed = [SAMPLES[0], {**SAMPLES[1], "output": "SOURCE energy_consumption |> LIMIT 1"}]
+        report = self.engine(0.0).run(changed)
+        self.assertEqual(report.new_samples, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.retrieval.indexes import NumpyIndex
+
+
+def _metadata(ids: list[str], version: str) -> list[dict[str, str]]:
+    return [{"kind": "table", "name": id_, "hash": version} for id_ in ids]
+
+
+class NumpyIndexUpsertTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.ids = ["a", "b", "c"]
+        self.index = NumpyIndex(self.tmp.name)
+        self.index.upsert(self.ids, self.ids, _metadata(self.ids, "v1"), np.eye(3, 4, dtype=np.float32))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_upsert_every_existing_id(self):
+        vectors = np.eye(3, 4, k=1, dtype=np.float32)
+        self.index.upsert(self.ids, self.ids, _metadata(self.ids, "v2"), vectors)
+
+        for index in (self.index, NumpyIndex(self.tmp.name)):
+            self.assertEqual(index.count(), 3)
+            self.assertEqual(len(index.matrix), 3)
+            self.assertEqual({m["hash"] for m in index.metadata_by_id().values()}, {"v2"})
+            hits = index.search(vectors, top_k=5)
+            self.assertEqual([row[0]["name"] for row in hits], self.ids)
+
+    def test_upsert_some_ids(self):
+        self.index.upsert(["b", "d"], ["b", "d"], _metadata(["b", "d"], "v2"), np.eye(2, 4, k=2, dtype=np.float32))
+        self.assertEqual(self.index.ids, ["a", "c", "b", "d"])
+        self.assertEqual(len(self.index.matrix), 4)
+        hits = self.index.search(np.eye(1, 4, k=3, dtype=np.float32), top_k=1)
+        self.assertEqual(hits[0][0]["name"], "d")
+
+
+if __name__ == "__main__":
+    unittest.main()
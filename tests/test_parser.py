@@ -0,0 +1,82 @@
+import unittest
+
+from src.engine.lexer import DSLSyntaxError
+from src.engine.nodes import Aggregate, Filter, Limit, Sort
+from src.engine.parser import parse
+from src.engine.transpiler import AuraTranspiler
+from src.schema import AETHERIS_DB
+
+
+class ParserShapeTest(unittest.TestCase):
+    def test_valid_shapes(self):
+        shapes = {
+            "SOURCE devices": [],
+            "SOURCE devices |> FILTER room == 'Kitchen'": [Filter],
+            "SOURCE devices |> FILTER room == 'Kitchen' |> FILTER status != 'offline'": [Filter, Filter],
+            "SOURCE energy_consumption |> AGGREGATE SUM(kwh) BY device_id": [Aggregate],
+            "SOURCE devices |> SORT name DESC |> LIMIT 3": [Sort, Limit],
+            "SOURCE energy_consumption |> FILTER kwh > 1.5 |> AGGREGATE AVG(kwh) BY device_id |> SORT kwh DESC |> LIMIT 5": [
+                Filter,
+                Aggregate,
+                Sort,
+                Limit,
+            ],
+        }
+        for dsl, kinds in shapes.items():
+            with self.subTest(dsl=dsl):
+                query = parse(dsl)
+                self.assertEqual([type(stage) for stage in query.stages], kinds)
+
+    def test_literal_slots_follow_query_order(self):
+        query = parse("SOURCE climate_stats |> FILTER room == 'Kitchen' |> FILTER temp > 21.5 |> LIMIT 4")
+        self.assertEqual([(s.value.value, s.value.slot) for s in query.stages[:2]], [("Kitchen", 0), (21.5, 1)])
+        self.assertEqual(query.stages[2].count.slot, 2)
+
+    def test_order_violations(self):
+        for dsl in (
+            "SOURCE devices |> LIMIT 5 |> FILTER room == 'Kitchen'",
+            "SOURCE energy_consumption |> AGGREGATE SUM(kwh) BY device_id |> FILTER kwh > 3",
+            "SOURCE devices |> SORT name ASC |> AGGREGATE COUNT(id) BY room",
+            "SOURCE devices |> SORT name ASC |> SORT room DESC",
+            "SOURCE devices |> LIMIT 5 |> LIMIT 2",
+            "SOURCE energy_consumption |> AGGREGATE SUM(kwh) BY device_id |> AGGREGATE MAX(kwh) BY device_id",
+        ):
+            with self.subTest(dsl=dsl), self.assertRaises(DSLSyntaxError):
+                parse(dsl)
+
+    def test_unknown_stage(self):
+        with self.assertRaisesRegex(DSLSyntaxError, "Unknown stage 'GROUP'"):
+            parse("SOURCE devices |> GROUP room")
+
+    def test_malformed_stage(self):
+        for dsl in ("SOURCE devices |> FILTER room 'Kitchen'", "SOURCE devices |> LIMIT 'five'", "SOURCE devices |>"):
+            with self.subTest(dsl=dsl), self.assertRaises(DSLSyntaxError):
+                parse(dsl)
+
+
+class PlanCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.transpiler = AuraTranspiler(AETHERIS_DB)
+
+    def test_same_shape_hits_with_new_params(self):
+        sql, params = self.transpiler.translate("SOURCE devices |> FILTER room == 'Kitchen' |> LIMIT 5")
+        sql2, params2 = self.transpiler.translate("SOURCE  devices |> FILTER room == 'Garage' |> LIMIT 10")
+        self.assertEqual(sql, sql2)
+        self.assertEqual((params, params2), (["Kitchen", 5], ["Garage", 10]))
+        self.assertEqual((self.transpiler.cache_stats.hits, self.transpiler.cache_stats.misses), (1, 1))
+
+    def test_different_shapes_miss(self):
+        self.transpiler.translate("SOURCE devices |> FILTER room == 'Kitchen'")
+        self.transpiler.translate("SOURCE devices |> FILTER status == 'online'")
+        self.assertEqual(self.transpiler.cache_stats.misses, 2)
+
+    def test_rejected_query_is_not_cached(self):
+        dsl = "SOURCE devices |> LIMIT 5 |> FILTER room == 'Kitchen'"
+        for _ in range(2):
+            with self.assertRaises(DSLSyntaxError):
+                self.transpiler.translate(dsl)
+        self.assertEqual(self.transpiler.cache_stats.hits, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
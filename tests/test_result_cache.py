@@ -0,0 +1,58 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.engine.db import DBManager
+from src.evaluation.validator import DSLValidator
+from src.schema import AETHERIS_DB
+
+EXPECTED = [
+    "SOURCE energy_consumption |> AGGREGATE SUM(kwh) BY device_id |> SORT kwh DESC",
+    "SOURCE energy_consumption |> FILTER kwh > 1.5",
+    "SOURCE energy_consumption |> SORT kwh ASC |> LIMIT 2",
+]
+
+
+class ResultCacheAcrossRunsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.tmp.name) / "aetheris.db")
+        self.cache_path = str(Path(self.tmp.name) / "result_cache.db")
+        with DBManager(AETHERIS_DB, self.db_path) as db:
+            db.setup_db()
+            with db.connection() as conn:
+                conn.executemany(
+                    "INSERT INTO energy_consumption (device_id, kwh) VALUES (?, ?)",
+                    [("Lamp_001", 1.0), ("Plug_002", 2.5), ("Lamp_001", 3.0)],
+                )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def evaluate(self) -> int:
+        """One evaluation run; returns how many expected queries had to be executed."""
+        validator = DSLValidator(self.db_path, self.cache_path)
+        executed = 0
+        iter_query = validator.db.iter_query
+
+        def counting_iter_query(*args, **kwargs):
+            nonlocal executed
+            executed += 1
+            return iter_query(*args, **kwargs)
+
+        validator.db.iter_query = counting_iter_query
+        for dsl in EXPECTED:
+            self.assertTrue(validator.compare_results(dsl, dsl))
+        validator.db.close()
+        validator.cache.close()
+        return executed - len(EXPECTED)  # every comparison also runs the predicted query
+
+    def test_second_run_is_served_from_cache(self):
+        self.assertEqual(self.evaluate(), len(EXPECTED))
+        # The first run's read-only connection left an empty WAL behind.
+        self.assertTrue(Path(f"{self.db_path}-wal").exists())
+        self.assertEqual(self.evaluate(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+import unittest
+
+from src.evaluation.streaming import digest_chunks, streams_equal
+
+
+class StreamEqualityTest(unittest.TestCase):
+    def assertSameVerdict(self, left: list[list[tuple]], right: list[list[tuple]], ordered: bool) -> bool:
+        """streams_equal must agree with comparing digests, as the cached path does."""
+        direct = streams_equal(iter(left), iter(right), ordered)
+        cached = digest_chunks(iter(left), ordered) == digest_chunks(iter(right), ordered)
+        self.assertEqual(direct, cached)
+        return direct
+
+    def test_int_and_float_differ_on_both_paths(self):
+        for ordered in (True, False):
+            self.assertFalse(self.assertSameVerdict([[(1, "a")]], [[(1.0, "a")]], ordered))
+
+    def test_chunking_does_not_matter(self):
+        rows = [(i, f"r{i}") for i in range(5)]
+        self.assertTrue(self.assertSameVerdict([rows[:2], rows[2:]], [rows[:4], rows[4:]], ordered=True))
+        self.assertTrue(self.assertSameVerdict([rows], [rows[::-1]], ordered=False))
+        self.assertFalse(self.assertSameVerdict([rows], [rows[::-1]], ordered=True))
+
+    def test_length_mismatch(self):
+        for ordered in (True, False):
+            self.assertFalse(self.assertSameVerdict([[(1,), (2,)]], [[(1,)]], ordered))
+
+
+if __name__ == "__main__":
+    unittest.main()
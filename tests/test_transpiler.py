@@ -0,0 +1,66 @@
+"""Run with: python -m unittest discover -s tests -t ."""
+
+import random
+import re
+import sqlite3
+import unittest
+
+from src.data_gen.generate import SkeletonGenerator
+from src.engine.grammar import AuraGrammar
+from src.engine.transpiler import AuraTranspiler
+from src.schema import AETHERIS_DB
+
+
+class SortAfterAggregateTest(unittest.TestCase):
+    def setUp(self):
+        self.transpiler = AuraTranspiler(AETHERIS_DB)
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute("CREATE TABLE energy_consumption (device_id TEXT, kwh REAL)")
+        rows = [("a", 5.0), ("b", 1.0), ("b", 1.0), ("c", 3.0), ("c", 4.0), ("a", 0.5)]
+        self.conn.executemany("INSERT INTO energy_consumption VALUES (?, ?)", rows)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def run_dsl(self, dsl: str) -> list[tuple]:
+        sql, params = self.transpiler.translate(dsl)
+        return self.conn.execute(sql, params).fetchall()
+
+    def test_sort_by_aggregated_column_orders_by_aggregate(self):
+        dsl = "SOURCE energy_consumption |> AGGREGATE SUM(kwh) BY device_id |> SORT kwh DESC"
+        sql, _ = self.transpiler.translate(dsl)
+        self.assertIn('ORDER BY SUM("kwh") DESC', sql)
+        self.assertEqual(self.run_dsl(dsl), [("c", 7.0), ("a", 5.5), ("b", 2.0)])
+
+    def test_sort_by_group_column(self):
+        dsl = "SOURCE energy_consumption |> AGGREGATE MAX(kwh) BY device_id |> SORT device_id ASC"
+        self.assertEqual(self.run_dsl(dsl), [("a", 5.0), ("b", 1.0), ("c", 4.0)])
+
+    def test_sort_after_aggregate_on_other_column_is_rejected(self):
+        dsl = "SOURCE energy_consumption |> AGGREGATE SUM(kwh) BY device_id |> SORT timestamp DESC"
+        with self.assertRaisesRegex(ValueError, "SORT must use kwh or device_id"):
+            self.transpiler.translate(dsl)
+        self.assertFalse(AuraGrammar(AETHERIS_DB.tables).matches(dsl))
+        self.assertTrue(AuraGrammar(AETHERIS_DB.tables).matches(dsl.replace("timestamp", "kwh")))
+
+    def test_sort_without_aggregate_uses_column(self):
+        sql, params = self.transpiler.translate("SOURCE energy_consumption |> SORT kwh ASC |> LIMIT 2")
+        self.assertEqual(sql, 'SELECT * FROM "energy_consumption" ORDER BY "kwh" ASC LIMIT ?')
+        self.assertEqual(params, [2])
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+class SkeletonSortTest(unittest.TestCase):
+    def test_generated_skeletons_compile_and_match_the_grammar(self):
+        random.seed(0)
+        generator = SkeletonGenerator(AETHERIS_DB)
+        transpiler = AuraTranspiler(AETHERIS_DB)
+        grammar = AuraGrammar(AETHERIS_DB.tables)
+        for _ in range(300):
+            dsl = re.sub(r"\{\{\w+\}\}", "1", generator.generate_skeleton()["dsl_skeleton"])
+            with self.subTest(dsl=dsl):
+                transpiler.translate(dsl)
+                self.assertTrue(grammar.matches(dsl))
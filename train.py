@@ -9,12 +9,12 @@ from typing import Any
 
 import torch
 from datasets import Dataset
-from transformers import PreTrainedTokenizer
 from transformers.trainer_callback import EarlyStoppingCallback
 from trl.trainer.sft_config import SFTConfig
 from trl.trainer.sft_trainer import SFTTrainer
 
 from src.logger import get_logger
+from src.prompts import PromptBuilder
 
 logger = get_logger(__name__)
 
@@ -27,21 +27,17 @@ OUTPUT_DIR: str = f"models/phi-4-auradsl-{datetime.now(tz=UTC).strftime('%Y%m%d_
 FIXED_SEED: int = 42
 
 
-def formatting_prompts_func(examples: dict[str, list[Any]], tokenizer: PreTrainedTokenizer):
-    """Formats the dataset entries into the Phi-4 chat structure."""
-    texts = []
-    for context, input_text, output in zip(examples["context"], examples["input"], examples["output"], strict=True):
-        messages = [
-            {
-                "role": "system",
-                "content": "You are an expert in AuraDSL. Translate the natural language request into a valid AuraDSL query based on the provided schema.",
-            },
-            {"role": "user", "content": f"Context: {context}\n\nInput: {input_text}"},
-            {"role": "assistant", "content": output},
-        ]
-        text = tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=False)
-        texts.append(text)
-    return {"text": texts}
+def formatting_prompts_func(examples: dict[str, list[Any]], prompts: PromptBuilder):
+    """Tokenizes the dataset entries in the Phi-4 chat structure shared with inference.
+
+    The schema context repeats across thousands of samples, so its token ids
+    come from the builder's cache and only question and answer are tokenized.
+    """
+    input_ids = [
+        prompts.encode(context, input_text, output)
+        for context, input_text, output in zip(examples["context"], examples["input"], examples["output"], strict=True)
+    ]
+    return {"input_ids": input_ids}
 
 
 def train() -> None:
@@ -82,6 +78,8 @@ def train() -> None:
         chat_template="phi-4",
     )
 
+    prompts = PromptBuilder(tokenizer)
+
     # Data Preparation
     logger.info("Loading dataset from %s", DATASET_PATH)
     raw_dataset = Dataset.from_json(str(DATASET_PATH))
@@ -90,17 +88,17 @@ def train() -> None:
     dataset = raw_dataset.train_test_split(test_size=0.1, seed=FIXED_SEED)  # pyright: ignore[reportAttributeAccessIssue]
 
     train_data = dataset["train"].map(
-        lambda x: formatting_prompts_func(x, tokenizer),
+        lambda x: formatting_prompts_func(x, prompts),
         batched=True,
         remove_columns=dataset["train"].column_names,
     )
     eval_data = dataset["test"].map(
-        lambda x: formatting_prompts_func(x, tokenizer),
+        lambda x: formatting_prompts_func(x, prompts),
         batched=True,
         remove_columns=dataset["test"].column_names,
     )
 
-    logger.info("Example prompt:\n%s", train_data[0]["text"])
+    logger.info("Example prompt:\n%s", tokenizer.decode(train_data[0]["input_ids"]))
 
     # Training Configuration
     sft_config = SFTConfig(
@@ -125,7 +123,6 @@ def train() -> None:
         weight_decay=0.01,
         max_grad_norm=1.0,
         report_to="tensorboard",
-        dataset_text_field="text",
         max_length=MAX_SEQ_LENGTH,
         seed=FIXED_SEED,
     )